@@ -1,3 +1,8 @@
 """StackMason Backend Application."""
+import time
+
 __version__ = "1.0.0"
 
+# Reference point of the startup timings reported by /ready (app/startup.py)
+STARTED_AT = time.perf_counter()
+
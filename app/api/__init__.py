@@ -0,0 +1,6 @@
+"""REST routes served alongside the GraphQL endpoint."""
+from app.api.admin import router as admin_router
+from app.api.metrics import router as metrics_router
+from app.api.stream import router as stream_router
+
+__all__ = ["admin_router", "metrics_router", "stream_router"]
@@ -0,0 +1,77 @@
+"""Administrative endpoints for operating the in-memory catalog."""
+from typing import Optional
+from fastapi import APIRouter, Depends, Header, HTTPException
+from fastapi.concurrency import run_in_threadpool
+from app.config import settings
+from sqlmodel import Session
+from app.database import run_db
+from app.catalog import (
+    get_catalog_version,
+    get_resource_detail_cache,
+    get_snapshot,
+    record_catalog_version,
+    reload_snapshot,
+)
+from app.graphql.extensions import document_cache
+from app.startup import check_catalog_version
+
+
+def require_admin(x_admin_token: Optional[str] = Header(default=None)) -> None:
+    """Allow admin calls with a matching token, or freely in the local environment."""
+    if settings.ADMIN_TOKEN:
+        if x_admin_token != settings.ADMIN_TOKEN:
+            raise HTTPException(status_code=403, detail="Invalid admin token")
+    elif not settings.IS_LOCAL:
+        raise HTTPException(status_code=404, detail="Not Found")
+
+
+router = APIRouter(prefix="/admin", tags=["admin"], dependencies=[Depends(require_admin)])
+
+
+@router.get("/catalog")
+async def catalog_status():
+    """Report whether the catalog snapshot is active and its memory footprint."""
+    snapshot = get_snapshot()
+    return {
+        "catalog_version": get_catalog_version(),
+        "snapshot_enabled": settings.CATALOG_SNAPSHOT_ENABLED,
+        "snapshot": snapshot.stats() if snapshot is not None else None,
+    }
+
+
+@router.post("/catalog/reload")
+async def catalog_reload():
+    """Rebuild the catalog snapshot and swap it in atomically."""
+    if not settings.CATALOG_SNAPSHOT_ENABLED:
+        raise HTTPException(status_code=409, detail="Catalog snapshot mode is disabled")
+    snapshot = await run_in_threadpool(reload_snapshot)
+    return {"snapshot": snapshot.stats()}
+
+
+def _record_admin_version(db: Session) -> int:
+    # A full version: changesSince cannot describe what it stands for
+    version = record_catalog_version(db, (), "admin", 0, full=True)
+    db.commit()
+    return version
+
+
+@router.post("/catalog/bump-version")
+async def catalog_bump_version():
+    """Record a new catalog version, e.g. after editing the catalog by hand.
+
+    Every worker follows it within CATALOG_VERSION_CHECK_SECONDS, invalidating
+    cached results and ETags and reloading its snapshot; this one does at once.
+    """
+    version = await run_db(_record_admin_version)
+    await check_catalog_version()
+    return {"catalog_version": version}
+
+
+@router.get("/cache")
+async def cache_status():
+    """Report resourceDetail and GraphQL document cache sizes and hit/miss counters."""
+    cache = get_resource_detail_cache()
+    return {
+        "resource_detail": cache.stats() if cache is not None else None,
+        "documents": document_cache.stats(),
+    }
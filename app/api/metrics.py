@@ -0,0 +1,17 @@
+"""Prometheus scrape endpoint."""
+from fastapi import APIRouter, HTTPException
+from fastapi.responses import PlainTextResponse
+from app.config import settings
+from app.metrics import registry
+
+PROMETHEUS_CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+router = APIRouter(tags=["metrics"])
+
+
+@router.get("/metrics", response_class=PlainTextResponse)
+async def metrics():
+    """Latency histograms and counters in the Prometheus text format."""
+    if not settings.METRICS_ENABLED:
+        raise HTTPException(status_code=404, detail="Not Found")
+    return PlainTextResponse(registry.render(), media_type=PROMETHEUS_CONTENT_TYPE)
@@ -0,0 +1,132 @@
+"""NDJSON streaming of large resource details.
+
+A GraphQL response is built and serialized whole, so for the biggest
+resources the client waits for megabytes of property tree before the first
+byte (graphql-core 3.2 has no ``@defer``/``@stream``). This endpoint writes
+one JSON document per line instead::
+
+    {"type": "resource", "data": {"id": ..., "attributes": [...], "availableRegions": [...]}}
+    {"type": "property", "index": 0, "data": {"propertyName": ..., "nestedProperties": [...]}}
+    ...
+    {"type": "end", "properties": 42}
+
+The resource line is sent before the property graph is loaded, and each
+root property's tree is built, serialized and dropped before the next one,
+so a request holds one subtree at a time rather than the whole response.
+Trees are built with one SharedSubtreeBuilder per request, so a type used
+under several root properties is expanded once, and ``maxDepth`` is capped
+by ``GRAPHQL_MAX_NESTED_PROPERTIES_DEPTH`` like nestedProperties in GraphQL.
+"""
+import asyncio
+import json
+import logging
+from typing import AsyncIterator, Iterable, Sequence
+from fastapi import APIRouter, HTTPException, Query
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import StreamingResponse
+from strawberry.utils.str_converters import to_camel_case
+from app.config import settings
+from app.catalog import PropertyGraph, get_snapshot
+from app.graphql.loaders import Loaders
+from app.graphql.utils import SharedSubtreeBuilder, property_to_json
+
+logger = logging.getLogger(__name__)
+
+NDJSON_MEDIA_TYPE = "application/x-ndjson"
+
+_RESOURCE_FIELDS = ("id", "resource_type", "documentation_url")
+_ATTRIBUTE_FIELDS = ("id", "attribute_name", "primitive_type", "is_list", "list_item_type")
+_REGION_FIELDS = ("id", "region_code", "region_name")
+
+router = APIRouter(prefix="/resources", tags=["stream"])
+
+
+def _line(payload: dict) -> bytes:
+    return (json.dumps(payload, separators=(",", ":")) + "\n").encode()
+
+
+def _fields(row, names: Sequence[str]) -> dict:
+    return {to_camel_case(name): getattr(row, name) for name in names}
+
+
+def _resource_line(resource, attributes: Iterable, regions: Iterable) -> bytes:
+    data = _fields(resource, _RESOURCE_FIELDS)
+    data["attributes"] = [_fields(attribute, _ATTRIBUTE_FIELDS) for attribute in attributes]
+    data["availableRegions"] = [_fields(region, _REGION_FIELDS) for region in regions]
+    return _line({"type": "resource", "data": data})
+
+
+def _property_line(index: int, prop, builder: SharedSubtreeBuilder, max_depth: int) -> bytes:
+    tree = builder.build(prop, max_depth=max_depth)
+    return _line({"type": "property", "index": index, "data": property_to_json(tree)})
+
+
+async def _property_lines(resource_id: int, graph: PropertyGraph, max_depth: int) -> AsyncIterator[bytes]:
+    root_properties = graph.root_properties.get(resource_id, [])
+    # Type subtrees shared by several root properties are built once per request
+    builder = SharedSubtreeBuilder(graph)
+    for index, prop in enumerate(root_properties):
+        # Large subtrees take a while to build; keep the event loop free meanwhile
+        yield await run_in_threadpool(_property_line, index, prop, builder, max_depth)
+    yield _line({"type": "end", "properties": len(root_properties)})
+
+
+async def _snapshot_lines(snapshot, resource, max_depth: int) -> AsyncIterator[bytes]:
+    yield _resource_line(
+        resource,
+        snapshot.attributes_by_resource.get(resource.id, ()),
+        snapshot.regions_for_resource(resource.id),
+    )
+    async for line in _property_lines(resource.id, snapshot.graph, max_depth):
+        yield line
+
+
+async def _database_lines(resource, loaders: Loaders, max_depth: int) -> AsyncIterator[bytes]:
+    attributes, regions = await asyncio.gather(
+        loaders.attributes_by_resource.load(resource.id),
+        loaders.regions_by_resource.load(resource.id),
+    )
+    yield _resource_line(resource, attributes, regions)
+    graph = await loaders.property_graph(resource.id, max_depth)
+    async for line in _property_lines(resource.id, graph, max_depth):
+        yield line
+
+
+async def _guarded(lines: AsyncIterator[bytes]) -> AsyncIterator[bytes]:
+    """Once streaming has started the status is sent, so failures become an error line."""
+    try:
+        async for line in lines:
+            yield line
+    except Exception:
+        logger.exception("Streaming resource detail failed")
+        yield _line({"type": "error", "message": "Internal server error"})
+
+
+@router.get("/{resource_id}/stream")
+async def stream_resource_detail(
+    resource_id: int,
+    max_depth: int = Query(
+        default=settings.GRAPHQL_MAX_NESTED_PROPERTIES_DEPTH,
+        ge=0,
+        le=settings.GRAPHQL_MAX_NESTED_PROPERTIES_DEPTH,
+        alias="maxDepth",
+    ),
+):
+    """Resource detail as NDJSON: resource fields first, then one line per root property tree.
+
+    ``maxDepth`` limits the nestedProperties levels below each root property
+    (``GRAPHQL_MAX_NESTED_PROPERTIES_DEPTH`` by default and at most; cycles
+    are cut as in GraphQL).
+    """
+    snapshot = get_snapshot()
+    if snapshot is not None:
+        resource = snapshot.resources_by_id.get(resource_id)
+        lines = _snapshot_lines(snapshot, resource, max_depth) if resource else None
+    else:
+        loaders = Loaders()
+        resource = await loaders.resource.load(resource_id)
+        lines = _database_lines(resource, loaders, max_depth) if resource else None
+
+    if lines is None:
+        raise HTTPException(status_code=404, detail="Resource not found")
+    return StreamingResponse(_guarded(lines), media_type=NDJSON_MEDIA_TYPE)
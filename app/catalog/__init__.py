@@ -0,0 +1,65 @@
+"""Catalog data access and in-memory catalog services."""
+from app.catalog.property_graph import PropertyGraph, load_property_graph, load_type_graph
+from app.catalog.version import (
+    get_catalog_version,
+    bump_catalog_version,
+    follow_stored_version,
+    stored_catalog_version,
+    catalog_fingerprint,
+)
+from app.catalog.changelog import (
+    ChangeSet,
+    changes_since,
+    latest_catalog_version,
+    record_catalog_version,
+)
+from app.catalog.cache import (
+    MISSING,
+    ResourceDetailCache,
+    VersionedCache,
+    get_resource_detail_cache,
+    region_counts,
+)
+from app.catalog.snapshot import (
+    CatalogSnapshot,
+    SharedCatalogSnapshot,
+    get_snapshot,
+    init_snapshot,
+    reload_snapshot,
+)
+from app.catalog.region_index import RegionIndex, get_region_index, load_region_index
+from app.catalog.search import SearchIndex, get_search_index, load_search_index
+from app.catalog.tree_store import PropertyTreeStore, get_property_tree_store
+
+__all__ = [
+    "PropertyGraph",
+    "load_property_graph",
+    "load_type_graph",
+    "get_catalog_version",
+    "bump_catalog_version",
+    "follow_stored_version",
+    "stored_catalog_version",
+    "catalog_fingerprint",
+    "ChangeSet",
+    "changes_since",
+    "latest_catalog_version",
+    "record_catalog_version",
+    "MISSING",
+    "ResourceDetailCache",
+    "get_resource_detail_cache",
+    "VersionedCache",
+    "region_counts",
+    "CatalogSnapshot",
+    "SharedCatalogSnapshot",
+    "get_snapshot",
+    "init_snapshot",
+    "reload_snapshot",
+    "RegionIndex",
+    "get_region_index",
+    "load_region_index",
+    "SearchIndex",
+    "get_search_index",
+    "load_search_index",
+    "PropertyTreeStore",
+    "get_property_tree_store",
+]
@@ -0,0 +1,142 @@
+"""LRU cache of fully built resourceDetail results."""
+import threading
+from collections import OrderedDict
+from typing import Any, Hashable, Optional, Tuple
+from app.config import settings
+from app.catalog.memory import approximate_size
+from app.catalog.version import get_catalog_version
+
+MISSING = object()
+
+
+class ResourceDetailCache:
+    """LRU cache bounded by entry count and approximate bytes.
+
+    Entries are keyed by ``(key, catalog version)``. When the catalog version
+    moves on, every entry is dropped at once on the next access.
+    """
+
+    def __init__(self, max_entries: int, max_bytes: int):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self._entries: "OrderedDict[Tuple[Hashable, int], Tuple[Any, int]]" = OrderedDict()
+        self._version = get_catalog_version()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+    def _sync_version(self) -> int:
+        """Drop all entries if the catalog version changed since they were stored."""
+        version = get_catalog_version()
+        if version != self._version:
+            if self._entries:
+                self.invalidations += 1
+            self._entries.clear()
+            self._bytes = 0
+            self._version = version
+        return version
+
+    def get(self, key: Hashable) -> Any:
+        """Cached value for key at the current catalog version, or MISSING."""
+        with self._lock:
+            version = self._sync_version()
+            entry = self._entries.get((key, version))
+            if entry is None:
+                self.misses += 1
+                return MISSING
+            self._entries.move_to_end((key, version))
+            self.hits += 1
+            return entry[0]
+
+    def put(self, key: Hashable, value: Any, version: Optional[int] = None) -> None:
+        """Store a value built at ``version`` (defaults to the current version)."""
+        size = approximate_size(value)
+        if size > self.max_bytes:
+            return
+
+        with self._lock:
+            current = self._sync_version()
+            if version is not None and version != current:
+                # Built against a catalog that has since been replaced
+                return
+
+            cache_key = (key, current)
+            previous = self._entries.pop(cache_key, None)
+            if previous is not None:
+                self._bytes -= previous[1]
+            self._entries[cache_key] = (value, size)
+            self._bytes += size
+
+            while self._entries and (
+                len(self._entries) > self.max_entries or self._bytes > self.max_bytes
+            ):
+                _, (_, evicted_size) = self._entries.popitem(last=False)
+                self._bytes -= evicted_size
+                self.evictions += 1
+
+    def clear(self) -> None:
+        """Drop every entry."""
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def stats(self) -> dict:
+        """Hit/miss/eviction counters and current size."""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "catalog_version": self._version,
+                "entries": len(self._entries),
+                "bytes": self._bytes,
+                "max_entries": self.max_entries,
+                "max_bytes": self.max_bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+                "evictions": self.evictions,
+                "invalidations": self.invalidations,
+            }
+
+
+class VersionedCache:
+    """Small unbounded map whose entries only live for one catalog version.
+
+    Meant for a handful of cheap derived values such as per-region counts.
+    """
+
+    def __init__(self):
+        self._values: dict = {}
+        self._version = get_catalog_version()
+        self._lock = threading.Lock()
+
+    def get(self, key: Hashable) -> Any:
+        """Value for key at the current catalog version, or MISSING."""
+        with self._lock:
+            if self._version != get_catalog_version():
+                self._values.clear()
+                self._version = get_catalog_version()
+            return self._values.get(key, MISSING)
+
+    def put(self, key: Hashable, value: Any, version: int) -> None:
+        """Store a value computed at ``version`` if that is still current."""
+        with self._lock:
+            if version == get_catalog_version() == self._version:
+                self._values[key] = value
+
+
+region_counts = VersionedCache()
+
+_resource_detail_cache: Optional[ResourceDetailCache] = None
+if settings.RESOURCE_DETAIL_CACHE_ENABLED:
+    _resource_detail_cache = ResourceDetailCache(
+        max_entries=settings.RESOURCE_DETAIL_CACHE_MAX_ENTRIES,
+        max_bytes=settings.RESOURCE_DETAIL_CACHE_MAX_BYTES,
+    )
+
+
+def get_resource_detail_cache() -> Optional[ResourceDetailCache]:
+    """The process-wide resourceDetail cache, or None when disabled."""
+    return _resource_detail_cache
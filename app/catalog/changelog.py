@@ -0,0 +1,161 @@
+"""Persistent catalog versions and the resource changes each one made.
+
+Every ingest that changes the catalog is stamped with a new version and
+records which resources, properties, attributes and region availabilities
+it added, updated or removed. Clients remember the version they last saw
+and ask for the changes since, refetching only the affected resources.
+"""
+from datetime import datetime
+from typing import Dict, Iterable, List, NamedTuple, Optional, Tuple
+from sqlalchemy import func, insert
+from sqlmodel import Session, select
+from app.models import CatalogChange as CatalogChangeModel, CatalogVersion as CatalogVersionModel
+
+# Entities
+RESOURCE = "resource"
+PROPERTY = "property"
+PROPERTY_TYPE = "property_type"
+ATTRIBUTE = "attribute"
+REGION_AVAILABILITY = "region_availability"
+REGION = "region"
+
+# Changes
+ADDED = "added"
+UPDATED = "updated"
+REMOVED = "removed"
+
+INSERT_BATCH_SIZE = 5000
+
+
+class Change(NamedTuple):
+    """A change to record: ``resource_id``/``resource_type`` are None for region entries."""
+    resource_id: Optional[int]
+    resource_type: Optional[str]
+    entity: str
+    name: Optional[str]
+    change: str
+
+
+class ResourceChanges(NamedTuple):
+    """Net changes of one resource over a range of versions."""
+    resource_id: int
+    resource_type: str
+    # added, updated or removed; a resource added and removed in the range is removed
+    change: str
+    version: int
+    properties: Tuple[str, ...]
+    attributes: Tuple[str, ...]
+    regions_added: Tuple[str, ...]
+    regions_removed: Tuple[str, ...]
+
+
+class ChangeSet(NamedTuple):
+    """Changes between two catalog versions."""
+    since: int
+    version: int
+    # The range cannot be described by changes: refetch everything
+    full_refresh: bool
+    resources: Tuple[ResourceChanges, ...]
+    regions_changed: bool
+
+
+def latest_catalog_version(db: Session) -> int:
+    """Newest recorded catalog version, 0 before the first ingest."""
+    return db.exec(select(func.max(CatalogVersionModel.id))).one() or 0
+
+
+def record_catalog_version(
+    db: Session,
+    changes: Iterable[Change],
+    source: str,
+    changed_rows: int,
+    full: bool = False,
+) -> int:
+    """Add a version with its changes inside the caller's transaction; returns the version."""
+    version = CatalogVersionModel(
+        created_at=datetime.utcnow(), source=source, is_full=full, changed_rows=changed_rows
+    )
+    db.add(version)
+    db.flush()
+
+    rows = [{"version_id": version.id, **change._asdict()} for change in changes] if not full else []
+    for start in range(0, len(rows), INSERT_BATCH_SIZE):
+        db.exec(insert(CatalogChangeModel), params=rows[start:start + INSERT_BATCH_SIZE])
+    return version.id
+
+
+def _append(values: List[str], value: Optional[str]) -> None:
+    if value is not None and value not in values:
+        values.append(value)
+
+
+def changes_since(db: Session, since: int, until: Optional[int] = None) -> ChangeSet:
+    """Changes per resource after version ``since`` up to ``until`` (the newest by default)."""
+    if until is None:
+        until = latest_catalog_version(db)
+    oldest = db.exec(select(func.min(CatalogVersionModel.id))).one() or 0
+
+    full_refresh = since <= 0 or since > until or since < oldest - 1
+    if not full_refresh and since < until:
+        full_refresh = bool(db.exec(
+            select(func.count())
+            .select_from(CatalogVersionModel)
+            .where(CatalogVersionModel.id > since, CatalogVersionModel.id <= until)
+            .where(CatalogVersionModel.is_full)
+        ).one())
+    if full_refresh or since >= until:
+        return ChangeSet(since, until, full_refresh, (), False)
+
+    statement = (
+        select(
+            CatalogChangeModel.version_id, CatalogChangeModel.resource_id,
+            CatalogChangeModel.resource_type, CatalogChangeModel.entity,
+            CatalogChangeModel.name, CatalogChangeModel.change,
+        )
+        .where(CatalogChangeModel.version_id > since, CatalogChangeModel.version_id <= until)
+        .order_by(CatalogChangeModel.version_id, CatalogChangeModel.id)
+    )
+
+    # Keyed by resource type: a resource removed and added again gets a new id
+    by_type: Dict[str, dict] = {}
+    regions_changed = False
+    for version, resource_id, resource_type, entity, name, change in db.exec(statement):
+        if entity == REGION or resource_type is None:
+            regions_changed = True
+            continue
+        entry = by_type.setdefault(resource_type, {
+            "resource_id": resource_id, "change": UPDATED, "properties": [], "attributes": [],
+            "regions_added": [], "regions_removed": [],
+        })
+        entry["resource_id"] = resource_id
+        entry["version"] = version
+        if entity == RESOURCE and change != UPDATED:
+            entry["change"] = change
+        elif entity in (PROPERTY, PROPERTY_TYPE):
+            _append(entry["properties"], name)
+        elif entity == ATTRIBUTE:
+            _append(entry["attributes"], name)
+        elif entity == REGION_AVAILABILITY:
+            added, removed = (
+                (entry["regions_added"], entry["regions_removed"]) if change == ADDED
+                else (entry["regions_removed"], entry["regions_added"])
+            )
+            if name in removed:
+                removed.remove(name)
+            else:
+                _append(added, name)
+
+    resources = tuple(
+        ResourceChanges(
+            resource_id=entry["resource_id"],
+            resource_type=resource_type,
+            change=entry["change"],
+            version=entry["version"],
+            properties=tuple(entry["properties"]),
+            attributes=tuple(entry["attributes"]),
+            regions_added=tuple(entry["regions_added"]),
+            regions_removed=tuple(entry["regions_removed"]),
+        )
+        for resource_type, entry in sorted(by_type.items())
+    )
+    return ChangeSet(since, until, False, resources, regions_changed)
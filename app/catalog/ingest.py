@@ -0,0 +1,777 @@
+"""Bulk ingestion of per-region CloudFormation resource specifications.
+
+Usage::
+
+    python -m app.catalog.ingest specs/                  # apply the changes
+    python -m app.catalog.ingest specs/ --dry-run        # only report them
+    python -m app.catalog.ingest specs/ --region-names names.json --workers 8
+
+``specs/`` holds one specification per region, either as
+``<region>.json`` or ``<region>/CloudFormationResourceSpecification.json``
+(optionally gzipped). Together the files describe the whole catalog:
+resources, types and regions missing from all of them are deleted.
+
+The run has four stages, each reported in rows per second:
+
+* parse: every region file is parsed in its own worker process into plain
+  tuples, and merged as soon as it arrives;
+* dedupe: resources and property types found in several regions are kept
+  once (on conflicting definitions the newest specification version wins);
+* diff: the merged catalog is compared with the database by natural keys
+  (resource type, type name, owner and property name...);
+* write: only new, changed and removed rows are written, in one
+  transaction, with COPY on PostgreSQL/psycopg2 and multi-row INSERTs
+  elsewhere. The changes are stamped with a new catalog version and
+  recorded per resource in the changelog (see ``app.catalog.changelog``).
+"""
+import argparse
+import gzip
+import io
+import json
+import logging
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, List, NamedTuple, Optional, Sequence, Set, Tuple
+from sqlalchemy import Table, bindparam, delete, insert, update
+from sqlmodel import Session, select
+from app.database import engine
+from app.models import (
+    Region as RegionModel,
+    Resource as ResourceModel,
+    ResourceRegion as ResourceRegionModel,
+    ResourceAttribute as ResourceAttributeModel,
+    Property as PropertyModel,
+    PropertyType as PropertyTypeModel,
+)
+from app.catalog import changelog
+from app.catalog.changelog import Change, record_catalog_version
+
+logger = logging.getLogger(__name__)
+
+SPEC_FILENAME = "CloudFormationResourceSpecification.json"
+
+# Rows per INSERT/UPDATE/DELETE statement
+WRITE_BATCH_SIZE = 5000
+
+RESOURCE = "resource"
+PROPERTY_TYPE = "type"
+
+# Value tuples compared by the diff, per table
+# property: (documentation_url, update_type, is_required, is_list, is_map,
+#            primitive_type, complex_type_name, list_allows_duplicates)
+PropertyValues = Tuple[Optional[str], Optional[str], bool, bool, bool, Optional[str], Optional[str], Optional[bool]]
+# attribute: (primitive_type, is_list, list_item_type)
+AttributeValues = Tuple[Optional[str], bool, Optional[str]]
+
+
+class Definition(NamedTuple):
+    """A resource or property type as parsed from one region's specification."""
+    documentation_url: Optional[str]
+    properties: Tuple[Tuple[str, PropertyValues], ...]
+    attributes: Tuple[Tuple[str, AttributeValues], ...] = ()
+
+
+class RegionSpec(NamedTuple):
+    """Parse result of one region file, as sent back by a worker."""
+    region_code: str
+    version: Tuple[int, ...]
+    resources: Dict[str, Definition]
+    property_types: Dict[str, Definition]
+    rows: int
+
+
+# Parsing (runs in worker processes)
+
+def _version(value: Optional[str]) -> Tuple[int, ...]:
+    parts = []
+    for part in (value or "").split("."):
+        parts.append(int(part) if part.isdigit() else 0)
+    return tuple(parts)
+
+
+def _read_spec(path: Path) -> dict:
+    opener = gzip.open if path.suffix == ".gz" else open
+    with opener(path, "rb") as f:
+        data = f.read()
+    # The published specification is served gzipped without a .gz suffix
+    if data[:2] == b"\x1f\x8b":
+        data = gzip.decompress(data)
+    return json.loads(data)
+
+
+def _type_reference(name: Optional[str], scope: str, type_names: Iterable[str]) -> Optional[str]:
+    """Full name of a property type referenced from a resource or type.
+
+    References are relative to the resource (``Rule`` inside
+    ``AWS::S3::Bucket`` is ``AWS::S3::Bucket.Rule``), except for global
+    types such as ``Tag``.
+    """
+    if not name:
+        return None
+    scoped = f"{scope}.{name}"
+    if scoped in type_names or name not in type_names:
+        return scoped
+    return name
+
+
+def _parse_properties(properties: dict, scope: str, type_names: Iterable[str]) -> Tuple[Tuple[str, PropertyValues], ...]:
+    parsed = []
+    for name, spec in properties.items():
+        kind = spec.get("Type")
+        is_list = kind == "List"
+        is_map = kind == "Map"
+        if is_list or is_map:
+            primitive_type = spec.get("PrimitiveItemType")
+            complex_name = spec.get("ItemType")
+        else:
+            primitive_type = spec.get("PrimitiveType")
+            complex_name = kind
+        parsed.append((name, (
+            spec.get("Documentation"),
+            spec.get("UpdateType"),
+            bool(spec.get("Required", False)),
+            is_list,
+            is_map,
+            primitive_type,
+            None if primitive_type else _type_reference(complex_name, scope, type_names),
+            spec.get("DuplicatesAllowed") if is_list else None,
+        )))
+    return tuple(parsed)
+
+
+def _parse_attributes(attributes: dict) -> Tuple[Tuple[str, AttributeValues], ...]:
+    parsed = []
+    for name, spec in attributes.items():
+        is_list = spec.get("Type") == "List"
+        parsed.append((name, (
+            None if is_list else spec.get("PrimitiveType"),
+            is_list,
+            spec.get("PrimitiveItemType") if is_list else None,
+        )))
+    return tuple(parsed)
+
+
+def parse_region(region_code: str, path: str) -> RegionSpec:
+    """Parse one region's specification file into plain tuples."""
+    spec = _read_spec(Path(path))
+    type_specs = spec.get("PropertyTypes", {})
+    if "Tag" in spec:
+        # Old specifications list the Tag type outside PropertyTypes
+        type_specs = dict(type_specs, Tag=spec["Tag"])
+    type_names = set(type_specs)
+
+    property_types = {}
+    for type_name, type_spec in type_specs.items():
+        scope = type_name.split(".", 1)[0]
+        property_types[type_name] = Definition(
+            type_spec.get("Documentation"),
+            _parse_properties(type_spec.get("Properties", {}), scope, type_names),
+        )
+
+    resources = {}
+    for resource_type, resource_spec in spec.get("ResourceTypes", {}).items():
+        resources[resource_type] = Definition(
+            resource_spec.get("Documentation"),
+            _parse_properties(resource_spec.get("Properties", {}), resource_type, type_names),
+            _parse_attributes(resource_spec.get("Attributes", {})),
+        )
+
+    rows = sum(1 + len(d.properties) + len(d.attributes) for d in resources.values())
+    rows += sum(1 + len(d.properties) for d in property_types.values())
+    return RegionSpec(
+        region_code, _version(spec.get("ResourceSpecificationVersion")), resources, property_types, rows
+    )
+
+
+def find_spec_files(directory: Path) -> Dict[str, Path]:
+    """Region code to specification file for every region in the directory."""
+    files = {}
+    for path in sorted(directory.iterdir()):
+        if path.is_dir():
+            for candidate in (path / SPEC_FILENAME, path / f"{SPEC_FILENAME}.gz"):
+                if candidate.is_file():
+                    files[path.name] = candidate
+                    break
+        elif path.name.endswith((".json", ".json.gz")):
+            files[path.name.split(".json", 1)[0]] = path
+    return files
+
+
+# Merging
+
+class Stage:
+    """Rows handled and time spent by one pipeline stage."""
+
+    def __init__(self, name: str):
+        self.name = name
+        self.rows = 0
+        self.seconds = 0.0
+
+    def rate(self) -> float:
+        return self.rows / self.seconds if self.seconds else 0.0
+
+    def __str__(self) -> str:
+        return f"{self.name:<7} {self.rows:>9} rows {self.seconds:>7.2f}s {self.rate():>11,.0f} rows/s"
+
+
+class MergedCatalog:
+    """Regions and the deduplicated resources and property types of all of them."""
+
+    def __init__(self):
+        self.regions: List[str] = []
+        self.resources: Dict[str, Definition] = {}
+        self.property_types: Dict[str, Definition] = {}
+        self.resource_regions: List[Tuple[str, str]] = []
+        self.conflicts = 0
+        self._ranks: Dict[Tuple[str, str], Tuple] = {}
+
+    def _merge(self, kind: str, target: Dict[str, Definition], definitions: Dict[str, Definition], rank: Tuple) -> None:
+        for name, definition in definitions.items():
+            current = target.get(name)
+            if current is None:
+                target[name] = definition
+                self._ranks[kind, name] = rank
+            elif current != definition:
+                self.conflicts += 1
+                if rank > self._ranks[kind, name]:
+                    target[name] = definition
+                    self._ranks[kind, name] = rank
+
+    def add(self, region: RegionSpec) -> None:
+        rank = (region.version, region.region_code)
+        self.regions.append(region.region_code)
+        self._merge(RESOURCE, self.resources, region.resources, rank)
+        self._merge(PROPERTY_TYPE, self.property_types, region.property_types, rank)
+        self.resource_regions.extend((resource_type, region.region_code) for resource_type in region.resources)
+
+    def row_count(self) -> int:
+        rows = len(self.regions) + len(self.resource_regions)
+        rows += sum(1 + len(d.properties) + len(d.attributes) for d in self.resources.values())
+        rows += sum(1 + len(d.properties) for d in self.property_types.values())
+        return rows
+
+
+def parse_and_merge(files: Dict[str, Path], workers: int, parse: Stage, dedupe: Stage) -> MergedCatalog:
+    """Parse every region file in a process pool, merging results as they arrive."""
+    merged = MergedCatalog()
+
+    def merge(region: RegionSpec) -> None:
+        started = time.perf_counter()
+        merged.add(region)
+        dedupe.seconds += time.perf_counter() - started
+        dedupe.rows += region.rows
+        parse.rows += region.rows
+
+    started = time.perf_counter()
+    if workers <= 1:
+        for code, path in files.items():
+            merge(parse_region(code, str(path)))
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            futures = [pool.submit(parse_region, code, str(path)) for code, path in files.items()]
+            for future in as_completed(futures):
+                merge(future.result())
+    # Merging overlaps with parsing, so only the time waiting on workers counts as parsing
+    parse.seconds = time.perf_counter() - started - dedupe.seconds
+    merged.regions.sort()
+    merged.resource_regions.sort()
+    return merged
+
+
+# Diffing
+
+class TableDiff:
+    """Rows to insert, update and delete in one table, by natural key."""
+
+    def __init__(self, model):
+        self.table: Table = model.__table__
+        self.inserts: List[Tuple[tuple, tuple]] = []
+        self.updates: List[Tuple[int, tuple, tuple]] = []
+        self.deletes: List[Tuple[int, tuple]] = []
+        # Extra rows with a natural key that is already taken
+        self.duplicates: List[int] = []
+        self.unchanged = 0
+
+    def compare(self, desired: Iterable[Tuple[tuple, tuple]], existing: Iterable[Tuple[int, tuple, tuple]]) -> int:
+        """Diff desired ``(key, values)`` against existing ``(id, key, values)``; returns rows compared."""
+        current: Dict[tuple, Tuple[int, tuple]] = {}
+        compared = 0
+        for row_id, key, values in existing:
+            compared += 1
+            if key in current:
+                # Duplicate natural keys left by earlier loaders are removed
+                self.duplicates.append(row_id)
+            else:
+                current[key] = (row_id, values)
+
+        for key, values in desired:
+            compared += 1
+            found = current.pop(key, None)
+            if found is None:
+                self.inserts.append((key, values))
+            elif found[1] != values:
+                self.updates.append((found[0], key, values))
+            else:
+                self.unchanged += 1
+        self.deletes.extend((row_id, key) for key, (row_id, _) in current.items())
+        return compared
+
+    @property
+    def changed(self) -> int:
+        return len(self.inserts) + len(self.updates) + len(self.deletes) + len(self.duplicates)
+
+    def delete_ids(self) -> List[int]:
+        return [row_id for row_id, _ in self.deletes] + self.duplicates
+
+    def __str__(self) -> str:
+        return (
+            f"{self.table.name:<20} +{len(self.inserts):<8} ~{len(self.updates):<8} "
+            f"-{len(self.deletes) + len(self.duplicates):<8} ={self.unchanged}"
+        )
+
+
+class CatalogDiff:
+    """Changes needed to turn the database into the merged catalog."""
+
+    def __init__(self):
+        self.regions = TableDiff(RegionModel)
+        self.resources = TableDiff(ResourceModel)
+        self.property_types = TableDiff(PropertyTypeModel)
+        self.properties = TableDiff(PropertyModel)
+        self.attributes = TableDiff(ResourceAttributeModel)
+        self.resource_regions = TableDiff(ResourceRegionModel)
+
+    def tables(self) -> List[TableDiff]:
+        return [
+            self.regions, self.resources, self.property_types,
+            self.properties, self.attributes, self.resource_regions,
+        ]
+
+    @property
+    def changed(self) -> int:
+        return sum(table.changed for table in self.tables())
+
+
+def _names(db: Session, model, column) -> Dict[int, str]:
+    return dict(db.exec(select(model.id, column)).all())
+
+
+def diff_catalog(db: Session, merged: MergedCatalog, region_names: Dict[str, str]) -> Tuple[CatalogDiff, int]:
+    """Compare the merged catalog with the database; returns the diff and the rows compared."""
+    diff = CatalogDiff()
+    region_codes = _names(db, RegionModel, RegionModel.region_code)
+    resource_types = _names(db, ResourceModel, ResourceModel.resource_type)
+    type_names = _names(db, PropertyTypeModel, PropertyTypeModel.type_name)
+    compared = 0
+
+    existing_regions = db.exec(select(RegionModel.id, RegionModel.region_code, RegionModel.region_name)).all()
+    current_region_names = {code: name for _, code, name in existing_regions}
+    compared += diff.regions.compare(
+        (
+            ((code,), (region_names.get(code) or current_region_names.get(code) or code,))
+            for code in merged.regions
+        ),
+        ((row_id, (code,), (name,)) for row_id, code, name in existing_regions),
+    )
+
+    compared += diff.resources.compare(
+        (((name,), (d.documentation_url,)) for name, d in merged.resources.items()),
+        (
+            (row_id, (name,), (url,))
+            for row_id, name, url in db.exec(
+                select(ResourceModel.id, ResourceModel.resource_type, ResourceModel.documentation_url)
+            ).all()
+        ),
+    )
+
+    def type_owner(type_name: str) -> Optional[str]:
+        owner = type_name.split(".", 1)[0] if "." in type_name else None
+        return owner if owner in merged.resources else None
+
+    compared += diff.property_types.compare(
+        (((name,), (type_owner(name), d.documentation_url)) for name, d in merged.property_types.items()),
+        (
+            (row_id, (name,), (resource_types.get(resource_id), url))
+            for row_id, name, resource_id, url in db.exec(select(
+                PropertyTypeModel.id, PropertyTypeModel.type_name,
+                PropertyTypeModel.resource_id, PropertyTypeModel.documentation_url,
+            )).all()
+        ),
+    )
+
+    def desired_properties() -> Iterator[Tuple[tuple, tuple]]:
+        for kind, definitions in ((RESOURCE, merged.resources), (PROPERTY_TYPE, merged.property_types)):
+            for owner, definition in definitions.items():
+                for name, values in definition.properties:
+                    # References to types no region defines cannot be stored
+                    if values[6] is not None and values[6] not in merged.property_types:
+                        values = values[:6] + (None,) + values[7:]
+                    yield (kind, owner, name), values
+
+    def existing_properties() -> Iterator[Tuple[int, tuple, tuple]]:
+        statement = select(
+            PropertyModel.id, PropertyModel.resource_id, PropertyModel.property_type_id,
+            PropertyModel.property_name, PropertyModel.documentation_url, PropertyModel.update_type,
+            PropertyModel.is_required, PropertyModel.is_list, PropertyModel.is_map,
+            PropertyModel.primitive_type, PropertyModel.complex_type_id, PropertyModel.list_allows_duplicates,
+        ).order_by(PropertyModel.id)
+        for row in db.exec(statement):
+            (row_id, resource_id, type_id, name, url, update_type,
+             is_required, is_list, is_map, primitive_type, complex_type_id, duplicates) = row
+            if resource_id is not None:
+                key = (RESOURCE, resource_types.get(resource_id), name)
+            else:
+                key = (PROPERTY_TYPE, type_names.get(type_id), name)
+            yield row_id, key, (
+                url, update_type, bool(is_required), bool(is_list), bool(is_map),
+                primitive_type, type_names.get(complex_type_id), duplicates,
+            )
+
+    compared += diff.properties.compare(desired_properties(), existing_properties())
+
+    compared += diff.attributes.compare(
+        (
+            ((resource_type, name), values)
+            for resource_type, definition in merged.resources.items()
+            for name, values in definition.attributes
+        ),
+        (
+            (row_id, (resource_types.get(resource_id), name), (primitive_type, bool(is_list), item_type))
+            for row_id, resource_id, name, primitive_type, is_list, item_type in db.exec(select(
+                ResourceAttributeModel.id, ResourceAttributeModel.resource_id,
+                ResourceAttributeModel.attribute_name, ResourceAttributeModel.primitive_type,
+                ResourceAttributeModel.is_list, ResourceAttributeModel.list_item_type,
+            )).all()
+        ),
+    )
+
+    compared += diff.resource_regions.compare(
+        ((key, ()) for key in merged.resource_regions),
+        (
+            (row_id, (resource_types.get(resource_id), region_codes.get(region_id)), ())
+            for row_id, resource_id, region_id in db.exec(select(
+                ResourceRegionModel.id, ResourceRegionModel.resource_id, ResourceRegionModel.region_id,
+            )).all()
+        ),
+    )
+    return diff, compared
+
+
+# Writing
+
+def _batches(rows: Sequence, size: int = WRITE_BATCH_SIZE) -> Iterator[Sequence]:
+    for start in range(0, len(rows), size):
+        yield rows[start:start + size]
+
+
+def _copy_value(value) -> str:
+    if value is None:
+        return "\\N"
+    if isinstance(value, bool):
+        return "t" if value else "f"
+    if isinstance(value, datetime):
+        return value.isoformat()
+    return str(value).replace("\\", "\\\\").replace("\t", "\\t").replace("\n", "\\n").replace("\r", "\\r")
+
+
+class CatalogWriter:
+    """Applies a CatalogDiff with bulk statements inside the session's transaction."""
+
+    def __init__(self, db: Session):
+        self.db = db
+        self.rows = 0
+        cursor = None
+        if db.get_bind().dialect.name == "postgresql":
+            cursor = db.connection().connection.cursor()
+        # COPY needs psycopg2's copy_expert; other drivers get multi-row INSERTs
+        self._cursor = cursor if hasattr(cursor, "copy_expert") else None
+
+    def insert(self, table: Table, rows: List[dict]) -> None:
+        if not rows:
+            return
+        self.rows += len(rows)
+        if self._cursor is not None:
+            columns = list(rows[0])
+            buffer = io.StringIO()
+            for row in rows:
+                buffer.write("\t".join(_copy_value(row[column]) for column in columns))
+                buffer.write("\n")
+            buffer.seek(0)
+            self._cursor.copy_expert(f"COPY {table.name} ({', '.join(columns)}) FROM STDIN", buffer)
+            return
+        for batch in _batches(rows):
+            self.db.exec(insert(table), params=batch)
+
+    def update(self, table: Table, rows: List[dict]) -> None:
+        """Update rows by id; every dict has ``row_id`` plus the columns to set."""
+        if not rows:
+            return
+        self.rows += len(rows)
+        statement = update(table).where(table.c.id == bindparam("row_id"))
+        for batch in _batches(rows):
+            self.db.exec(statement, params=batch)
+
+    def delete(self, table: Table, ids: List[int]) -> None:
+        if not ids:
+            return
+        self.rows += len(ids)
+        for batch in _batches(ids):
+            self.db.exec(delete(table).where(table.c.id.in_(batch)))
+
+    def ids(self, model, column) -> Dict[str, int]:
+        return {name: row_id for row_id, name in self.db.exec(select(model.id, column)).all()}
+
+
+def apply_diff(db: Session, diff: CatalogDiff) -> int:
+    """Write the diff in dependency order; returns the rows written. The caller commits."""
+    writer = CatalogWriter(db)
+    now = datetime.utcnow()
+
+    # Rows referencing others go first, so nothing points at a removed row
+    writer.delete(diff.resource_regions.table, diff.resource_regions.delete_ids())
+    writer.delete(diff.attributes.table, diff.attributes.delete_ids())
+    writer.delete(diff.properties.table, diff.properties.delete_ids())
+
+    writer.insert(diff.regions.table, [
+        {"region_code": code, "region_name": name, "created_at": now}
+        for (code,), (name,) in diff.regions.inserts
+    ])
+    writer.update(diff.regions.table, [
+        {"row_id": row_id, "region_name": name} for row_id, _, (name,) in diff.regions.updates
+    ])
+    writer.insert(diff.resources.table, [
+        {"resource_type": name, "documentation_url": url, "created_at": now}
+        for (name,), (url,) in diff.resources.inserts
+    ])
+    writer.update(diff.resources.table, [
+        {"row_id": row_id, "documentation_url": url} for row_id, _, (url,) in diff.resources.updates
+    ])
+    region_ids = writer.ids(RegionModel, RegionModel.region_code)
+    resource_ids = writer.ids(ResourceModel, ResourceModel.resource_type)
+
+    writer.insert(diff.property_types.table, [
+        {"resource_id": resource_ids.get(owner), "type_name": name, "documentation_url": url}
+        for (name,), (owner, url) in diff.property_types.inserts
+    ])
+    writer.update(diff.property_types.table, [
+        {"row_id": row_id, "resource_id": resource_ids.get(owner), "documentation_url": url}
+        for row_id, _, (owner, url) in diff.property_types.updates
+    ])
+    type_ids = writer.ids(PropertyTypeModel, PropertyTypeModel.type_name)
+
+    def property_columns(values: PropertyValues) -> dict:
+        url, update_type, is_required, is_list, is_map, primitive_type, complex_name, duplicates = values
+        return {
+            "documentation_url": url,
+            "update_type": update_type,
+            "is_required": is_required,
+            "is_list": is_list,
+            "is_map": is_map,
+            "primitive_type": primitive_type,
+            "complex_type_id": type_ids.get(complex_name),
+            "list_allows_duplicates": duplicates,
+        }
+
+    writer.insert(diff.properties.table, [
+        {
+            "resource_id": resource_ids[owner] if kind == RESOURCE else None,
+            "property_type_id": type_ids[owner] if kind == PROPERTY_TYPE else None,
+            "property_name": name,
+            **property_columns(values),
+        }
+        for (kind, owner, name), values in diff.properties.inserts
+    ])
+    writer.update(diff.properties.table, [
+        {"row_id": row_id, **property_columns(values)} for row_id, _, values in diff.properties.updates
+    ])
+
+    writer.insert(diff.attributes.table, [
+        {
+            "resource_id": resource_ids[resource_type],
+            "attribute_name": name,
+            "primitive_type": primitive_type,
+            "is_list": is_list,
+            "list_item_type": item_type,
+        }
+        for (resource_type, name), (primitive_type, is_list, item_type) in diff.attributes.inserts
+    ])
+    writer.update(diff.attributes.table, [
+        {"row_id": row_id, "primitive_type": primitive_type, "is_list": is_list, "list_item_type": item_type}
+        for row_id, _, (primitive_type, is_list, item_type) in diff.attributes.updates
+    ])
+    writer.insert(diff.resource_regions.table, [
+        {"resource_id": resource_ids[resource_type], "region_id": region_ids[code]}
+        for (resource_type, code), _ in diff.resource_regions.inserts
+    ])
+
+    writer.delete(diff.property_types.table, diff.property_types.delete_ids())
+    writer.delete(diff.resources.table, diff.resources.delete_ids())
+    writer.delete(diff.regions.table, diff.regions.delete_ids())
+    return writer.rows
+
+
+# Changelog
+
+def _resources_by_type(merged: MergedCatalog) -> Dict[str, Set[str]]:
+    """Resource types reaching each property type through their property graphs."""
+    referenced_by: Dict[str, Set[Tuple[str, str]]] = {}
+    for kind, definitions in ((RESOURCE, merged.resources), (PROPERTY_TYPE, merged.property_types)):
+        for owner, definition in definitions.items():
+            for _, values in definition.properties:
+                if values[6] is not None:
+                    referenced_by.setdefault(values[6], set()).add((kind, owner))
+
+    reaching: Dict[str, Set[str]] = {}
+    for type_name in merged.property_types:
+        resources: Set[str] = set()
+        seen = {type_name}
+        stack = [type_name]
+        while stack:
+            for kind, owner in referenced_by.get(stack.pop(), ()):
+                if kind == RESOURCE:
+                    resources.add(owner)
+                elif owner not in seen:
+                    seen.add(owner)
+                    stack.append(owner)
+        reaching[type_name] = resources
+    return reaching
+
+
+def catalog_changes(db: Session, diff: CatalogDiff, merged: MergedCatalog) -> List[Change]:
+    """Resource-level changelog entries of an applied diff.
+
+    Added and removed resources get a single entry; changes to a property
+    type are recorded against every resource that reaches it.
+    """
+    resource_ids = {
+        name: row_id for row_id, name in db.exec(select(ResourceModel.id, ResourceModel.resource_type)).all()
+    }
+    added = {name for (name,), _ in diff.resources.inserts}
+    removed = {name: row_id for row_id, (name,) in diff.resources.deletes}
+    reaching = _resources_by_type(merged)
+    changes: List[Change] = []
+
+    changes.extend(Change(resource_ids[name], name, changelog.RESOURCE, None, changelog.ADDED) for name in sorted(added))
+    changes.extend(
+        Change(row_id, name, changelog.RESOURCE, None, changelog.UPDATED)
+        for row_id, (name,), _ in diff.resources.updates
+    )
+    changes.extend(Change(row_id, name, changelog.RESOURCE, None, changelog.REMOVED) for name, row_id in removed.items())
+
+    def entries(table: TableDiff) -> Iterator[Tuple[tuple, str]]:
+        yield from ((key, changelog.ADDED) for key, _ in table.inserts)
+        yield from ((key, changelog.UPDATED) for _, key, _ in table.updates)
+        yield from ((key, changelog.REMOVED) for _, key in table.deletes)
+
+    def resource_entry(resource_type: str, entity: str, name: str, change: str) -> None:
+        # Everything about added and removed resources is covered by their own entry
+        if resource_type in resource_ids and resource_type not in added and resource_type not in removed:
+            changes.append(Change(resource_ids[resource_type], resource_type, entity, name, change))
+
+    for (kind, owner, name), change in entries(diff.properties):
+        if kind == RESOURCE:
+            resource_entry(owner, changelog.PROPERTY, name, change)
+        else:
+            for resource_type in sorted(reaching.get(owner, ())):
+                resource_entry(resource_type, changelog.PROPERTY, f"{owner}.{name}", change)
+    for _, (type_name,), _ in diff.property_types.updates:
+        for resource_type in sorted(reaching.get(type_name, ())):
+            resource_entry(resource_type, changelog.PROPERTY_TYPE, type_name, changelog.UPDATED)
+    for (resource_type, name), change in entries(diff.attributes):
+        resource_entry(resource_type, changelog.ATTRIBUTE, name, change)
+    for (resource_type, region_code), change in entries(diff.resource_regions):
+        resource_entry(resource_type, changelog.REGION_AVAILABILITY, region_code, change)
+    for (region_code,), change in entries(diff.regions):
+        changes.append(Change(None, None, changelog.REGION, region_code, change))
+    return changes
+
+
+class IngestReport(NamedTuple):
+    diff: CatalogDiff
+    stages: List[Stage]
+    # Rows parsed over all regions, and left after deduplication
+    parsed_rows: int
+    merged_rows: int
+    conflicts: int
+    # Catalog version recorded for the changes, None when nothing was written
+    version: Optional[int]
+
+
+def ingest(
+    directory: Path,
+    workers: Optional[int] = None,
+    region_names: Optional[Dict[str, str]] = None,
+    dry_run: bool = False,
+) -> IngestReport:
+    """Run the whole pipeline against ``DATABASE_URL``; ``workers`` defaults to one per CPU."""
+    files = find_spec_files(directory)
+    if not files:
+        raise ValueError(f"No specification files found in {directory}")
+    workers = min(workers or os.cpu_count() or 1, len(files))
+
+    parse, dedupe, compare, write = Stage("parse"), Stage("dedupe"), Stage("diff"), Stage("write")
+    merged = parse_and_merge(files, workers, parse, dedupe)
+
+    version = None
+    with Session(engine) as db:
+        started = time.perf_counter()
+        diff, compare.rows = diff_catalog(db, merged, region_names or {})
+        compare.seconds = time.perf_counter() - started
+
+        if not dry_run and diff.changed:
+            started = time.perf_counter()
+            write.rows = apply_diff(db, diff)
+            # Loading an empty database is not worth a change per row
+            full = not (diff.resources.updates or diff.resources.deletes or diff.resources.unchanged)
+            changes = [] if full else catalog_changes(db, diff, merged)
+            version = record_catalog_version(db, changes, "ingest", write.rows, full=full)
+            db.commit()
+            write.seconds = time.perf_counter() - started
+    return IngestReport(
+        diff, [parse, dedupe, compare, write], parse.rows, merged.row_count(), merged.conflicts, version
+    )
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("directory", type=Path, help="directory with one specification per region")
+    parser.add_argument("--workers", type=int, help="parser processes, one per CPU by default (1 parses in-process)")
+    parser.add_argument("--region-names", type=Path, help="JSON object mapping region codes to display names")
+    parser.add_argument("--dry-run", action="store_true", help="report the changes without writing them")
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
+
+    region_names = json.loads(args.region_names.read_text()) if args.region_names else None
+    try:
+        report = ingest(args.directory, args.workers, region_names, args.dry_run)
+    except ValueError as exc:
+        logger.error("%s", exc)
+        return 2
+
+    diff = report.diff
+    logger.info("Parsed %d rows, %d after deduplicating regions", report.parsed_rows, report.merged_rows)
+    if report.conflicts:
+        logger.info("%d definitions differed between regions; the newest specification was used", report.conflicts)
+    for table in diff.tables():
+        logger.info("%s", table)
+    for stage in report.stages:
+        logger.info("%s", stage)
+
+    if args.dry_run:
+        logger.info("Dry run: %d rows would change", diff.changed)
+    elif diff.changed:
+        logger.info(
+            "Wrote %d rows as catalog version %d. Running servers pick it up within "
+            "CATALOG_VERSION_CHECK_SECONDS; rebuild the property tree store.", diff.changed, report.version,
+        )
+    else:
+        logger.info("Catalog is up to date")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,38 @@
+"""Approximate memory accounting for in-memory catalog structures."""
+import sys
+from types import FunctionType, MappingProxyType, ModuleType
+from typing import Any
+
+_SKIPPED_TYPES = (type, ModuleType, FunctionType)
+
+
+def approximate_size(obj: Any) -> int:
+    """Approximate deep size of an object graph in bytes.
+
+    Objects reachable more than once (shared subtrees, interned strings) are
+    counted a single time.
+    """
+    seen = set()
+    total = 0
+    stack = [obj]
+
+    while stack:
+        current = stack.pop()
+        if isinstance(current, _SKIPPED_TYPES) or id(current) in seen:
+            continue
+        seen.add(id(current))
+        total += sys.getsizeof(current)
+
+        if isinstance(current, (dict, MappingProxyType)):
+            stack.extend(current.keys())
+            stack.extend(current.values())
+        elif isinstance(current, (list, tuple, set, frozenset)):
+            stack.extend(current)
+        else:
+            if hasattr(current, "__dict__"):
+                stack.append(vars(current))
+            for slot in getattr(type(current), "__slots__", ()):
+                if hasattr(current, slot):
+                    stack.append(getattr(current, slot))
+
+    return total
@@ -0,0 +1,133 @@
+"""Bulk loading of the property graph reachable from resources or types."""
+from typing import Dict, Iterable, List, Set, Tuple
+from sqlmodel import Session, select
+from sqlalchemy.orm import aliased
+from app.models import Property as PropertyModel, PropertyType as PropertyTypeModel
+from app.catalog.rows import PropertyRow, PropertyTypeRow, row_columns
+
+PROPERTY_COLUMNS = row_columns(PropertyModel, PropertyRow)
+PROPERTY_TYPE_COLUMNS = row_columns(PropertyTypeModel, PropertyTypeRow)
+
+
+class PropertyGraph:
+    """Every property and property type reachable from a set of root properties.
+
+    Loaded in a fixed number of queries so that trees can be built in memory
+    without going back to the database for each complex property. Rows are
+    :class:`~app.catalog.rows.PropertyRow`/``PropertyTypeRow`` tuples.
+    """
+
+    def __init__(
+        self,
+        types: Dict[int, PropertyTypeRow],
+        properties_by_type: Dict[int, List[PropertyRow]],
+        root_properties: Dict[int, List[PropertyRow]],
+    ):
+        self.types = types
+        self.properties_by_type = properties_by_type
+        self.root_properties = root_properties
+
+
+def _reachable_types_cte(anchor):
+    """Recursive CTE of every property type id reachable from the anchor select.
+
+    UNION (rather than UNION ALL) makes the recursion terminate on cyclic types.
+    """
+    reachable = anchor.cte("reachable_types", recursive=True)
+    nested = aliased(PropertyModel)
+    return reachable.union(
+        select(nested.complex_type_id)
+        .join(reachable, nested.property_type_id == reachable.c.type_id)
+        .where(nested.complex_type_id.is_not(None))
+    )
+
+
+def _load_types(
+    db: Session, reachable
+) -> Tuple[Dict[int, PropertyTypeRow], Dict[int, List[PropertyRow]]]:
+    """Load property types and their properties for every id in the CTE."""
+    type_ids = select(reachable.c.type_id)
+
+    types = {
+        row[0]: PropertyTypeRow(*row)
+        for row in db.exec(
+            select(*PROPERTY_TYPE_COLUMNS).where(PropertyTypeModel.id.in_(type_ids))
+        ).all()
+    }
+
+    properties_by_type: Dict[int, List[PropertyRow]] = {}
+    nested_statement = (
+        select(*PROPERTY_COLUMNS)
+        .where(PropertyModel.property_type_id.in_(type_ids))
+        .order_by(PropertyModel.id)
+    )
+    for row in db.exec(nested_statement).all():
+        prop = PropertyRow(*row)
+        properties_by_type.setdefault(prop.property_type_id, []).append(prop)
+
+    return types, properties_by_type
+
+
+def load_property_graph(db: Session, resource_ids: Iterable[int]) -> PropertyGraph:
+    """Load the complete property graph of one or more resources in three queries."""
+    resource_ids = list(resource_ids)
+
+    root_properties: Dict[int, List[PropertyRow]] = {
+        resource_id: [] for resource_id in resource_ids
+    }
+    root_statement = (
+        select(*PROPERTY_COLUMNS)
+        .where(PropertyModel.resource_id.in_(resource_ids))
+        .order_by(PropertyModel.property_name)
+    )
+    for row in db.exec(root_statement).all():
+        prop = PropertyRow(*row)
+        root_properties[prop.resource_id].append(prop)
+
+    reachable = _reachable_types_cte(
+        select(PropertyModel.complex_type_id.label("type_id"))
+        .where(PropertyModel.resource_id.in_(resource_ids))
+        .where(PropertyModel.complex_type_id.is_not(None))
+    )
+    types, properties_by_type = _load_types(db, reachable)
+
+    return PropertyGraph(types, properties_by_type, root_properties)
+
+
+def load_type_graph(db: Session, type_ids: Iterable[int]) -> PropertyGraph:
+    """Load every property type reachable from the given type ids."""
+    type_ids = [type_id for type_id in type_ids if type_id is not None]
+
+    reachable = _reachable_types_cte(
+        select(PropertyTypeModel.id.label("type_id"))
+        .where(PropertyTypeModel.id.in_(type_ids))
+    )
+    types, properties_by_type = _load_types(db, reachable)
+
+    return PropertyGraph(types, properties_by_type, {})
+
+
+def reachable_types_by_resource(db: Session, resource_ids: Iterable[int]) -> Dict[int, Set[int]]:
+    """Ids of every property type reachable from each resource, in one query."""
+    resource_ids = list(resource_ids)
+
+    reachable = (
+        select(
+            PropertyModel.resource_id.label("root_id"),
+            PropertyModel.complex_type_id.label("type_id"),
+        )
+        .where(PropertyModel.resource_id.in_(resource_ids))
+        .where(PropertyModel.complex_type_id.is_not(None))
+        .cte("reachable_types_by_resource", recursive=True)
+    )
+    nested = aliased(PropertyModel)
+    reachable = reachable.union(
+        select(reachable.c.root_id, nested.complex_type_id)
+        .join(reachable, nested.property_type_id == reachable.c.type_id)
+        .where(nested.complex_type_id.is_not(None))
+    )
+
+    result: Dict[int, Set[int]] = {resource_id: set() for resource_id in resource_ids}
+    for root_id, type_id in db.exec(select(reachable.c.root_id, reachable.c.type_id)).all():
+        result[root_id].add(type_id)
+    return result
@@ -0,0 +1,168 @@
+"""Per-region bitsets over resources.
+
+Every resource gets a bit position in ``resource_type`` order and every
+region a Python int with the bits of the resources available in it. Region
+filters, "available in all of X, Y, Z" and "in X but missing from Y" then
+become a few big-int ``&``/``|`` operations, and reading the set bits in
+ascending order yields resources already sorted by type.
+"""
+import threading
+from types import MappingProxyType
+from typing import Dict, Iterable, List, Mapping, Optional, Sequence, Tuple
+from sqlmodel import Session, select
+from app.models import (
+    Region as RegionModel,
+    Resource as ResourceModel,
+    ResourceRegion,
+)
+from app.catalog.rows import RegionRow, ResourceRow, ilike_pattern
+from app.catalog.snapshot import CatalogSnapshot, get_snapshot
+from app.catalog.version import get_catalog_version
+
+
+class RegionIndex:
+    """Immutable region -> resource bitset index."""
+
+    def __init__(
+        self,
+        regions: Sequence[RegionRow],
+        resources: Sequence[ResourceRow],
+        resource_regions: Iterable[Tuple[int, int]],
+    ):
+        # Regions ordered by region_code, resources ordered by resource_type
+        self.regions = tuple(regions)
+        self.resources = tuple(resources)
+        position = {resource.id: index for index, resource in enumerate(self.resources)}
+
+        positions_by_region: Dict[int, List[int]] = {}
+        for resource_id, region_id in resource_regions:
+            if resource_id in position:
+                positions_by_region.setdefault(region_id, []).append(position[resource_id])
+
+        bits_by_region: Dict[int, int] = {}
+        for region_id, positions in positions_by_region.items():
+            bits = 0
+            for index in positions:
+                bits |= 1 << index
+            bits_by_region[region_id] = bits
+        self.bits_by_region: Mapping[int, int] = MappingProxyType(bits_by_region)
+
+    @classmethod
+    def from_snapshot(cls, snapshot: CatalogSnapshot) -> "RegionIndex":
+        """Build from an in-memory snapshot without touching the database."""
+        return cls(
+            snapshot.regions,
+            snapshot.resources,
+            (
+                (resource_id, region_id)
+                for resource_id, region_ids in snapshot.region_ids_by_resource.items()
+                for region_id in region_ids
+            ),
+        )
+
+    @classmethod
+    def load(cls, db: Session) -> "RegionIndex":
+        """Build from the regions, resources and resource_regions tables."""
+        regions = [
+            RegionRow(*row)
+            for row in db.exec(
+                select(RegionModel.id, RegionModel.region_code, RegionModel.region_name)
+                .order_by(RegionModel.region_code)
+            ).all()
+        ]
+        resources = [
+            ResourceRow(*row)
+            for row in db.exec(
+                select(ResourceModel.id, ResourceModel.resource_type, ResourceModel.documentation_url)
+                .order_by(ResourceModel.resource_type)
+            ).all()
+        ]
+        resource_regions = db.exec(select(ResourceRegion.resource_id, ResourceRegion.region_id)).all()
+        return cls(regions, resources, resource_regions)
+
+    @property
+    def all_bits(self) -> int:
+        """Bits of every resource in the catalog."""
+        return (1 << len(self.resources)) - 1
+
+    def region_bits(self, region_id: int) -> int:
+        """Resources available in one region (0 for unknown regions)."""
+        return self.bits_by_region.get(region_id, 0)
+
+    def intersection(self, region_ids: Iterable[int]) -> int:
+        """Resources available in every one of the regions."""
+        region_ids = list(region_ids)
+        if not region_ids:
+            return 0
+        bits = self.all_bits
+        for region_id in region_ids:
+            bits &= self.region_bits(region_id)
+        return bits
+
+    def union(self, region_ids: Iterable[int]) -> int:
+        """Resources available in at least one of the regions."""
+        bits = 0
+        for region_id in region_ids:
+            bits |= self.region_bits(region_id)
+        return bits
+
+    def difference(self, region_id: int, excluded_region_ids: Iterable[int]) -> int:
+        """Resources available in ``region_id`` but in none of the excluded regions."""
+        return self.region_bits(region_id) & ~self.union(excluded_region_ids)
+
+    def resources_in(self, bits: int) -> List[ResourceRow]:
+        """Resources for a bitset, ordered by resource_type."""
+        resources = []
+        while bits:
+            lowest = bits & -bits
+            resources.append(self.resources[lowest.bit_length() - 1])
+            bits ^= lowest
+        return resources
+
+    def search(self, query: str, region_id: Optional[int] = None) -> List[ResourceRow]:
+        """Resources whose type matches ``ILIKE '%query%'``, ordered by resource_type."""
+        bits = self.region_bits(region_id) if region_id else self.all_bits
+        pattern = ilike_pattern(query)
+        return [resource for resource in self.resources_in(bits) if pattern.search(resource.resource_type)]
+
+    def counts(self) -> List[Tuple[RegionRow, int]]:
+        """Every region with its number of available resources."""
+        return [(region, self.region_bits(region.id).bit_count()) for region in self.regions]
+
+    def stats(self) -> dict:
+        """Index size for reporting."""
+        return {
+            "regions": len(self.regions),
+            "resources": len(self.resources),
+            "bitset_bytes": sum((bits.bit_length() + 7) // 8 for bits in self.bits_by_region.values()),
+        }
+
+
+_index: Optional[RegionIndex] = None
+_index_version = 0
+_build_lock = threading.Lock()
+
+
+def get_region_index() -> Optional[RegionIndex]:
+    """Index for the current catalog version, or None if it still has to be built."""
+    if _index is not None and _index_version == get_catalog_version():
+        return _index
+    return None
+
+
+def load_region_index(db: Session) -> RegionIndex:
+    """Build (or reuse) the index for the current catalog version.
+
+    Uses the catalog snapshot when one is loaded, otherwise ``db``.
+    """
+    global _index, _index_version
+    with _build_lock:
+        index = get_region_index()
+        if index is not None:
+            return index
+
+        version = get_catalog_version()
+        snapshot = get_snapshot()
+        index = RegionIndex.from_snapshot(snapshot) if snapshot is not None else RegionIndex.load(db)
+        _index, _index_version = index, version
+        return index
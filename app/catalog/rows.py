@@ -0,0 +1,70 @@
+"""Plain tuple rows used for catalog data held in memory.
+
+ORM instances carry SQLAlchemy state and Pydantic machinery, about 1.7 KB
+each. Anything kept beyond a single query (snapshots, property graphs,
+indexes) stores these NamedTuples instead, together with the helpers that
+read and filter them.
+"""
+import re
+from typing import NamedTuple, Optional
+
+
+class RegionRow(NamedTuple):
+    id: int
+    region_code: str
+    region_name: str
+
+
+class ResourceRow(NamedTuple):
+    id: int
+    resource_type: str
+    documentation_url: Optional[str]
+
+
+class AttributeRow(NamedTuple):
+    id: int
+    resource_id: int
+    attribute_name: str
+    primitive_type: Optional[str]
+    is_list: Optional[bool]
+    list_item_type: Optional[str]
+
+
+class PropertyTypeRow(NamedTuple):
+    id: int
+    resource_id: Optional[int]
+    type_name: str
+    documentation_url: Optional[str]
+
+
+class PropertyRow(NamedTuple):
+    id: int
+    resource_id: Optional[int]
+    property_type_id: Optional[int]
+    property_name: str
+    documentation_url: Optional[str]
+    update_type: Optional[str]
+    is_required: Optional[bool]
+    is_list: Optional[bool]
+    is_map: Optional[bool]
+    primitive_type: Optional[str]
+    complex_type_id: Optional[int]
+    list_allows_duplicates: Optional[bool]
+
+
+def row_columns(model, row_type) -> list:
+    """Model columns in the field order of a row tuple."""
+    return [getattr(model, field) for field in row_type._fields]
+
+
+def ilike_pattern(query: str) -> "re.Pattern":
+    """Compile an ILIKE '%query%' filter into an equivalent regex."""
+    parts = []
+    for char in query:
+        if char == "%":
+            parts.append(".*")
+        elif char == "_":
+            parts.append(".")
+        else:
+            parts.append(re.escape(char))
+    return re.compile("".join(parts), re.IGNORECASE | re.DOTALL)
@@ -0,0 +1,358 @@
+"""In-process ranked search over resource types and property names.
+
+``ILIKE '%query%'`` cannot use an index and gives no ranking. This index
+splits every resource type into tokens (``AWS::EC2::SecurityGroup`` ->
+``aws``, ``ec2``, ``securitygroup``, ``security``, ``group``) and matches
+each query token exactly, by prefix, as prefixes of consecutive camel-case
+words (``secgr`` -> ``security`` + ``group``) or, for longer tokens,
+within a small edit distance. It is rebuilt whenever the catalog version
+changes.
+"""
+import re
+import threading
+from bisect import bisect_left
+from typing import Dict, FrozenSet, Iterable, Iterator, List, NamedTuple, Optional, Sequence, Set, Tuple
+from sqlmodel import Session, select
+from app.models import (
+    Resource as ResourceModel,
+    ResourceRegion,
+    Property as PropertyModel,
+)
+from app.catalog.rows import ResourceRow
+from app.catalog.snapshot import CatalogSnapshot, get_snapshot
+from app.catalog.version import get_catalog_version
+
+# Per query token, by how it matched
+EXACT_SCORE = 3.0
+PREFIX_SCORE = 2.0
+FUZZY_SCORE = 1.0
+# Property-name matches count for less than resource-type matches
+PROPERTY_WEIGHT = 0.5
+# Whole-query bonuses
+FULL_MATCH_BONUS = 10.0
+SUBSTRING_BONUS = 1.0
+# Abbreviations are looked up by their first letters
+ABBREVIATION_KEY_SIZE = 3
+
+_CAMEL_CASE = re.compile(r"[A-Z]+\d*(?=[A-Z][a-z])|[A-Z]?[a-z]+\d*|[A-Z]+\d*|\d+")
+_SEPARATORS = re.compile(r"::|[\s.:/_-]+")
+
+
+def tokenize(text: str, compounds: Optional[Dict[str, Tuple[str, ...]]] = None) -> List[str]:
+    """Lower-cased tokens of a type or property name.
+
+    Each ``::``-separated segment yields itself and its camel-case words,
+    so ``SecurityGroup`` matches both ``securitygroup`` and ``group``.
+    The words of multi-word segments are recorded in ``compounds``.
+    """
+    tokens: List[str] = []
+    for segment in _SEPARATORS.split(text):
+        if not segment:
+            continue
+        token = segment.lower()
+        tokens.append(token)
+        words = _CAMEL_CASE.findall(segment)
+        if len(words) > 1:
+            words = tuple(word.lower() for word in words)
+            tokens.extend(words)
+            if compounds is not None:
+                compounds[token] = words
+    return tokens
+
+
+def _query_tokens(query: str) -> List[str]:
+    """Distinct segments of a query; camel case is not split so "SecurityGr" stays a prefix."""
+    return list(dict.fromkeys(
+        segment.lower() for segment in _SEPARATORS.split(query) if segment
+    ))
+
+
+def _abbreviates(token: str, words: Sequence[str], start: int, pieces: int = 0) -> bool:
+    """Whether token is non-empty prefixes of at least two consecutive words from ``words[start]``.
+
+    ``secgr`` and ``secgroup`` abbreviate ``security``, ``group``.
+    """
+    if not token:
+        return pieces >= 2
+    if start >= len(words):
+        return False
+    word = words[start]
+    # Longest piece first: "secgroup" is "sec" + "group", not "s" + ...
+    for length in range(min(len(token), len(word)), 0, -1):
+        if token.startswith(word[:length]) and _abbreviates(token[length:], words, start + 1, pieces + 1):
+            return True
+    return False
+
+
+def _abbreviation_keys(words: Sequence[str], start: int, size: int) -> Iterator[str]:
+    """Every ``size``-letter start of an abbreviation of the words from ``words[start]``."""
+    if size == 0:
+        yield ""
+        return
+    if start >= len(words):
+        return
+    word = words[start]
+    for length in range(1, min(size, len(word)) + 1):
+        for rest in _abbreviation_keys(words, start + 1, size - length):
+            yield word[:length] + rest
+
+
+def _max_distance(token: str) -> int:
+    """Edit distance allowed for a fuzzy match of a query token."""
+    if len(token) < 4:
+        return 0
+    return 1 if len(token) < 8 else 2
+
+
+def _trigrams(token: str) -> Set[str]:
+    padded = f"  {token} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+def _within_distance(a: str, b: str, limit: int) -> bool:
+    """Whether the Levenshtein distance of a and b is at most limit."""
+    if abs(len(a) - len(b)) > limit:
+        return False
+    previous = list(range(len(b) + 1))
+    for i, char_a in enumerate(a, 1):
+        current = [i]
+        for j, char_b in enumerate(b, 1):
+            current.append(min(
+                previous[j] + 1,
+                current[j - 1] + 1,
+                previous[j - 1] + (char_a != char_b),
+            ))
+        if min(current) > limit:
+            return False
+        previous = current
+    return previous[-1] <= limit
+
+
+class SearchHit(NamedTuple):
+    resource: ResourceRow
+    score: float
+    matched_properties: Tuple[str, ...]
+
+
+class SearchIndex:
+    """Inverted index from tokens to resources, with prefix and fuzzy lookup."""
+
+    def __init__(
+        self,
+        resources: Sequence[ResourceRow],
+        resource_regions: Iterable[Tuple[int, int]],
+        property_names: Iterable[Tuple[int, str]],
+    ):
+        self.resources = tuple(resources)
+        position = {resource.id: index for index, resource in enumerate(self.resources)}
+
+        regions: Dict[int, Set[int]] = {}
+        for resource_id, region_id in resource_regions:
+            if resource_id in position:
+                regions.setdefault(region_id, set()).add(position[resource_id])
+        self.resources_by_region: Dict[int, FrozenSet[int]] = {
+            region_id: frozenset(indexes) for region_id, indexes in regions.items()
+        }
+
+        # Camel-case words of multi-word tokens, for abbreviated query tokens
+        compounds: Dict[str, Tuple[str, ...]] = {}
+        type_postings: Dict[str, Set[int]] = {}
+        for index, resource in enumerate(self.resources):
+            for token in tokenize(resource.resource_type, compounds):
+                type_postings.setdefault(token, set()).add(index)
+        self.type_postings: Dict[str, FrozenSet[int]] = {
+            token: frozenset(indexes) for token, indexes in type_postings.items()
+        }
+
+        # token -> resource position -> property names containing the token
+        property_postings: Dict[str, Dict[int, Set[str]]] = {}
+        for resource_id, name in property_names:
+            index = position.get(resource_id)
+            if index is None:
+                continue
+            for token in tokenize(name, compounds):
+                property_postings.setdefault(token, {}).setdefault(index, set()).add(name)
+        self.property_postings = property_postings
+
+        self.vocabulary = sorted(set(self.type_postings) | set(self.property_postings))
+        trigram_index: Dict[str, Set[str]] = {}
+        for token in self.vocabulary:
+            for trigram in _trigrams(token):
+                trigram_index.setdefault(trigram, set()).add(token)
+        self.trigram_index = trigram_index
+
+        self.compounds = compounds
+        # First two and three letters of an abbreviation -> (compound, word position it starts at)
+        abbreviation_starts: Dict[str, Set[Tuple[str, int]]] = {}
+        for token, words in compounds.items():
+            for start in range(len(words) - 1):
+                for size in (2, ABBREVIATION_KEY_SIZE):
+                    for key in _abbreviation_keys(words, start, size):
+                        abbreviation_starts.setdefault(key, set()).add((token, start))
+        self.abbreviation_starts = abbreviation_starts
+
+    @classmethod
+    def from_snapshot(cls, snapshot: CatalogSnapshot) -> "SearchIndex":
+        """Build from an in-memory snapshot without touching the database."""
+        return cls(
+            snapshot.resources,
+            (
+                (resource_id, region_id)
+                for resource_id, region_ids in snapshot.region_ids_by_resource.items()
+                for region_id in region_ids
+            ),
+            (
+                (resource_id, prop.property_name)
+                for resource_id, props in snapshot.graph.root_properties.items()
+                for prop in props
+            ),
+        )
+
+    @classmethod
+    def load(cls, db: Session) -> "SearchIndex":
+        """Build from the resources, resource_regions and root property names tables."""
+        resources = [
+            ResourceRow(*row)
+            for row in db.exec(
+                select(ResourceModel.id, ResourceModel.resource_type, ResourceModel.documentation_url)
+                .order_by(ResourceModel.resource_type)
+            ).all()
+        ]
+        resource_regions = db.exec(select(ResourceRegion.resource_id, ResourceRegion.region_id)).all()
+        property_names = db.exec(
+            select(PropertyModel.resource_id, PropertyModel.property_name)
+            .where(PropertyModel.resource_id.is_not(None))
+        ).all()
+        return cls(resources, resource_regions, property_names)
+
+    def _expand(self, token: str) -> List[Tuple[str, float]]:
+        """Vocabulary tokens matching a query token, with their match score."""
+        matches: Dict[str, float] = {}
+
+        for position in range(bisect_left(self.vocabulary, token), len(self.vocabulary)):
+            candidate = self.vocabulary[position]
+            if not candidate.startswith(token):
+                break
+            matches[candidate] = EXACT_SCORE if candidate == token else PREFIX_SCORE
+
+        if len(token) > 1:
+            for candidate, start in self.abbreviation_starts.get(token[:ABBREVIATION_KEY_SIZE], ()):
+                if candidate not in matches and _abbreviates(token, self.compounds[candidate], start):
+                    matches[candidate] = PREFIX_SCORE
+
+        limit = _max_distance(token)
+        if limit:
+            trigrams = _trigrams(token)
+            # Each edit destroys at most three trigrams
+            needed = max(1, len(trigrams) - 3 * limit)
+            shared: Dict[str, int] = {}
+            for trigram in trigrams:
+                for candidate in self.trigram_index.get(trigram, ()):
+                    shared[candidate] = shared.get(candidate, 0) + 1
+            for candidate, count in shared.items():
+                if count >= needed and candidate not in matches and _within_distance(token, candidate, limit):
+                    matches[candidate] = FUZZY_SCORE
+
+        return list(matches.items())
+
+    def search(
+        self,
+        query: str,
+        region_id: Optional[int] = None,
+        include_properties: bool = False,
+        limit: int = 20,
+    ) -> List[SearchHit]:
+        """Resources matching every query token, best first.
+
+        A token matches a resource through its type or, with
+        ``include_properties``, one of its root property names.
+        """
+        tokens = _query_tokens(query)
+        if not tokens:
+            return []
+
+        allowed = self.resources_by_region.get(region_id, frozenset()) if region_id else None
+        scores: Optional[Dict[int, float]] = None
+        matched_properties: Dict[int, Set[str]] = {}
+
+        for token in tokens:
+            token_scores: Dict[int, float] = {}
+            for candidate, score in self._expand(token):
+                for index in self.type_postings.get(candidate, ()):
+                    if score > token_scores.get(index, 0.0):
+                        token_scores[index] = score
+                if include_properties:
+                    for index, names in self.property_postings.get(candidate, {}).items():
+                        weighted = score * PROPERTY_WEIGHT
+                        if weighted > token_scores.get(index, 0.0):
+                            token_scores[index] = weighted
+                        matched_properties.setdefault(index, set()).update(names)
+
+            if scores is None:
+                scores = token_scores
+            else:
+                scores = {
+                    index: total + token_scores[index]
+                    for index, total in scores.items()
+                    if index in token_scores
+                }
+            if not scores:
+                return []
+
+        needle = query.strip().lower()
+        hits = []
+        for index, score in scores.items():
+            if allowed is not None and index not in allowed:
+                continue
+            resource = self.resources[index]
+            resource_type = resource.resource_type.lower()
+            if resource_type == needle:
+                score += FULL_MATCH_BONUS
+            elif needle in resource_type:
+                score += SUBSTRING_BONUS
+            hits.append(SearchHit(
+                resource=resource,
+                score=score,
+                matched_properties=tuple(sorted(matched_properties.get(index, ()))),
+            ))
+
+        hits.sort(key=lambda hit: (-hit.score, len(hit.resource.resource_type), hit.resource.resource_type))
+        return hits[:max(limit, 0)]
+
+    def stats(self) -> dict:
+        """Index size for reporting."""
+        return {
+            "resources": len(self.resources),
+            "tokens": len(self.vocabulary),
+            "trigrams": len(self.trigram_index),
+        }
+
+
+_index: Optional[SearchIndex] = None
+_index_version = 0
+_build_lock = threading.Lock()
+
+
+def get_search_index() -> Optional[SearchIndex]:
+    """Index for the current catalog version, or None if it still has to be built."""
+    if _index is not None and _index_version == get_catalog_version():
+        return _index
+    return None
+
+
+def load_search_index(db: Session) -> SearchIndex:
+    """Build (or reuse) the index for the current catalog version.
+
+    Uses the catalog snapshot when one is loaded, otherwise ``db``.
+    """
+    global _index, _index_version
+    with _build_lock:
+        index = get_search_index()
+        if index is not None:
+            return index
+
+        version = get_catalog_version()
+        snapshot = get_snapshot()
+        index = SearchIndex.from_snapshot(snapshot) if snapshot is not None else SearchIndex.load(db)
+        _index, _index_version = index, version
+        return index
@@ -0,0 +1,542 @@
+"""Catalog snapshot as a memory-mapped file shared by worker processes.
+
+With several worker processes, every in-memory snapshot would be a private
+copy of the whole catalog. Instead the snapshot's rows and indexes are
+written once into a flat file of fixed-width records, and every worker maps
+it read-only: the pages live once in the page cache (use a path on tmpfs,
+e.g. ``/dev/shm``, to keep it in shared memory) and rows are decoded into
+the usual :mod:`~app.catalog.rows` tuples only when a request reads them.
+
+Layout: a header with the catalog version and fingerprint, a section table,
+then 8-byte aligned sections. Strings are deduplicated into one table and
+referenced by index. Rows of one kind are fixed-width records; groups
+(properties of a resource or type, regions of a resource, ...) are
+contiguous runs of records addressed through an offsets array, and id
+lookups bisect a sorted id array. Everything is native-endian: the file is
+built on the host that maps it.
+
+A new file is published by writing a temporary file and renaming it over
+the old one. Workers that still map the old file keep reading it until
+they notice the new inode and swap, so requests never see a mix of both.
+"""
+import mmap
+import os
+import struct
+import time
+from array import array
+from bisect import bisect_left
+from collections.abc import Mapping, Sequence
+from contextlib import contextmanager
+from typing import Callable, Dict, Iterable, Iterator, List, NamedTuple, Optional, Tuple
+from app.catalog.rows import AttributeRow, PropertyRow, PropertyTypeRow, RegionRow, ResourceRow
+
+try:
+    import fcntl
+except ImportError:  # Windows: no cross-process lock, a single worker is assumed
+    fcntl = None
+
+MAGIC = b"SMCATLG1"
+HEADER = struct.Struct("=8sqd16sI")  # magic, catalog version, loaded_at, fingerprint, sections
+SECTION = struct.Struct("=QQ")  # offset, length in bytes
+ALIGNMENT = 8
+
+# Stored in place of None: ints and string references are int32, bools int8
+NULL_INT = -(2 ** 31)
+NULL_REF = -1
+NULL_BOOL = -1
+
+# Field kinds per row type: i = int, s = string, b = bool (all nullable)
+ROW_KINDS = {
+    RegionRow: "iss",
+    ResourceRow: "iss",
+    AttributeRow: "iissbs",
+    PropertyTypeRow: "iiss",
+    PropertyRow: "iiisssbbbsib",
+}
+_FORMATS = {"i": "i", "s": "i", "b": "b"}
+
+# Sections in file order
+SECTIONS = (
+    "string_offsets", "string_data",
+    "regions", "region_ids", "region_positions",
+    "resources", "resource_ids", "resource_positions", "resource_type_order",
+    "resource_region_offsets", "resource_region_ids",
+    "region_resource_offsets", "region_resource_positions",
+    "attributes", "attribute_offsets",
+    "property_types", "property_type_ids",
+    "root_properties", "root_property_offsets",
+    "nested_properties", "nested_property_offsets",
+)
+
+
+class CatalogTables(NamedTuple):
+    """Catalog rows as read from the database, in the snapshot's orders."""
+    regions: Tuple[RegionRow, ...]  # by region_code
+    resources: Tuple[ResourceRow, ...]  # by resource_type
+    resource_regions: List[Tuple[int, int]]  # (resource_id, region_id) by resource_regions.id
+    attributes: List[AttributeRow]  # by id
+    property_types: List[PropertyTypeRow]
+    root_properties: List[PropertyRow]  # by property_name
+    nested_properties: List[PropertyRow]  # by id
+
+
+class _RowCodec:
+    """Packs rows of one type into fixed-width records and decodes them back."""
+
+    def __init__(self, row_type):
+        self.row_type = row_type
+        self.kinds = ROW_KINDS[row_type]
+        self.record = struct.Struct("=" + "".join(_FORMATS[kind] for kind in self.kinds))
+
+    def pack(self, row: tuple, string_ids: Callable[[Optional[str]], int]) -> bytes:
+        values = []
+        for kind, value in zip(self.kinds, row):
+            if kind == "s":
+                values.append(string_ids(value))
+            elif kind == "b":
+                values.append(NULL_BOOL if value is None else int(bool(value)))
+            else:
+                values.append(NULL_INT if value is None else value)
+        return self.record.pack(*values)
+
+    def decoder(self, buffer, strings: "_Strings") -> Callable[[int], tuple]:
+        """Function decoding the record at an index of ``buffer``."""
+        unpack_from = self.record.unpack_from
+        size = self.record.size
+        make = self.row_type._make
+        converters = []
+        for kind in self.kinds:
+            if kind == "s":
+                converters.append(strings.get)
+            elif kind == "b":
+                converters.append(_bool)
+            else:
+                converters.append(_int)
+        converters = tuple(converters)
+
+        def decode(index: int) -> tuple:
+            values = unpack_from(buffer, index * size)
+            return make([convert(value) for convert, value in zip(converters, values)])
+
+        return decode
+
+
+def _int(value: int) -> Optional[int]:
+    return None if value == NULL_INT else value
+
+
+def _bool(value: int) -> Optional[bool]:
+    return None if value == NULL_BOOL else bool(value)
+
+
+class _Strings:
+    """String table: UTF-8 data addressed by an offsets array."""
+
+    def __init__(self, offsets: memoryview, data: memoryview):
+        self.offsets = offsets
+        self.data = data
+
+    def get(self, reference: int) -> Optional[str]:
+        if reference == NULL_REF:
+            return None
+        return str(self.data[self.offsets[reference]:self.offsets[reference + 1]], "utf-8")
+
+
+class _Records(Sequence):
+    """Sequence of rows decoded from fixed-width records on access."""
+
+    def __init__(self, decode: Callable[[int], tuple], start: int, stop: int):
+        self._decode = decode
+        self._start = start
+        self._stop = stop
+
+    def __len__(self) -> int:
+        return self._stop - self._start
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self._decode(self._start + i) for i in range(*index.indices(len(self)))]
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError(index)
+        return self._decode(self._start + index)
+
+    def __iter__(self) -> Iterator[tuple]:
+        decode = self._decode
+        for index in range(self._start, self._stop):
+            yield decode(index)
+
+
+class _PositionRecords(Sequence):
+    """Rows at a list of record positions (e.g. a region's resources)."""
+
+    def __init__(self, decode: Callable[[int], tuple], positions: memoryview):
+        self._decode = decode
+        self._positions = positions
+
+    def __len__(self) -> int:
+        return len(self._positions)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self._decode(position) for position in self._positions[index]]
+        return self._decode(self._positions[index])
+
+    def __iter__(self) -> Iterator[tuple]:
+        decode = self._decode
+        for position in self._positions:
+            yield decode(position)
+
+
+class _IdIndex(Mapping):
+    """Mapping of ids to record positions through a sorted id array.
+
+    ``rank`` is the index of an id in the sorted array; runs keyed by id are
+    stored in that order.
+    """
+
+    def __init__(self, ids: memoryview, positions: Optional[memoryview] = None):
+        self._ids = ids
+        self._positions = positions
+
+    def rank(self, key: int) -> int:
+        index = bisect_left(self._ids, key) if isinstance(key, int) else len(self._ids)
+        if index == len(self._ids) or self._ids[index] != key:
+            raise KeyError(key)
+        return index
+
+    def __getitem__(self, key: int) -> int:
+        index = self.rank(key)
+        return index if self._positions is None else self._positions[index]
+
+    def __iter__(self) -> Iterator[int]:
+        return iter(self._ids)
+
+    def __len__(self) -> int:
+        return len(self._ids)
+
+
+class _RowsById(Mapping):
+    """Mapping of ids to their decoded row."""
+
+    def __init__(self, index: _IdIndex, decode: Callable[[int], tuple]):
+        self._index = index
+        self._decode = decode
+
+    def __getitem__(self, key: int) -> tuple:
+        return self._decode(self._index[key])
+
+    def __contains__(self, key) -> bool:
+        return key in self._index
+
+    def __iter__(self) -> Iterator[int]:
+        return iter(self._index)
+
+    def __len__(self) -> int:
+        return len(self._index)
+
+
+class _Groups(Mapping):
+    """Mapping of a key to its run of values; keys with an empty run are absent.
+
+    ``offsets`` holds one start per key position plus the final end, the
+    runs themselves are made by ``run(start, stop)``.
+    """
+
+    def __init__(self, index: _IdIndex, offsets: memoryview, run: Callable[[int, int], Sequence]):
+        self._index = index
+        self._offsets = offsets
+        self._run = run
+
+    def __getitem__(self, key: int) -> Sequence:
+        rank = self._index.rank(key)
+        start, stop = self._offsets[rank], self._offsets[rank + 1]
+        if start == stop:
+            raise KeyError(key)
+        return self._run(start, stop)
+
+    def __iter__(self) -> Iterator[int]:
+        offsets = self._offsets
+        for rank, key in enumerate(self._index):
+            if offsets[rank] != offsets[rank + 1]:
+                yield key
+
+    def __len__(self) -> int:
+        return sum(1 for _ in self)
+
+
+class _ResourceIdsByType(Mapping):
+    """resource_type -> id, bisecting resources in Python string order."""
+
+    def __init__(self, resources: _Records, order: memoryview):
+        self._resources = resources
+        self._order = order
+
+    def __getitem__(self, key: str) -> int:
+        low, high = 0, len(self._order)
+        while low < high:
+            middle = (low + high) // 2
+            if self._resources[self._order[middle]].resource_type < key:
+                low = middle + 1
+            else:
+                high = middle
+        if low < len(self._order):
+            resource = self._resources[self._order[low]]
+            if resource.resource_type == key:
+                return resource.id
+        raise KeyError(key)
+
+    def __iter__(self) -> Iterator[str]:
+        for position in self._order:
+            yield self._resources[position].resource_type
+
+    def __len__(self) -> int:
+        return len(self._order)
+
+
+class SharedCatalogFile:
+    """Read-only view of a mapped catalog file with the snapshot's lookups."""
+
+    def __init__(self, path: str):
+        self.path = path
+        with open(path, "rb") as f:
+            stat = os.fstat(f.fileno())
+            self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        # Identity of the mapped file: a published replacement has a new inode
+        self.identity = (stat.st_dev, stat.st_ino, stat.st_mtime_ns)
+        self.size = stat.st_size
+
+        buffer = memoryview(self._mmap)
+        magic, self.catalog_version, self.loaded_at, fingerprint, count = HEADER.unpack_from(buffer, 0)
+        if magic != MAGIC or count != len(SECTIONS):
+            raise ValueError(f"{path} is not a catalog file of this version")
+        self.fingerprint = fingerprint.rstrip(b"\0").decode()
+
+        sections: Dict[str, memoryview] = {}
+        for number, name in enumerate(SECTIONS):
+            offset, length = SECTION.unpack_from(buffer, HEADER.size + number * SECTION.size)
+            sections[name] = buffer[offset:offset + length]
+
+        def ints(name: str) -> memoryview:
+            return sections[name].cast("i")
+
+        strings = _Strings(sections["string_offsets"].cast("I"), sections["string_data"])
+        decoders = {
+            row_type: _RowCodec(row_type).decoder(sections[name], strings)
+            for row_type, name in (
+                (RegionRow, "regions"), (ResourceRow, "resources"), (AttributeRow, "attributes"),
+                (PropertyTypeRow, "property_types"),
+            )
+        }
+        property_codec = _RowCodec(PropertyRow)
+        decode_root = property_codec.decoder(sections["root_properties"], strings)
+        decode_nested = property_codec.decoder(sections["nested_properties"], strings)
+
+        region_ids = ints("region_ids")
+        resource_ids = ints("resource_ids")
+        property_type_ids = ints("property_type_ids")
+        decode_region = decoders[RegionRow]
+        decode_resource = decoders[ResourceRow]
+        decode_attribute = decoders[AttributeRow]
+
+        region_index = _IdIndex(region_ids, ints("region_positions"))
+        self.resource_index = _IdIndex(resource_ids, ints("resource_positions"))
+        type_index = _IdIndex(property_type_ids)
+
+        self.regions = _Records(decode_region, 0, len(region_ids))
+        self.resources = _Records(decode_resource, 0, len(resource_ids))
+        self.regions_by_id = _RowsById(region_index, decode_region)
+        self.resources_by_id = _RowsById(self.resource_index, decode_resource)
+        self.resource_ids_by_type = _ResourceIdsByType(self.resources, ints("resource_type_order"))
+
+        resource_region_ids = ints("resource_region_ids")
+        region_resource_positions = ints("region_resource_positions")
+        self.region_ids_by_resource = _Groups(
+            self.resource_index, ints("resource_region_offsets"),
+            lambda start, stop: tuple(resource_region_ids[start:stop]),
+        )
+        self.resources_by_region = _Groups(
+            region_index, ints("region_resource_offsets"),
+            lambda start, stop: _PositionRecords(decode_resource, region_resource_positions[start:stop]),
+        )
+        self.attributes_by_resource = _Groups(
+            self.resource_index, ints("attribute_offsets"),
+            lambda start, stop: _Records(decode_attribute, start, stop),
+        )
+        self.property_types = _RowsById(type_index, decoders[PropertyTypeRow])
+        self.root_properties = _Groups(
+            self.resource_index, ints("root_property_offsets"),
+            lambda start, stop: _Records(decode_root, start, stop),
+        )
+        self.properties_by_type = _Groups(
+            type_index, ints("nested_property_offsets"),
+            lambda start, stop: _Records(decode_nested, start, stop),
+        )
+        self.property_count = len(sections["root_properties"]) // property_codec.record.size + (
+            len(sections["nested_properties"]) // property_codec.record.size
+        )
+
+    def changed_on_disk(self) -> bool:
+        """Whether another file has been published at the path since it was mapped."""
+        try:
+            stat = os.stat(self.path)
+        except FileNotFoundError:
+            return False
+        return (stat.st_dev, stat.st_ino, stat.st_mtime_ns) != self.identity
+
+
+def read_header(path: str) -> Optional[Tuple[int, str]]:
+    """(catalog version, fingerprint) of a catalog file, None if missing or unreadable."""
+    try:
+        with open(path, "rb") as f:
+            data = f.read(HEADER.size)
+    except FileNotFoundError:
+        return None
+    if len(data) < HEADER.size:
+        return None
+    magic, catalog_version, _, fingerprint, count = HEADER.unpack(data)
+    if magic != MAGIC or count != len(SECTIONS):
+        return None
+    return catalog_version, fingerprint.rstrip(b"\0").decode()
+
+
+def _int_array(values: Iterable[int]) -> bytes:
+    return array("i", values).tobytes()
+
+
+def _offsets(counts: Iterable[int]) -> bytes:
+    """Start of every run plus the final end, from the run lengths."""
+    offsets = array("i", [0])
+    for count in counts:
+        offsets.append(offsets[-1] + count)
+    return offsets.tobytes()
+
+
+def _grouped(rows: Iterable[tuple], key: Callable[[tuple], int], keys: List[int]) -> List[List[tuple]]:
+    """Rows grouped by key in the order of ``keys``, keeping their order in each group."""
+    groups: Dict[int, List[tuple]] = {k: [] for k in keys}
+    for row in rows:
+        group = groups.get(key(row))
+        if group is not None:
+            group.append(row)
+    return [groups[k] for k in keys]
+
+
+def encode_catalog(tables: CatalogTables, catalog_version: int, fingerprint: str) -> List[bytes]:
+    """Encode catalog tables into the file's header and sections."""
+    string_ids: Dict[str, int] = {}
+    string_data = bytearray()
+    string_offsets = array("I", [0])
+
+    def string_id(value: Optional[str]) -> int:
+        if value is None:
+            return NULL_REF
+        reference = string_ids.get(value)
+        if reference is None:
+            reference = string_ids[value] = len(string_ids)
+            string_data.extend(value.encode("utf-8"))
+            string_offsets.append(len(string_data))
+        return reference
+
+    def records(row_type, rows: Iterable[tuple]) -> bytes:
+        codec = _RowCodec(row_type)
+        return b"".join(codec.pack(row, string_id) for row in rows)
+
+    regions, resources = tables.regions, tables.resources
+    region_order = sorted(range(len(regions)), key=lambda position: regions[position].id)
+    resource_order = sorted(range(len(resources)), key=lambda position: resources[position].id)
+    resource_keys = [resource.id for resource in resources]
+    region_keys = [region.id for region in regions]
+    position = {resource.id: index for index, resource in enumerate(resources)}
+
+    regions_of_resource = _grouped(tables.resource_regions, lambda pair: pair[0], resource_keys)
+    resources_of_region = [
+        sorted(position[resource_id] for resource_id, _ in group)
+        for group in _grouped(tables.resource_regions, lambda pair: pair[1], region_keys)
+    ]
+    attributes = _grouped(tables.attributes, lambda row: row.resource_id, resource_keys)
+    property_types = sorted(tables.property_types, key=lambda row: row.id)
+    root_properties = _grouped(tables.root_properties, lambda row: row.resource_id, resource_keys)
+    nested_properties = _grouped(
+        tables.nested_properties, lambda row: row.property_type_id, [row.id for row in property_types]
+    )
+
+    sections = {
+        "regions": records(RegionRow, regions),
+        "region_ids": _int_array(regions[p].id for p in region_order),
+        "region_positions": _int_array(region_order),
+        "resources": records(ResourceRow, resources),
+        "resource_ids": _int_array(resources[p].id for p in resource_order),
+        "resource_positions": _int_array(resource_order),
+        "resource_type_order": _int_array(
+            sorted(range(len(resources)), key=lambda p: resources[p].resource_type)
+        ),
+        # Groups keyed by resource/region are stored in id order, matching the id indexes
+        "resource_region_offsets": _offsets(len(regions_of_resource[p]) for p in resource_order),
+        "resource_region_ids": _int_array(
+            region_id for p in resource_order for _, region_id in regions_of_resource[p]
+        ),
+        "region_resource_offsets": _offsets(len(resources_of_region[p]) for p in region_order),
+        "region_resource_positions": _int_array(
+            resource_position for p in region_order for resource_position in resources_of_region[p]
+        ),
+        "attributes": records(AttributeRow, (row for p in resource_order for row in attributes[p])),
+        "attribute_offsets": _offsets(len(attributes[p]) for p in resource_order),
+        "property_types": records(PropertyTypeRow, property_types),
+        "property_type_ids": _int_array(row.id for row in property_types),
+        "root_properties": records(PropertyRow, (row for p in resource_order for row in root_properties[p])),
+        "root_property_offsets": _offsets(len(root_properties[p]) for p in resource_order),
+        "nested_properties": records(PropertyRow, (row for group in nested_properties for row in group)),
+        "nested_property_offsets": _offsets(len(group) for group in nested_properties),
+    }
+    sections["string_offsets"] = string_offsets.tobytes()
+    sections["string_data"] = bytes(string_data)
+
+    parts = [HEADER.pack(MAGIC, catalog_version, time.time(), fingerprint.encode()[:16], len(SECTIONS))]
+    offset = HEADER.size + SECTION.size * len(SECTIONS)
+    table = []
+    body = []
+    for name in SECTIONS:
+        padding = -offset % ALIGNMENT
+        body.append(b"\0" * padding)
+        offset += padding
+        table.append(SECTION.pack(offset, len(sections[name])))
+        body.append(sections[name])
+        offset += len(sections[name])
+    return parts + table + body
+
+
+def write_catalog_file(path: str, tables: CatalogTables, catalog_version: int, fingerprint: str) -> int:
+    """Write a catalog file and publish it atomically at ``path``; returns its size."""
+    directory = os.path.dirname(os.path.abspath(path))
+    os.makedirs(directory, exist_ok=True)
+    temporary = f"{path}.{os.getpid()}.tmp"
+    size = 0
+    try:
+        with open(temporary, "wb") as f:
+            for part in encode_catalog(tables, catalog_version, fingerprint):
+                f.write(part)
+                size += len(part)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(temporary, path)
+    finally:
+        if os.path.exists(temporary):
+            os.remove(temporary)
+    return size
+
+
+@contextmanager
+def catalog_file_lock(path: str) -> Iterator[None]:
+    """Hold an exclusive lock shared by every process building or replacing ``path``."""
+    if fcntl is None:
+        yield
+        return
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    with open(f"{path}.lock", "w") as lock_file:
+        fcntl.flock(lock_file.fileno(), fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(lock_file.fileno(), fcntl.LOCK_UN)
@@ -0,0 +1,407 @@
+"""Process-wide immutable in-memory snapshot of the CloudFormation catalog.
+
+The catalog only changes when a spec is re-ingested, so when
+``CATALOG_SNAPSHOT_ENABLED`` is set every table is loaded once at startup
+into compact, indexed structures and the GraphQL resolvers are answered
+from memory. A reload builds a complete new snapshot and swaps it in with a
+single reference assignment, so requests always see one consistent catalog.
+
+With ``CATALOG_SHARED_PATH`` the snapshot is kept in a memory-mapped file
+(:mod:`app.catalog.shared`) instead, so that worker processes share one
+copy. Workers build the file once at startup; after a reload in any worker
+the others follow within ``CATALOG_SHARED_CHECK_SECONDS``.
+"""
+import logging
+import signal
+import threading
+import time
+from types import MappingProxyType
+from typing import Dict, List, Mapping, Optional, Sequence, Tuple
+from sqlmodel import Session, select
+from app.config import settings
+from app.database import engine
+from app.models import (
+    Region as RegionModel,
+    Resource as ResourceModel,
+    ResourceRegion,
+    ResourceAttribute as ResourceAttributeModel,
+    Property as PropertyModel,
+    PropertyType as PropertyTypeModel,
+)
+from app.catalog.property_graph import PropertyGraph
+from app.catalog.rows import (
+    AttributeRow,
+    PropertyRow,
+    PropertyTypeRow,
+    RegionRow,
+    ResourceRow,
+    ilike_pattern,
+    row_columns,
+)
+from app.catalog.memory import approximate_size
+from app.catalog.changelog import latest_catalog_version
+from app.catalog.shared import (
+    CatalogTables,
+    SharedCatalogFile,
+    catalog_file_lock,
+    read_header,
+    write_catalog_file,
+)
+from app.catalog.version import bump_catalog_version, catalog_fingerprint
+
+logger = logging.getLogger(__name__)
+
+
+def read_tables(db: Session) -> CatalogTables:
+    """Read every catalog table in the orders the snapshot keeps them."""
+    regions = tuple(
+        RegionRow(*row)
+        for row in db.exec(
+            select(*row_columns(RegionModel, RegionRow)).order_by(RegionModel.region_code)
+        ).all()
+    )
+    resources = tuple(
+        ResourceRow(*row)
+        for row in db.exec(
+            select(*row_columns(ResourceModel, ResourceRow)).order_by(ResourceModel.resource_type)
+        ).all()
+    )
+    resource_regions = db.exec(
+        select(ResourceRegion.resource_id, ResourceRegion.region_id).order_by(ResourceRegion.id)
+    ).all()
+    attributes = [
+        AttributeRow(*row)
+        for row in db.exec(
+            select(*row_columns(ResourceAttributeModel, AttributeRow))
+            .order_by(ResourceAttributeModel.id)
+        ).all()
+    ]
+    property_types = [
+        PropertyTypeRow(*row)
+        for row in db.exec(select(*row_columns(PropertyTypeModel, PropertyTypeRow))).all()
+    ]
+    property_columns = row_columns(PropertyModel, PropertyRow)
+    root_properties = [
+        PropertyRow(*row)
+        for row in db.exec(
+            select(*property_columns)
+            .where(PropertyModel.resource_id.is_not(None))
+            .order_by(PropertyModel.property_name)
+        ).all()
+    ]
+    nested_properties = [
+        PropertyRow(*row)
+        for row in db.exec(
+            select(*property_columns)
+            .where(PropertyModel.property_type_id.is_not(None))
+            .order_by(PropertyModel.id)
+        ).all()
+    ]
+    return CatalogTables(
+        regions,
+        resources,
+        resource_regions,
+        attributes,
+        property_types,
+        root_properties,
+        nested_properties,
+    )
+
+
+class CatalogSnapshot:
+    """Immutable, indexed copy of every catalog table."""
+
+    def __init__(
+        self,
+        regions: Tuple[RegionRow, ...],
+        resources: Tuple[ResourceRow, ...],
+        resource_regions: Sequence[Tuple[int, int]],
+        attributes: Sequence[AttributeRow],
+        property_types: Sequence[PropertyTypeRow],
+        root_properties: Sequence[PropertyRow],
+        nested_properties: Sequence[PropertyRow],
+    ):
+        # Regions ordered by region_code, resources ordered by resource_type
+        self.regions = regions
+        self.resources = resources
+        self.regions_by_id: Mapping[int, RegionRow] = MappingProxyType(
+            {region.id: region for region in regions}
+        )
+        self.resources_by_id: Mapping[int, ResourceRow] = MappingProxyType(
+            {resource.id: resource for resource in resources}
+        )
+        self.resource_ids_by_type: Mapping[str, int] = MappingProxyType(
+            {resource.resource_type: resource.id for resource in resources}
+        )
+
+        position = {resource.id: index for index, resource in enumerate(resources)}
+        self.positions: Mapping[int, int] = MappingProxyType(position)
+        by_region: Dict[int, List[int]] = {}
+        by_resource: Dict[int, List[int]] = {}
+        for resource_id, region_id in resource_regions:
+            by_region.setdefault(region_id, []).append(position[resource_id])
+            by_resource.setdefault(resource_id, []).append(region_id)
+
+        # Per-region resources keep the global resource_type order
+        self.resources_by_region: Mapping[int, Tuple[ResourceRow, ...]] = MappingProxyType({
+            region_id: tuple(resources[index] for index in sorted(indexes))
+            for region_id, indexes in by_region.items()
+        })
+        self.region_ids_by_resource: Mapping[int, Tuple[int, ...]] = MappingProxyType({
+            resource_id: tuple(region_ids) for resource_id, region_ids in by_resource.items()
+        })
+
+        attributes_by_resource: Dict[int, List[AttributeRow]] = {}
+        for attribute in attributes:
+            attributes_by_resource.setdefault(attribute.resource_id, []).append(attribute)
+        self.attributes_by_resource: Mapping[int, Tuple[AttributeRow, ...]] = MappingProxyType({
+            resource_id: tuple(rows) for resource_id, rows in attributes_by_resource.items()
+        })
+
+        roots: Dict[int, List[PropertyRow]] = {}
+        for prop in root_properties:
+            roots.setdefault(prop.resource_id, []).append(prop)
+        by_type: Dict[int, List[PropertyRow]] = {}
+        for prop in nested_properties:
+            by_type.setdefault(prop.property_type_id, []).append(prop)
+        self.graph = PropertyGraph(
+            types=MappingProxyType({row.id: row for row in property_types}),
+            properties_by_type=MappingProxyType({
+                type_id: tuple(rows) for type_id, rows in by_type.items()
+            }),
+            root_properties=MappingProxyType({
+                resource_id: tuple(rows) for resource_id, rows in roots.items()
+            }),
+        )
+
+        self.loaded_at = time.time()
+        # Recorded catalog version the snapshot was read at
+        self.catalog_version = 0
+        self.load_seconds = 0.0
+        self.footprint_bytes = 0
+
+    @classmethod
+    def load(cls, db: Session) -> "CatalogSnapshot":
+        """Read every catalog table into a new snapshot."""
+        started = time.perf_counter()
+        snapshot = cls(*read_tables(db))
+        snapshot.catalog_version = latest_catalog_version(db)
+        snapshot.load_seconds = time.perf_counter() - started
+        snapshot.footprint_bytes = approximate_size(snapshot)
+        return snapshot
+
+    def resources_in_region(self, region_id: int) -> Sequence[ResourceRow]:
+        """Resources available in a region, ordered by resource_type."""
+        return self.resources_by_region.get(region_id, ())
+
+    def seek(self, resources: Sequence[ResourceRow], after: Optional[Tuple[str, int]]) -> int:
+        """Index of the first row after a ``(resource_type, id)`` keyset cursor.
+
+        ``resources`` must be in resource_type order (any list handed out by
+        this snapshot is).
+        """
+        if after is None:
+            return 0
+
+        resource_type, resource_id = after
+        cursor_position = self.positions.get(resource_id)
+        if cursor_position is not None and self.resources[cursor_position].resource_type == resource_type:
+            def before_or_at(row) -> bool:
+                return self.positions[row.id] <= cursor_position
+        else:
+            # The cursor row is gone (catalog reloaded); fall back to comparing keys
+            def before_or_at(row) -> bool:
+                return (row.resource_type, row.id) <= (resource_type, resource_id)
+
+        low, high = 0, len(resources)
+        while low < high:
+            middle = (low + high) // 2
+            if before_or_at(resources[middle]):
+                low = middle + 1
+            else:
+                high = middle
+        return low
+
+    def search(self, query: str, region_id: Optional[int] = None) -> List[ResourceRow]:
+        """Resources whose type matches ``ILIKE '%query%'``, ordered by resource_type."""
+        candidates = self.resources_in_region(region_id) if region_id else self.resources
+        pattern = ilike_pattern(query)
+        return [resource for resource in candidates if pattern.search(resource.resource_type)]
+
+    def regions_for_resource(self, resource_id: int) -> List[RegionRow]:
+        """Regions a resource is available in."""
+        return [
+            self.regions_by_id[region_id]
+            for region_id in self.region_ids_by_resource.get(resource_id, ())
+        ]
+
+    def stats(self) -> dict:
+        """Size and load statistics for reporting."""
+        return {
+            "loaded_at": self.loaded_at,
+            "catalog_version": self.catalog_version,
+            "load_seconds": round(self.load_seconds, 3),
+            "footprint_bytes": self.footprint_bytes,
+            "regions": len(self.regions),
+            "resources": len(self.resources),
+            "property_types": len(self.graph.types),
+            "properties": (
+                sum(len(rows) for rows in self.graph.root_properties.values())
+                + sum(len(rows) for rows in self.graph.properties_by_type.values())
+            ),
+        }
+
+
+class SharedCatalogSnapshot(CatalogSnapshot):
+    """Snapshot backed by a catalog file mapped by every worker process.
+
+    Offers the lookups of :class:`CatalogSnapshot` through views of
+    :class:`~app.catalog.shared.SharedCatalogFile` that decode rows when
+    they are read, so the process itself holds none of the catalog.
+    """
+
+    def __init__(self, catalog_file: SharedCatalogFile, load_seconds: float = 0.0):
+        self.file = catalog_file
+        self.regions = catalog_file.regions
+        self.resources = catalog_file.resources
+        self.regions_by_id = catalog_file.regions_by_id
+        self.resources_by_id = catalog_file.resources_by_id
+        self.resource_ids_by_type = catalog_file.resource_ids_by_type
+        self.positions = catalog_file.resource_index
+        self.resources_by_region = catalog_file.resources_by_region
+        self.region_ids_by_resource = catalog_file.region_ids_by_resource
+        self.attributes_by_resource = catalog_file.attributes_by_resource
+        self.graph = PropertyGraph(
+            types=catalog_file.property_types,
+            properties_by_type=catalog_file.properties_by_type,
+            root_properties=catalog_file.root_properties,
+        )
+        self.loaded_at = catalog_file.loaded_at
+        self.catalog_version = catalog_file.catalog_version
+        self.load_seconds = load_seconds
+        self.footprint_bytes = 0
+
+    def stats(self) -> dict:
+        stats = super().stats()
+        stats.update(shared_path=self.file.path, shared_bytes=self.file.size)
+        return stats
+
+
+_snapshot: Optional[CatalogSnapshot] = None
+_reload_lock = threading.Lock()
+# When to next look for a catalog file published by another worker
+_next_shared_check = 0.0
+
+
+def get_snapshot() -> Optional[CatalogSnapshot]:
+    """Current catalog snapshot, or None when snapshot mode is disabled."""
+    snapshot = _snapshot
+    if isinstance(snapshot, SharedCatalogSnapshot) and time.monotonic() >= _next_shared_check:
+        snapshot = _follow_shared_file(snapshot)
+    return snapshot
+
+
+def _install(snapshot: CatalogSnapshot) -> None:
+    global _snapshot
+    previous = _snapshot
+    _snapshot = snapshot
+    if previous is not None:
+        # Results derived from the previous snapshot are now stale
+        bump_catalog_version()
+    if isinstance(snapshot, SharedCatalogSnapshot):
+        logger.info(
+            "Catalog file %s mapped in %.3fs (%d resources, %.1f MiB shared)",
+            snapshot.file.path,
+            snapshot.load_seconds,
+            len(snapshot.resources),
+            snapshot.file.size / (1024 * 1024),
+        )
+    else:
+        logger.info(
+            "Catalog snapshot loaded in %.3fs (%d resources, ~%.1f MiB)",
+            snapshot.load_seconds,
+            len(snapshot.resources),
+            snapshot.footprint_bytes / (1024 * 1024),
+        )
+
+
+def _write_shared_file(db: Session, path: str, fingerprint: str) -> None:
+    """Read the catalog and publish it at ``path``; the caller holds the file lock."""
+    tables = read_tables(db)
+    size = write_catalog_file(path, tables, latest_catalog_version(db), fingerprint)
+    logger.info("Catalog file %s written (%.1f MiB)", path, size / (1024 * 1024))
+
+
+def _map_shared_file(path: str, rebuild: bool) -> SharedCatalogSnapshot:
+    """Map the catalog file, writing it first when asked to or when it is missing or stale.
+
+    Workers starting together wait on the file lock, so it is built once.
+    """
+    started = time.perf_counter()
+    with catalog_file_lock(path):
+        with Session(engine) as db:
+            fingerprint = catalog_fingerprint(db)
+            header = None if rebuild else read_header(path)
+            if header is None or header[1] != fingerprint:
+                _write_shared_file(db, path, fingerprint)
+        catalog_file = SharedCatalogFile(path)
+    return SharedCatalogSnapshot(catalog_file, time.perf_counter() - started)
+
+
+def _follow_shared_file(current: SharedCatalogSnapshot) -> CatalogSnapshot:
+    """Swap to a catalog file another worker has published since ``current`` was mapped."""
+    global _next_shared_check
+    _next_shared_check = time.monotonic() + settings.CATALOG_SHARED_CHECK_SECONDS
+    if not current.file.changed_on_disk() or not _reload_lock.acquire(blocking=False):
+        return current
+    try:
+        if _snapshot is current:
+            started = time.perf_counter()
+            _install(SharedCatalogSnapshot(
+                SharedCatalogFile(current.file.path), time.perf_counter() - started
+            ))
+    except (OSError, ValueError):
+        logger.exception("Could not map the catalog file published at %s", current.file.path)
+    finally:
+        _reload_lock.release()
+    return _snapshot
+
+
+def reload_snapshot(rebuild_shared: bool = True) -> CatalogSnapshot:
+    """Load a fresh snapshot and atomically swap it in.
+
+    With a shared catalog file the file is rebuilt and republished, and the
+    other workers swap to it on their next check. Without ``rebuild_shared``
+    it is only rebuilt when it does not match the database, so workers that
+    all notice the same ingest build it once.
+    """
+    with _reload_lock:
+        if settings.CATALOG_SHARED_PATH:
+            snapshot = _map_shared_file(settings.CATALOG_SHARED_PATH, rebuild=rebuild_shared)
+        else:
+            with Session(engine) as db:
+                snapshot = CatalogSnapshot.load(db)
+        _install(snapshot)
+    return snapshot
+
+
+def _reload_in_background(signum, frame) -> None:
+    """Signal handler: reload off the signal context so requests keep being served."""
+    threading.Thread(target=reload_snapshot, name="catalog-snapshot-reload", daemon=True).start()
+
+
+def init_snapshot() -> Optional[CatalogSnapshot]:
+    """Load the snapshot at startup when enabled and install the reload signal."""
+    if not settings.CATALOG_SNAPSHOT_ENABLED:
+        return None
+
+    if settings.CATALOG_SHARED_PATH:
+        with _reload_lock:
+            snapshot = _map_shared_file(settings.CATALOG_SHARED_PATH, rebuild=False)
+            _install(snapshot)
+    else:
+        snapshot = reload_snapshot()
+    reload_signal = getattr(signal, settings.CATALOG_SNAPSHOT_RELOAD_SIGNAL, None)
+    if reload_signal is not None and threading.current_thread() is threading.main_thread():
+        signal.signal(reload_signal, _reload_in_background)
+    return snapshot
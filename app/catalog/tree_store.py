@@ -0,0 +1,113 @@
+"""File-backed store of pre-built, serialized property trees.
+
+The property tree of a resource is fully determined by the catalog, so an
+offline step (``python -m app.graphql.materialize``) builds every tree once
+and stores it here keyed by resource id and catalog fingerprint. Payloads
+are opaque bytes to this module; encoding lives with the GraphQL types.
+"""
+import sqlite3
+import threading
+from typing import Dict, Iterable, Optional, Sequence, Tuple
+from sqlmodel import Session
+from app.config import settings
+from app.catalog.version import catalog_fingerprint, get_catalog_version
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS property_trees (
+    resource_id INTEGER NOT NULL,
+    catalog_fingerprint TEXT NOT NULL,
+    payload BLOB NOT NULL,
+    PRIMARY KEY (resource_id, catalog_fingerprint)
+);
+CREATE TABLE IF NOT EXISTS store_meta (
+    key TEXT PRIMARY KEY,
+    value TEXT NOT NULL
+);
+"""
+
+
+class PropertyTreeStore:
+    """SQLite file holding one serialized property tree per resource."""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._connection = sqlite3.connect(path, check_same_thread=False)
+        self._connection.executescript(_SCHEMA)
+        self._lock = threading.Lock()
+        # (catalog version, whether the store matches the catalog at that version)
+        self._checked: Optional[Tuple[int, bool]] = None
+
+    def fingerprint(self) -> Optional[str]:
+        """Fingerprint of the catalog the stored trees were built from."""
+        with self._lock:
+            row = self._connection.execute(
+                "SELECT value FROM store_meta WHERE key = 'catalog_fingerprint'"
+            ).fetchone()
+        return row[0] if row else None
+
+    def get_many(self, resource_ids: Sequence[int]) -> Dict[int, bytes]:
+        """Payloads of the current materialization for the given resources."""
+        if not resource_ids:
+            return {}
+        placeholders = ",".join("?" * len(resource_ids))
+        with self._lock:
+            rows = self._connection.execute(
+                "SELECT resource_id, payload FROM property_trees"
+                " WHERE resource_id IN (" + placeholders + ")"
+                " AND catalog_fingerprint = (SELECT value FROM store_meta WHERE key = 'catalog_fingerprint')",
+                list(resource_ids),
+            ).fetchall()
+        return dict(rows)
+
+    def replace(self, fingerprint: str, trees: Iterable[Tuple[int, bytes]]) -> int:
+        """Store a complete materialization and make it current in one transaction."""
+        count = 0
+        with self._lock, self._connection:
+            self._connection.execute("DELETE FROM property_trees")
+            for resource_id, payload in trees:
+                self._connection.execute(
+                    "INSERT INTO property_trees (resource_id, catalog_fingerprint, payload) VALUES (?, ?, ?)",
+                    (resource_id, fingerprint, payload),
+                )
+                count += 1
+            self._connection.execute(
+                "INSERT OR REPLACE INTO store_meta (key, value) VALUES ('catalog_fingerprint', ?)",
+                (fingerprint,),
+            )
+        self._checked = None
+        return count
+
+    def matches_catalog(self, db: Session) -> bool:
+        """Whether the stored trees were built from the current catalog.
+
+        Checked against the database once per catalog version.
+        """
+        version = get_catalog_version()
+        matches = self.fingerprint() == catalog_fingerprint(db)
+        self._checked = (version, matches)
+        return matches
+
+    def cached_match(self) -> Optional[bool]:
+        """Result of matches_catalog for the current catalog version, if known."""
+        checked = self._checked
+        if checked is not None and checked[0] == get_catalog_version():
+            return checked[1]
+        return None
+
+    def stats(self) -> dict:
+        """Number of stored trees and their total payload size."""
+        with self._lock:
+            count, size = self._connection.execute(
+                "SELECT COUNT(*), COALESCE(SUM(LENGTH(payload)), 0) FROM property_trees"
+            ).fetchone()
+        return {"path": self.path, "trees": count, "payload_bytes": size, "fingerprint": self.fingerprint()}
+
+
+_store: Optional[PropertyTreeStore] = None
+if settings.PROPERTY_TREE_STORE_PATH:
+    _store = PropertyTreeStore(settings.PROPERTY_TREE_STORE_PATH)
+
+
+def get_property_tree_store() -> Optional[PropertyTreeStore]:
+    """The configured property tree store, or None when PROPERTY_TREE_STORE_PATH is unset."""
+    return _store
@@ -0,0 +1,76 @@
+"""Process-wide catalog version used to key and invalidate caches.
+
+Every process polls the newest version recorded by ingest
+(:func:`follow_stored_version`) and advances its own version when it
+changes, so one ingest invalidates the caches of every worker.
+"""
+import hashlib
+import threading
+import time
+from typing import Optional
+from sqlalchemy import func
+from sqlmodel import Session, select
+from app.catalog.changelog import latest_catalog_version
+from app.models import (
+    Resource as ResourceModel,
+    ResourceAttribute as ResourceAttributeModel,
+    Property as PropertyModel,
+    PropertyType as PropertyTypeModel,
+    CatalogVersion as CatalogVersionModel,
+)
+
+_version = 1
+_lock = threading.Lock()
+# Newest stored catalog version seen by follow_stored_version, and when
+_stored_version: Optional[int] = None
+_stored_checked_at = float("-inf")
+
+
+def get_catalog_version() -> int:
+    """Current catalog version."""
+    return _version
+
+
+def bump_catalog_version() -> int:
+    """Advance the catalog version, invalidating everything keyed on the old one."""
+    global _version
+    with _lock:
+        _version += 1
+        return _version
+
+
+def follow_stored_version(db: Session) -> bool:
+    """Read the newest stored catalog version; a new one advances the process version.
+
+    Returns whether it changed since the previous check (never on the first).
+    """
+    global _stored_version, _stored_checked_at
+    stored = latest_catalog_version(db)
+    with _lock:
+        changed = _stored_version is not None and stored != _stored_version
+        _stored_version = stored
+        _stored_checked_at = time.monotonic()
+    if changed:
+        bump_catalog_version()
+    return changed
+
+
+def stored_catalog_version(max_age: float) -> Optional[int]:
+    """Stored version seen at most ``max_age`` seconds ago, or None."""
+    if time.monotonic() - _stored_checked_at > max_age:
+        return None
+    return _stored_version
+
+
+def catalog_fingerprint(db: Session) -> str:
+    """Fingerprint of the catalog contents that survives restarts.
+
+    Built from the row count and highest id of each table a property tree
+    depends on, plus the recorded catalog version, so rows updated in place
+    by an ingest change it too.
+    """
+    parts = []
+    for model in (ResourceModel, ResourceAttributeModel, PropertyTypeModel, PropertyModel, CatalogVersionModel):
+        count, max_id = db.exec(select(func.count(), func.max(model.id))).one()
+        parts.append(f"{model.__tablename__}:{count}:{max_id or 0}")
+    return hashlib.sha256("|".join(parts).encode()).hexdigest()[:16]
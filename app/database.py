@@ -1,8 +1,61 @@
 """Database configuration and session management."""
+from typing import Any, Callable, TypeVar
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
 from sqlmodel import create_engine, Session
+from sqlmodel.ext.asyncio.session import AsyncSession
 from app.config import settings
+from app.metrics import instrument_engine
 
-engine = create_engine(settings.DATABASE_URL, echo=False)
+T = TypeVar("T")
+
+# Async drivers used when ASYNC_DATABASE_URL is not set explicitly
+_ASYNC_DRIVERS = {
+    "postgresql": "asyncpg",
+    "sqlite": "aiosqlite",
+}
+
+
+def _pool_options(url: str) -> dict:
+    """Connection pool settings from Settings (SQLite uses its own pool)."""
+    if make_url(url).get_backend_name() == "sqlite":
+        return {}
+    return {
+        "pool_size": settings.DB_POOL_SIZE,
+        "max_overflow": settings.DB_MAX_OVERFLOW,
+        "pool_pre_ping": settings.DB_POOL_PRE_PING,
+        "pool_recycle": settings.DB_POOL_RECYCLE,
+        "pool_timeout": settings.DB_POOL_TIMEOUT,
+    }
+
+
+def _async_url(url: str) -> str:
+    """Derive the async driver URL from the sync DATABASE_URL."""
+    parsed = make_url(url)
+    backend = parsed.get_backend_name()
+    driver = _ASYNC_DRIVERS.get(backend)
+    if driver is None:
+        raise ValueError(f"No async driver configured for database backend '{backend}'")
+    return parsed.set(drivername=f"{backend}+{driver}").render_as_string(hide_password=False)
+
+
+engine = create_engine(settings.DATABASE_URL, echo=False, **_pool_options(settings.DATABASE_URL))
+if settings.METRICS_ENABLED:
+    instrument_engine(engine)
+
+async_engine = None
+AsyncSessionLocal = None
+if settings.DB_ASYNC_ENABLED:
+    _async_database_url = settings.ASYNC_DATABASE_URL or _async_url(settings.DATABASE_URL)
+    async_engine = create_async_engine(
+        _async_database_url, echo=False, **_pool_options(_async_database_url)
+    )
+    if settings.METRICS_ENABLED:
+        instrument_engine(async_engine.sync_engine)
+    AsyncSessionLocal = async_sessionmaker(
+        async_engine, class_=AsyncSession, expire_on_commit=False
+    )
 
 
 def get_db():
@@ -10,3 +63,34 @@ def get_db():
     with Session(engine) as session:
         yield session
 
+
+async def get_async_db():
+    """Dependency to get an async database session."""
+    async with AsyncSessionLocal() as session:
+        yield session
+
+
+async def dispose_engines() -> None:
+    """Close pooled connections on shutdown."""
+    if async_engine is not None:
+        await async_engine.dispose()
+    engine.dispose()
+
+
+def _run_with_session(fn: Callable[..., T], *args: Any) -> T:
+    with Session(engine) as session:
+        return fn(session, *args)
+
+
+async def run_db(fn: Callable[..., T], *args: Any) -> T:
+    """Run ``fn(session, *args)`` without blocking the event loop.
+
+    With ``DB_ASYNC_ENABLED`` the function runs against an async session on
+    the async engine's pool, so waiting on the database only suspends the
+    current coroutine. Otherwise it falls back to a sync session on a worker
+    thread.
+    """
+    if AsyncSessionLocal is not None:
+        async with AsyncSessionLocal() as session:
+            return await session.run_sync(fn, *args)
+    return await run_in_threadpool(_run_with_session, fn, *args)
@@ -0,0 +1,32 @@
+"""Per-request GraphQL context."""
+from strawberry.fastapi import BaseContext
+from app.graphql.loaders import Loaders
+
+
+class Context(BaseContext):
+    """Request context carrying the request-scoped DataLoaders."""
+
+    def __init__(self):
+        super().__init__()
+        self.loaders = Loaders()
+
+
+async def get_context() -> Context:
+    """Strawberry context getter creating fresh loaders for every request."""
+    return Context()
+
+
+def get_loaders(info) -> Loaders:
+    """Loaders of the current request.
+
+    Falls back to a new set when the schema is executed without a Context
+    (e.g. ``schema.execute`` in scripts). A dict context keeps it so that
+    sibling fields still share one set.
+    """
+    context = info.context
+    if isinstance(context, dict):
+        if "loaders" not in context:
+            context["loaders"] = Loaders()
+        return context["loaders"]
+    loaders = getattr(context, "loaders", None)
+    return loaders if loaders is not None else Loaders()
@@ -0,0 +1,152 @@
+"""Check that the resolver queries use the catalog's composite indexes.
+
+Usage::
+
+    python -m app.graphql.explain
+
+Runs the resolver and loader query functions against the database at
+``DATABASE_URL``, captures the SQL they send, and runs ``EXPLAIN`` on each
+statement. A check fails when a statement's plan does not mention one of
+the indexes it is expected to use (created by ``alembic upgrade head``).
+On PostgreSQL sequential scans are disabled while explaining, so the check
+confirms the indexes are usable even on a small development catalog.
+"""
+import argparse
+import logging
+import sys
+from contextlib import contextmanager
+from typing import Any, Callable, Iterator, List, NamedTuple, Optional, Sequence, Tuple
+from sqlalchemy import event
+from sqlmodel import Session, select
+from app.database import engine
+from app.models import Property as PropertyModel, ResourceRegion
+from app.catalog import load_property_graph
+from app.graphql.loaders import _load_properties_by_resource, _load_properties_by_type, _load_regions
+from app.graphql.queries.resource import (
+    _query_region_page,
+    _query_resources_by_region,
+    _query_search_page,
+    _query_search_resources,
+)
+
+logger = logging.getLogger(__name__)
+
+REGION_RESOURCES = ("ix_resource_regions_region_id_resource_id",)
+RESOURCE_REGIONS = ("uq_resource_regions_resource_id_region_id",)
+RESOURCE_PROPERTIES = ("ix_properties_resource_id_property_name",)
+TYPE_PROPERTIES = ("ix_properties_property_type_id_id",)
+
+
+class Sample(NamedTuple):
+    """Ids the checked queries are run with."""
+    region_id: int
+    resource_id: int
+    property_type_id: int
+
+
+class Check(NamedTuple):
+    name: str
+    run: Callable[[Session, Sample], Any]
+    # Every captured statement's plan has to mention one of these
+    indexes: Sequence[str]
+
+
+CHECKS: Tuple[Check, ...] = (
+    Check("resourcesByRegion", lambda db, s: _query_resources_by_region(db, s.region_id, 20, 0), REGION_RESOURCES),
+    Check("resourcesByRegionConnection", lambda db, s: _query_region_page(db, s.region_id, 20, None, True), REGION_RESOURCES),
+    Check(
+        "resourcesByRegionConnection (after)",
+        lambda db, s: _query_region_page(db, s.region_id, 20, ("AWS::", 0), False),
+        REGION_RESOURCES,
+    ),
+    Check("searchResources (region)", lambda db, s: _query_search_resources(db, "a", s.region_id, 20, 0), REGION_RESOURCES),
+    Check("searchResourcesConnection (region)", lambda db, s: _query_search_page(db, "a", s.region_id, 20, None, True), REGION_RESOURCES),
+    Check("properties by resource", lambda db, s: _load_properties_by_resource(db, [s.resource_id]), RESOURCE_PROPERTIES),
+    Check("properties by type", lambda db, s: _load_properties_by_type(db, [s.property_type_id]), TYPE_PROPERTIES),
+    Check("regions by resource", lambda db, s: _load_regions(db, [s.resource_id]), RESOURCE_REGIONS),
+    Check("property graph", lambda db, s: load_property_graph(db, [s.resource_id]), RESOURCE_PROPERTIES + TYPE_PROPERTIES),
+)
+
+
+def _sample(db: Session) -> Optional[Sample]:
+    region_id = db.exec(select(ResourceRegion.region_id).limit(1)).first()
+    resource_id = db.exec(
+        select(PropertyModel.resource_id).where(PropertyModel.resource_id.is_not(None)).limit(1)
+    ).first()
+    property_type_id = db.exec(
+        select(PropertyModel.property_type_id).where(PropertyModel.property_type_id.is_not(None)).limit(1)
+    ).first()
+    if region_id is None or resource_id is None or property_type_id is None:
+        return None
+    return Sample(region_id, resource_id, property_type_id)
+
+
+@contextmanager
+def _captured_statements() -> Iterator[List[Tuple[str, Any]]]:
+    """Collect (statement, parameters) of every query the engine runs."""
+    statements: List[Tuple[str, Any]] = []
+
+    def capture(conn, cursor, statement, parameters, context, executemany):
+        statements.append((statement, parameters))
+
+    event.listen(engine, "before_cursor_execute", capture)
+    try:
+        yield statements
+    finally:
+        event.remove(engine, "before_cursor_execute", capture)
+
+
+def explain(db: Session, statement: str, parameters: Any) -> List[str]:
+    """Plan lines of one captured statement."""
+    connection = db.connection()
+    if connection.dialect.name == "sqlite":
+        rows = connection.exec_driver_sql(f"EXPLAIN QUERY PLAN {statement}", parameters).all()
+        return [row[-1] for row in rows]
+    connection.exec_driver_sql("SET LOCAL enable_seqscan = off")
+    try:
+        return [row[0] for row in connection.exec_driver_sql(f"EXPLAIN {statement}", parameters).all()]
+    finally:
+        connection.exec_driver_sql("SET LOCAL enable_seqscan = on")
+
+
+def run_checks(db: Session, sample: Sample) -> List[str]:
+    """Run every check; returns a message per statement not using its indexes."""
+    failures = []
+    for check in CHECKS:
+        with _captured_statements() as statements:
+            check.run(db, sample)
+        for statement, parameters in statements:
+            plan = explain(db, statement, parameters)
+            used = [index for index in check.indexes if any(index in line for line in plan)]
+            if used:
+                logger.info("ok    %-38s %s", check.name, ", ".join(used))
+            else:
+                failures.append(f"{check.name}: expected {' or '.join(check.indexes)}")
+                logger.error(
+                    "FAIL  %s\n      %s\n      %s",
+                    check.name, " ".join(statement.split()), "\n      ".join(plan),
+                )
+    return failures
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.parse_args()
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
+
+    with Session(engine) as db:
+        sample = _sample(db)
+        if sample is None:
+            logger.error("The catalog is empty; load it before checking query plans")
+            return 2
+        failures = run_checks(db, sample)
+
+    if failures:
+        logger.error("%d statements do not use their indexes", len(failures))
+        return 1
+    logger.info("All resolver queries use their indexes")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
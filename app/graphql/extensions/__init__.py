@@ -0,0 +1,13 @@
+"""Strawberry schema extensions."""
+from app.graphql.extensions.document_cache import CachedDocuments, document_cache, document_depth
+from app.graphql.extensions.query_cost import QueryCostLimiter, estimate_cost
+from app.graphql.extensions.instrumentation import Instrumentation
+
+__all__ = [
+    "CachedDocuments",
+    "document_cache",
+    "document_depth",
+    "QueryCostLimiter",
+    "estimate_cost",
+    "Instrumentation",
+]
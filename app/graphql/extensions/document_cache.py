@@ -0,0 +1,170 @@
+"""Cache of parsed and validated GraphQL documents.
+
+The frontend sends the same few documents over and over, so re-parsing and
+re-validating them is wasted work. Documents that parsed and validated
+cleanly are kept in a bounded LRU keyed by a hash of their text. Documents
+over the token or depth limits are rejected before they reach the cache,
+so unique oversized queries cannot flood it.
+"""
+import hashlib
+import threading
+from collections import OrderedDict
+from typing import Dict, Iterator, Optional, Set
+from graphql import GraphQLError, parse
+from graphql.language import (
+    DocumentNode,
+    FragmentDefinitionNode,
+    FragmentSpreadNode,
+    OperationDefinitionNode,
+    SelectionSetNode,
+)
+from strawberry.extensions import SchemaExtension
+from app.config import settings
+
+
+def _selection_depth(
+    selection_set: Optional[SelectionSetNode],
+    fragments: Dict[str, FragmentDefinitionNode],
+    visited: Set[str],
+) -> int:
+    if selection_set is None:
+        return 0
+    depth = 0
+    for selection in selection_set.selections:
+        if isinstance(selection, FragmentSpreadNode):
+            name = selection.name.value
+            fragment = fragments.get(name)
+            # Fragment cycles are reported by validation; just stop here
+            if fragment is None or name in visited:
+                continue
+            depth = max(depth, _selection_depth(fragment.selection_set, fragments, visited | {name}))
+        elif getattr(selection, "selection_set", None) is not None:
+            depth = max(depth, 1 + _selection_depth(selection.selection_set, fragments, visited))
+        else:
+            depth = max(depth, 1)
+    return depth
+
+
+def document_depth(document: DocumentNode) -> int:
+    """Deepest field nesting of any operation, with fragments inlined."""
+    fragments = {
+        definition.name.value: definition
+        for definition in document.definitions
+        if isinstance(definition, FragmentDefinitionNode)
+    }
+    return max(
+        (
+            _selection_depth(definition.selection_set, fragments, set())
+            for definition in document.definitions
+            if isinstance(definition, OperationDefinitionNode)
+        ),
+        default=0,
+    )
+
+
+class DocumentCache:
+    """LRU of validated documents keyed by the SHA-256 of their text."""
+
+    def __init__(self, max_entries: int):
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[bytes, DocumentNode]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.rejected = 0
+
+    @staticmethod
+    def key(query: str) -> bytes:
+        return hashlib.sha256(query.encode()).digest()
+
+    def get(self, query: str) -> Optional[DocumentNode]:
+        """Cached document for the query text, or None."""
+        key = self.key(query)
+        with self._lock:
+            document = self._entries.get(key)
+            if document is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return document
+
+    def put(self, query: str, document: DocumentNode) -> None:
+        """Remember a document that parsed and validated without errors."""
+        if self.max_entries <= 0:
+            return
+        key = self.key(query)
+        with self._lock:
+            self._entries[key] = document
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def reject(self) -> None:
+        """Count a document refused for exceeding the token or depth limit."""
+        with self._lock:
+            self.rejected += 1
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> dict:
+        """Hit/miss counters, rejected documents and current size."""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "max_entries": self.max_entries,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+                "rejected": self.rejected,
+            }
+
+
+document_cache = DocumentCache(settings.GRAPHQL_DOCUMENT_CACHE_MAX_ENTRIES)
+
+
+class CachedDocuments(SchemaExtension):
+    """Serve parsing and validation from the document cache.
+
+    Register the class (not an instance) so each operation gets its own
+    extension state.
+    """
+
+    def __init__(self, *, execution_context=None):
+        super().__init__(execution_context=execution_context)
+        self.cached = False
+
+    def on_parse(self) -> Iterator[None]:
+        execution_context = self.execution_context
+        document = document_cache.get(execution_context.query)
+        if document is not None:
+            self.cached = True
+        else:
+            try:
+                document = parse(
+                    execution_context.query,
+                    max_tokens=settings.GRAPHQL_MAX_DOCUMENT_TOKENS,
+                    **execution_context.parse_options,
+                )
+            except GraphQLError:
+                document_cache.reject()
+                raise
+            if document_depth(document) > settings.GRAPHQL_MAX_QUERY_DEPTH:
+                document_cache.reject()
+                raise GraphQLError(
+                    f"Query exceeds the maximum depth of {settings.GRAPHQL_MAX_QUERY_DEPTH}"
+                )
+        execution_context.graphql_document = document
+        yield
+
+    def on_validate(self) -> Iterator[None]:
+        execution_context = self.execution_context
+        if self.cached:
+            # Only documents without validation errors are cached
+            execution_context.pre_execution_errors = []
+        yield
+        if not self.cached and not execution_context.pre_execution_errors:
+            document_cache.put(execution_context.query, execution_context.graphql_document)
@@ -0,0 +1,255 @@
+"""Static query cost analysis run before execution.
+
+``PropertyDetail.nestedProperties`` is self-referential and every level
+multiplies the work, and aliases let one document ask for the same
+expensive field many times. The estimator walks the operation with the
+schema's types: every object costs its field weight (1 by default,
+scalars are free), list fields multiply their children by the requested
+page size or an expected list length, and ``nestedProperties`` may only
+be nested so deep. Operations over budget are rejected before any
+resolver runs.
+"""
+from typing import Any, Dict, Iterator, Optional, Tuple
+from graphql import GraphQLError
+from graphql.language import (
+    FieldNode,
+    FragmentDefinitionNode,
+    FragmentSpreadNode,
+    InlineFragmentNode,
+    OperationDefinitionNode,
+    SelectionSetNode,
+)
+from graphql.type import (
+    GraphQLField,
+    GraphQLList,
+    GraphQLNonNull,
+    GraphQLObjectType,
+    GraphQLSchema,
+    is_object_type,
+)
+from graphql.utilities import value_from_ast_untyped
+from strawberry.extensions import SchemaExtension
+from app.config import settings
+
+# Extra weight of fields that do real work (database round trips, building trees)
+FIELD_WEIGHTS: Dict[str, int] = {
+    "Query.resourceDetail": 10,
+    "Query.resourceDetails": 10,
+    "Query.resourceDetailsByType": 10,
+    "Query.resourcePropertyGraph": 10,
+    "Query.resourcesByRegion": 5,
+    "Query.searchResources": 5,
+    "Query.resourcesByRegionConnection": 5,
+    "Query.searchResourcesConnection": 5,
+    "Query.changesSince": 5,
+}
+
+# Expected length of list fields whose size the query does not fix
+LIST_SIZES: Dict[str, int] = {
+    "Query.regions": 30,
+    "Query.regionResourceCounts": 30,
+    "ResourceDetail.properties": 20,
+    "ResourceDetail.attributes": 5,
+    "ResourceDetail.availableRegions": 30,
+    "ResourcePropertyGraph.properties": 20,
+    "ResourcePropertyGraph.types": 20,
+    "PropertyTypeInfo.properties": 8,
+    "CatalogChanges.resources": 50,
+    # Only complex properties have nested ones, so this is an average fan-out
+    "PropertyDetail.nestedProperties": 2,
+}
+DEFAULT_LIST_SIZE = 10
+
+# Arguments giving the page size of a field, capped like the resolvers do
+PAGE_SIZE_ARGUMENTS = ("limit", "first")
+MAX_PAGE_SIZE = 100
+
+NESTED_PROPERTIES = "PropertyDetail.nestedProperties"
+
+
+def _unwrap(field_type):
+    """Named type of a field and whether it is a list."""
+    is_list = False
+    while isinstance(field_type, (GraphQLNonNull, GraphQLList)):
+        if isinstance(field_type, GraphQLList):
+            is_list = True
+        field_type = field_type.of_type
+    return field_type, is_list
+
+
+class QueryCostEstimator:
+    """Cost and nestedProperties depth of one operation."""
+
+    def __init__(
+        self,
+        schema: GraphQLSchema,
+        fragments: Dict[str, FragmentDefinitionNode],
+        variables: Optional[Dict[str, Any]] = None,
+    ):
+        self.schema = schema
+        self.fragments = fragments
+        self.variables = variables or {}
+        self.cost = 0
+        self.max_nested_depth = 0
+
+    def _arguments(self, node: FieldNode) -> Dict[str, Any]:
+        return {
+            argument.name.value: value_from_ast_untyped(argument.value, self.variables)
+            for argument in node.arguments or ()
+        }
+
+    def _multiplier(
+        self, key: str, node: FieldNode, field: GraphQLField, is_list: bool, page_size: Optional[int]
+    ) -> Tuple[int, Optional[int]]:
+        """How many times the field's selections are resolved, and the page size for its children.
+
+        A paginated wrapper such as PaginatedResources is resolved once, and
+        its page size applies to the list inside it. An omitted page size
+        argument counts as its schema default, and one below 1 as the
+        largest page.
+        """
+        arguments = self._arguments(node)
+        size = None
+        for name in PAGE_SIZE_ARGUMENTS:
+            if name not in field.args:
+                continue
+            value = arguments.get(name, field.args[name].default_value)
+            if isinstance(value, int):
+                size = min(value, MAX_PAGE_SIZE) if value >= 1 else MAX_PAGE_SIZE
+                break
+
+        if not is_list:
+            return 1, size
+        if size is not None:
+            return size, None
+        # Batch fields resolve one element per requested key
+        for value in arguments.values():
+            if isinstance(value, list):
+                return len(value), None
+        if page_size is not None:
+            return page_size, None
+        return LIST_SIZES.get(key, DEFAULT_LIST_SIZE), None
+
+    def selection_set_cost(
+        self,
+        selection_set: Optional[SelectionSetNode],
+        parent_type: GraphQLObjectType,
+        nested_depth: int = 0,
+        fragments_seen: frozenset = frozenset(),
+        page_size: Optional[int] = None,
+    ) -> int:
+        if selection_set is None:
+            return 0
+
+        cost = 0
+        for selection in selection_set.selections:
+            if isinstance(selection, FragmentSpreadNode):
+                name = selection.name.value
+                fragment = self.fragments.get(name)
+                if fragment is None or name in fragments_seen:
+                    continue
+                fragment_type = self.schema.get_type(fragment.type_condition.name.value)
+                cost += self.selection_set_cost(
+                    fragment.selection_set,
+                    fragment_type if is_object_type(fragment_type) else parent_type,
+                    nested_depth,
+                    fragments_seen | {name},
+                    page_size,
+                )
+            elif isinstance(selection, InlineFragmentNode):
+                fragment_type = (
+                    self.schema.get_type(selection.type_condition.name.value)
+                    if selection.type_condition else parent_type
+                )
+                cost += self.selection_set_cost(
+                    selection.selection_set,
+                    fragment_type if is_object_type(fragment_type) else parent_type,
+                    nested_depth,
+                    fragments_seen,
+                    page_size,
+                )
+            else:
+                cost += self.field_cost(selection, parent_type, nested_depth, fragments_seen, page_size)
+        return cost
+
+    def field_cost(
+        self,
+        node: FieldNode,
+        parent_type: GraphQLObjectType,
+        nested_depth: int,
+        fragments_seen: frozenset,
+        page_size: Optional[int] = None,
+    ) -> int:
+        name = node.name.value
+        field = parent_type.fields.get(name)
+        # Introspection and unknown fields (already rejected by validation) are free
+        if name.startswith("__") or field is None:
+            return 0
+
+        field_type, is_list = _unwrap(field.type)
+        if not is_object_type(field_type):
+            return 0
+
+        key = f"{parent_type.name}.{name}"
+        if key == NESTED_PROPERTIES:
+            nested_depth += 1
+            self.max_nested_depth = max(self.max_nested_depth, nested_depth)
+
+        multiplier, child_page_size = self._multiplier(key, node, field, is_list, page_size)
+        children = self.selection_set_cost(
+            node.selection_set, field_type, nested_depth, fragments_seen, child_page_size
+        )
+        return FIELD_WEIGHTS.get(key, 0) + multiplier * (1 + children)
+
+
+def estimate_cost(
+    schema: GraphQLSchema,
+    document,
+    operation_name: Optional[str] = None,
+    variables: Optional[Dict[str, Any]] = None,
+) -> QueryCostEstimator:
+    """Estimate the operation that will be executed; the result carries ``cost``."""
+    fragments = {
+        definition.name.value: definition
+        for definition in document.definitions
+        if isinstance(definition, FragmentDefinitionNode)
+    }
+    operations = [
+        definition for definition in document.definitions
+        if isinstance(definition, OperationDefinitionNode)
+        and (operation_name is None or (definition.name and definition.name.value == operation_name))
+    ]
+
+    estimator = QueryCostEstimator(schema, fragments, variables)
+    if operations:
+        operation = operations[0]
+        root_type = schema.get_root_type(operation.operation)
+        if root_type is not None:
+            estimator.cost = estimator.selection_set_cost(operation.selection_set, root_type)
+    return estimator
+
+
+class QueryCostLimiter(SchemaExtension):
+    """Reject operations whose estimated cost or nestedProperties depth is over the limits."""
+
+    def on_execute(self) -> Iterator[None]:
+        execution_context = self.execution_context
+        estimate = estimate_cost(
+            execution_context.schema._schema,
+            execution_context.graphql_document,
+            execution_context.operation_name,
+            execution_context.variables,
+        )
+        if estimate.max_nested_depth > settings.GRAPHQL_MAX_NESTED_PROPERTIES_DEPTH:
+            raise GraphQLError(
+                f"nestedProperties is selected {estimate.max_nested_depth} levels deep; "
+                f"the maximum is {settings.GRAPHQL_MAX_NESTED_PROPERTIES_DEPTH}",
+                extensions={"code": "QUERY_TOO_DEEP"},
+            )
+        if estimate.cost > settings.GRAPHQL_MAX_QUERY_COST:
+            raise GraphQLError(
+                f"Query cost {estimate.cost} exceeds the maximum of {settings.GRAPHQL_MAX_QUERY_COST}; "
+                "select fewer nestedProperties levels, aliases or list items",
+                extensions={"code": "QUERY_TOO_EXPENSIVE", "cost": estimate.cost},
+            )
+        yield
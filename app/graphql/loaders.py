@@ -0,0 +1,196 @@
+"""Request-scoped DataLoaders that batch sibling lookups into IN (...) queries.
+
+Each GraphQL request gets a fresh :class:`Loaders` through the Strawberry
+context, so aliased ``resourceDetail`` fields in one document share a single
+set of batched queries and a per-request cache of rows already loaded.
+"""
+import asyncio
+from typing import Dict, List, Optional, Sequence, Set
+from sqlmodel import Session, select
+from strawberry.dataloader import DataLoader
+from app.database import run_db
+from app.models import (
+    Region as RegionModel,
+    Resource as ResourceModel,
+    ResourceRegion,
+    ResourceAttribute as ResourceAttributeModel,
+    Property as PropertyModel,
+    PropertyType as PropertyTypeModel,
+)
+from app.catalog import PropertyGraph
+from app.catalog.property_graph import PROPERTY_COLUMNS, PROPERTY_TYPE_COLUMNS, reachable_types_by_resource
+from app.catalog.rows import PropertyRow, PropertyTypeRow
+
+# Property selections up to this many nestedProperties levels are loaded level
+# by level; deeper ones load the whole graph through the recursive CTE.
+LEVELWISE_MAX_DEPTH = 1
+
+
+def _group(rows, key: str, keys: Sequence[int]) -> List[list]:
+    """Group rows by an attribute, in the order of the requested keys."""
+    grouped: Dict[int, list] = {k: [] for k in keys}
+    for row in rows:
+        grouped[getattr(row, key)].append(row)
+    return [grouped[k] for k in keys]
+
+
+def _load_resources(db: Session, keys: List[int]) -> List[Optional[ResourceModel]]:
+    rows = db.exec(select(ResourceModel).where(ResourceModel.id.in_(keys))).all()
+    by_id = {row.id: row for row in rows}
+    return [by_id.get(key) for key in keys]
+
+
+def _load_resource_ids_by_type(db: Session, keys: List[str]) -> List[Optional[int]]:
+    statement = (
+        select(ResourceModel.resource_type, ResourceModel.id)
+        .where(ResourceModel.resource_type.in_(keys))
+    )
+    by_type = dict(db.exec(statement).all())
+    return [by_type.get(key) for key in keys]
+
+
+def _load_attributes(db: Session, keys: List[int]) -> List[List[ResourceAttributeModel]]:
+    statement = (
+        select(ResourceAttributeModel)
+        .where(ResourceAttributeModel.resource_id.in_(keys))
+        .order_by(ResourceAttributeModel.id)
+    )
+    return _group(db.exec(statement).all(), "resource_id", keys)
+
+
+def _load_regions(db: Session, keys: List[int]) -> List[List[RegionModel]]:
+    statement = (
+        select(ResourceRegion.resource_id, RegionModel)
+        .join(RegionModel, RegionModel.id == ResourceRegion.region_id)
+        .where(ResourceRegion.resource_id.in_(keys))
+        .order_by(ResourceRegion.id)
+    )
+    grouped: Dict[int, List[RegionModel]] = {key: [] for key in keys}
+    for resource_id, region in db.exec(statement).all():
+        grouped[resource_id].append(region)
+    return [grouped[key] for key in keys]
+
+
+def _load_property_types(db: Session, keys: List[int]) -> List[Optional[PropertyTypeRow]]:
+    statement = select(*PROPERTY_TYPE_COLUMNS).where(PropertyTypeModel.id.in_(keys))
+    by_id = {row[0]: PropertyTypeRow(*row) for row in db.exec(statement).all()}
+    return [by_id.get(key) for key in keys]
+
+
+def _load_properties_by_resource(db: Session, keys: List[int]) -> List[List[PropertyRow]]:
+    statement = (
+        select(*PROPERTY_COLUMNS)
+        .where(PropertyModel.resource_id.in_(keys))
+        .order_by(PropertyModel.property_name)
+    )
+    return _group([PropertyRow(*row) for row in db.exec(statement).all()], "resource_id", keys)
+
+
+def _load_properties_by_type(db: Session, keys: List[int]) -> List[List[PropertyRow]]:
+    statement = (
+        select(*PROPERTY_COLUMNS)
+        .where(PropertyModel.property_type_id.in_(keys))
+        .order_by(PropertyModel.id)
+    )
+    return _group([PropertyRow(*row) for row in db.exec(statement).all()], "property_type_id", keys)
+
+
+def _load_reachable_types(db: Session, keys: List[int]) -> List[Set[int]]:
+    reachable = reachable_types_by_resource(db, keys)
+    return [reachable.get(key, set()) for key in keys]
+
+
+def _batched(fn) -> DataLoader:
+    """DataLoader running a sync ``fn(session, keys)`` batch through run_db."""
+    async def load(keys: list):
+        return await run_db(fn, keys)
+    return DataLoader(load_fn=load)
+
+
+class Loaders:
+    """All DataLoaders for one GraphQL request."""
+
+    def __init__(self):
+        self.resource = _batched(_load_resources)
+        self.resource_id_by_type = _batched(_load_resource_ids_by_type)
+        self.attributes_by_resource = _batched(_load_attributes)
+        self.regions_by_resource = _batched(_load_regions)
+        self.property_type = _batched(_load_property_types)
+        self.properties_by_resource = _batched(_load_properties_by_resource)
+        self.properties_by_type = _batched(_load_properties_by_type)
+        self.reachable_types_by_resource = _batched(_load_reachable_types)
+
+    async def property_graph(self, resource_id: int, max_depth: Optional[int] = None) -> PropertyGraph:
+        """Property graph of one resource, batched with any concurrent requests.
+
+        Types shared between resources (``Tag``...) are loaded once per request.
+        With a small ``max_depth`` only the levels that will be built are loaded.
+        """
+        return await self.property_graph_many([resource_id], max_depth)
+
+    async def property_graph_many(
+        self, resource_ids: Sequence[int], max_depth: Optional[int] = None
+    ) -> PropertyGraph:
+        """One property graph covering several resources.
+
+        The queries issued do not depend on the number of resources, and each
+        type appears once in the graph however many resources reach it.
+        """
+        if max_depth is not None and max_depth <= LEVELWISE_MAX_DEPTH:
+            return await self._property_graph_levels(resource_ids, max_depth)
+
+        roots, reachable = await asyncio.gather(
+            self.properties_by_resource.load_many(resource_ids),
+            self.reachable_types_by_resource.load_many(resource_ids),
+        )
+        type_ids = sorted(set().union(*reachable))
+        types, properties = await asyncio.gather(
+            self.property_type.load_many(type_ids),
+            self.properties_by_type.load_many(type_ids),
+        )
+        return PropertyGraph(
+            types={type_id: row for type_id, row in zip(type_ids, types) if row is not None},
+            properties_by_type=dict(zip(type_ids, properties)),
+            root_properties=dict(zip(resource_ids, roots)),
+        )
+
+    async def _property_graph_levels(self, resource_ids: Sequence[int], max_depth: int) -> PropertyGraph:
+        """Load roots plus ``max_depth`` levels of nested properties.
+
+        Types referenced from the last level are still loaded so that their
+        ``complex_type_name`` can be shown.
+        """
+        roots = await self.properties_by_resource.load_many(resource_ids)
+        types: Dict[int, PropertyTypeRow] = {}
+        properties_by_type: Dict[int, List[PropertyRow]] = {}
+        seen: Set[int] = set()
+
+        frontier = [prop for props in roots for prop in props]
+        for level in range(max_depth + 1):
+            type_ids = sorted(
+                {prop.complex_type_id for prop in frontier if prop.complex_type_id} - seen
+            )
+            if not type_ids:
+                break
+            seen.update(type_ids)
+
+            if level == max_depth:
+                rows = await self.property_type.load_many(type_ids)
+                properties = [[] for _ in type_ids]
+            else:
+                rows, properties = await asyncio.gather(
+                    self.property_type.load_many(type_ids),
+                    self.properties_by_type.load_many(type_ids),
+                )
+                properties_by_type.update(zip(type_ids, properties))
+
+            types.update(
+                (type_id, row) for type_id, row in zip(type_ids, rows) if row is not None
+            )
+            frontier = [prop for props in properties for prop in props]
+
+        return PropertyGraph(
+            types=types,
+            properties_by_type=properties_by_type,
+            root_properties=dict(zip(resource_ids, roots)),
+        )
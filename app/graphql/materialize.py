@@ -0,0 +1,107 @@
+"""Offline materialization of every resource's property tree.
+
+Usage::
+
+    python -m app.graphql.materialize           # build the store
+    python -m app.graphql.materialize --check   # compare it with the live builder
+
+The store path comes from ``PROPERTY_TREE_STORE_PATH``.
+"""
+import argparse
+import logging
+import sys
+import time
+from typing import Iterator, List, Tuple
+from sqlmodel import Session, select
+from app.database import engine
+from app.models import Resource as ResourceModel
+from app.catalog import (
+    PropertyTreeStore,
+    catalog_fingerprint,
+    get_property_tree_store,
+    load_property_graph,
+)
+from app.graphql.utils import (
+    SharedSubtreeBuilder,
+    build_resource_properties,
+    deserialize_properties,
+    property_to_json,
+    serialize_properties,
+)
+
+logger = logging.getLogger(__name__)
+
+# Resources whose property graph is loaded and built together
+BATCH_SIZE = 200
+
+
+def _resource_ids(db: Session) -> List[int]:
+    return list(db.exec(select(ResourceModel.id).order_by(ResourceModel.id)).all())
+
+
+def _live_trees(db: Session, resource_ids: List[int]) -> Iterator[Tuple[int, list]]:
+    """Build full property trees with the live builder, one graph per batch."""
+    for start in range(0, len(resource_ids), BATCH_SIZE):
+        batch = resource_ids[start:start + BATCH_SIZE]
+        graph = load_property_graph(db, batch)
+        builder = SharedSubtreeBuilder(graph)
+        for resource_id in batch:
+            yield resource_id, build_resource_properties(resource_id, graph, builder=builder)
+
+
+def materialize_property_trees(db: Session, store: PropertyTreeStore) -> int:
+    """Build and store the tree of every resource; returns the number stored."""
+    fingerprint = catalog_fingerprint(db)
+    trees = (
+        (resource_id, serialize_properties(properties))
+        for resource_id, properties in _live_trees(db, _resource_ids(db))
+    )
+    return store.replace(fingerprint, trees)
+
+
+def check_property_trees(db: Session, store: PropertyTreeStore) -> List[int]:
+    """Resource ids whose stored tree is missing or differs from the live builder."""
+    if store.fingerprint() != catalog_fingerprint(db):
+        logger.warning("Property tree store was built from a different catalog")
+
+    resource_ids = _resource_ids(db)
+    stored = store.get_many(resource_ids)
+    mismatched = []
+    for resource_id, properties in _live_trees(db, resource_ids):
+        payload = stored.get(resource_id)
+        if payload is None or (
+            [property_to_json(prop) for prop in deserialize_properties(payload)]
+            != [property_to_json(prop) for prop in properties]
+        ):
+            mismatched.append(resource_id)
+    return mismatched
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--check", action="store_true", help="verify the store instead of rebuilding it")
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
+
+    store = get_property_tree_store()
+    if store is None:
+        logger.error("PROPERTY_TREE_STORE_PATH is not set")
+        return 2
+
+    started = time.perf_counter()
+    with Session(engine) as db:
+        if args.check:
+            mismatched = check_property_trees(db, store)
+            if mismatched:
+                logger.error("%d stored trees differ from the live builder: %s", len(mismatched), mismatched[:20])
+                return 1
+            logger.info("All stored trees match (%.1fs)", time.perf_counter() - started)
+            return 0
+
+        count = materialize_property_trees(db, store)
+    logger.info("Materialized %d property trees in %.1fs: %s", count, time.perf_counter() - started, store.stats())
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,62 @@
+"""Persisted and automatic persisted queries (APQ).
+
+Clients send ``extensions.persistedQuery.sha256Hash`` instead of the
+document, which keeps requests small enough for GET and thus cacheable by
+browsers and CDNs. Documents are registered on first use (Apollo's APQ
+protocol) or preloaded from a ``{hash: document}`` JSON manifest.
+"""
+import hashlib
+import json
+import threading
+from collections import OrderedDict
+from typing import Optional
+from app.config import settings
+
+
+def query_hash(query: str) -> str:
+    """SHA-256 hex digest identifying a query document."""
+    return hashlib.sha256(query.encode()).hexdigest()
+
+
+class PersistedQueries:
+    """Bounded LRU map of query hash to document, plus a pinned manifest."""
+
+    def __init__(self, max_entries: int, manifest_path: str = ""):
+        self.max_entries = max_entries
+        self._registered: "OrderedDict[str, str]" = OrderedDict()
+        self._manifest = {}
+        self._lock = threading.Lock()
+        if manifest_path:
+            with open(manifest_path) as manifest:
+                self._manifest = json.load(manifest)
+
+    def get(self, sha256_hash: str) -> Optional[str]:
+        """Document registered for a hash, or None."""
+        query = self._manifest.get(sha256_hash)
+        if query is not None:
+            return query
+        with self._lock:
+            query = self._registered.get(sha256_hash)
+            if query is not None:
+                self._registered.move_to_end(sha256_hash)
+            return query
+
+    def register(self, sha256_hash: str, query: str) -> None:
+        """Remember a document under its hash (the caller verifies the hash)."""
+        if sha256_hash in self._manifest:
+            return
+        with self._lock:
+            self._registered[sha256_hash] = query
+            self._registered.move_to_end(sha256_hash)
+            while len(self._registered) > self.max_entries:
+                self._registered.popitem(last=False)
+
+    def stats(self) -> dict:
+        """Number of pinned and registered documents."""
+        with self._lock:
+            return {"manifest": len(self._manifest), "registered": len(self._registered)}
+
+
+persisted_queries = PersistedQueries(
+    settings.PERSISTED_QUERIES_MAX_ENTRIES, settings.PERSISTED_QUERIES_MANIFEST
+)
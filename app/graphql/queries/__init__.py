@@ -1,6 +1,8 @@
 """GraphQL queries package."""
 from app.graphql.queries.region import RegionQueries
 from app.graphql.queries.resource import ResourceQueries
+from app.graphql.queries.region_set import RegionSetQueries
+from app.graphql.queries.catalog import CatalogQueries
 
-__all__ = ["RegionQueries", "ResourceQueries"]
+__all__ = ["RegionQueries", "ResourceQueries", "RegionSetQueries", "CatalogQueries"]
 
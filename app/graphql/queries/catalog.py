@@ -0,0 +1,58 @@
+"""Catalog version and change feed GraphQL queries."""
+from typing import List
+import strawberry
+from app.database import run_db
+from app.catalog import ChangeSet, changes_since, get_snapshot, latest_catalog_version
+from app.graphql.types import CatalogChanges, ResourceChange
+
+
+def _to_catalog_changes(change_set: ChangeSet) -> CatalogChanges:
+    resources: List[ResourceChange] = [
+        ResourceChange(
+            resource_id=resource.resource_id,
+            resource_type=resource.resource_type,
+            change=resource.change,
+            version=resource.version,
+            properties=list(resource.properties),
+            attributes=list(resource.attributes),
+            regions_added=list(resource.regions_added),
+            regions_removed=list(resource.regions_removed)
+        )
+        for resource in change_set.resources
+    ]
+    return CatalogChanges(
+        since_version=change_set.since,
+        catalog_version=change_set.version,
+        full_refresh=change_set.full_refresh,
+        regions_changed=change_set.regions_changed,
+        resources=resources
+    )
+
+
+@strawberry.type
+class CatalogQueries:
+    """Catalog version query resolvers."""
+    
+    @strawberry.field
+    async def catalog_version(self) -> int:
+        """Version of the catalog being served (0 before the first ingest).
+        
+        Remember it and pass it to changesSince later.
+        """
+        snapshot = get_snapshot()
+        if snapshot is not None:
+            return snapshot.catalog_version
+        
+        return await run_db(latest_catalog_version)
+    
+    @strawberry.field
+    async def changes_since(self, version: int) -> CatalogChanges:
+        """Resources added, updated or removed after a catalog version.
+        
+        Args:
+            version: Catalog version the client last saw
+        """
+        snapshot = get_snapshot()
+        # A snapshot only serves the changes it was loaded with
+        until = snapshot.catalog_version if snapshot is not None else None
+        return _to_catalog_changes(await run_db(changes_since, version, until))
@@ -2,9 +2,17 @@
 from typing import List
 import strawberry
 from sqlmodel import Session, select
-from app.database import get_db
+from app.database import run_db
 from app.models import Region as RegionModel
+from app.catalog import get_snapshot
 from app.graphql.types import Region
+from app.graphql.utils import to_regions
+
+
+def _query_regions(db: Session) -> List[Region]:
+    """All regions ordered by region code."""
+    statement = select(RegionModel).order_by(RegionModel.region_code)
+    return to_regions(db.exec(statement).all())
 
 
 @strawberry.type
@@ -12,20 +20,10 @@ class RegionQueries:
     """Region query resolvers."""
     
     @strawberry.field
-    def regions(self, info) -> List[Region]:
+    async def regions(self, info) -> List[Region]:
         """Get all available AWS regions."""
-        db: Session = next(get_db())
-        try:
-            statement = select(RegionModel).order_by(RegionModel.region_code)
-            regions = db.exec(statement).all()
-            return [
-                Region(
-                    id=region.id,
-                    region_code=region.region_code,
-                    region_name=region.region_name
-                )
-                for region in regions
-            ]
-        finally:
-            db.close()
-
+        snapshot = get_snapshot()
+        if snapshot is not None:
+            return to_regions(snapshot.regions)
+        
+        return await run_db(_query_regions)
@@ -0,0 +1,88 @@
+"""Cross-region GraphQL queries backed by the region bitset index."""
+from typing import List
+import strawberry
+from app.database import run_db
+from app.catalog import RegionIndex, get_region_index, load_region_index
+from app.graphql.types import PaginatedResources, RegionResourceCount
+from app.graphql.utils import page_bounds, paginate, to_regions
+
+
+async def region_index() -> RegionIndex:
+    """Region index for the current catalog version, building it on first use."""
+    return get_region_index() or await run_db(load_region_index)
+
+
+def _page(index: RegionIndex, bits: int, limit: int, offset: int) -> PaginatedResources:
+    """One page of a resource set, with limit and offset clamped like every paginated field."""
+    limit, offset = page_bounds(limit, offset)
+    resources = index.resources_in(bits)
+    return paginate(resources[offset:offset + limit], len(resources), limit, offset)
+
+
+@strawberry.type
+class RegionSetQueries:
+    """Resolvers combining the resource sets of several regions."""
+    
+    @strawberry.field
+    async def resources_in_all_regions(
+        self,
+        region_ids: List[int],
+        limit: int = 50,
+        offset: int = 0
+    ) -> PaginatedResources:
+        """Resources available in every one of the given regions.
+        
+        Args:
+            region_ids: IDs of the AWS regions
+            limit: Number of resources per page (default: 50, clamped to 1..100)
+            offset: Number of resources to skip (default: 0, at least 0)
+        """
+        index = await region_index()
+        return _page(index, index.intersection(region_ids), limit, offset)
+    
+    @strawberry.field
+    async def resources_in_any_region(
+        self,
+        region_ids: List[int],
+        limit: int = 50,
+        offset: int = 0
+    ) -> PaginatedResources:
+        """Resources available in at least one of the given regions.
+        
+        Args:
+            region_ids: IDs of the AWS regions
+            limit: Number of resources per page (default: 50, clamped to 1..100)
+            offset: Number of resources to skip (default: 0, at least 0)
+        """
+        index = await region_index()
+        return _page(index, index.union(region_ids), limit, offset)
+    
+    @strawberry.field
+    async def resources_missing_from_regions(
+        self,
+        region_id: int,
+        missing_region_ids: List[int],
+        limit: int = 50,
+        offset: int = 0
+    ) -> PaginatedResources:
+        """Resources available in a region but in none of the other given regions.
+        
+        Args:
+            region_id: ID of the region the resources must be available in
+            missing_region_ids: IDs of the regions they must be missing from
+            limit: Number of resources per page (default: 50, clamped to 1..100)
+            offset: Number of resources to skip (default: 0, at least 0)
+        """
+        index = await region_index()
+        return _page(index, index.difference(region_id, missing_region_ids), limit, offset)
+    
+    @strawberry.field
+    async def region_resource_counts(self) -> List[RegionResourceCount]:
+        """Number of available resources for every region."""
+        index = await region_index()
+        counts = index.counts()
+        regions = to_regions(region for region, _ in counts)
+        return [
+            RegionResourceCount(region=region, resource_count=count)
+            for region, (_, count) in zip(regions, counts)
+        ]
@@ -1,23 +1,407 @@
 """Resource-related GraphQL queries."""
-from typing import List, Optional
+import asyncio
+from typing import Dict, List, Optional, Sequence, Tuple
 import strawberry
 from sqlmodel import Session, select
-from sqlalchemy.orm import selectinload
-from sqlalchemy import func
-from app.database import get_db
+from sqlalchemy import func, tuple_
+from app.config import settings
+from app.database import run_db
 from app.models import (
     Resource as ResourceModel,
     ResourceRegion,
-    Property as PropertyModel
+)
+from app.catalog import (
+    MISSING,
+    get_catalog_version,
+    get_property_tree_store,
+    get_region_index,
+    get_resource_detail_cache,
+    get_search_index,
+    get_snapshot,
+    load_region_index,
+    load_search_index,
+    region_counts,
 )
 from app.graphql.types import (
-    ResourceSummary,
     ResourceDetail,
     ResourceAttribute,
     Region,
-    PaginatedResources
+    PaginatedResources,
+    ResourceConnection,
+    ResourceSearchResult,
+    ResourcePropertyGraph
+)
+from app.graphql.context import get_loaders
+from app.graphql.loaders import LEVELWISE_MAX_DEPTH, Loaders
+from app.graphql.utils import (
+    PropertyTreeNode,
+    ResourceDetailSelection,
+    SharedSubtreeBuilder,
+    build_normalized_graph,
+    build_resource_properties,
+    decode_cursor,
+    deserialize_properties,
+    encode_cursor,
+    field_selections,
+    page_bounds,
+    paginate,
+    resource_detail_selection,
+    selects,
+    to_summaries,
 )
-from app.graphql.utils import build_property_tree
+
+
+def _resource_detail(resource, properties, attributes, regions) -> ResourceDetail:
+    """Assemble a ResourceDetail from resource, attribute and region rows."""
+    return ResourceDetail(
+        id=resource.id,
+        resource_type=resource.resource_type,
+        documentation_url=resource.documentation_url,
+        properties=properties,
+        attributes=[
+            ResourceAttribute(
+                id=attr.id,
+                attribute_name=attr.attribute_name,
+                primitive_type=attr.primitive_type,
+                is_list=attr.is_list or False,
+                list_item_type=attr.list_item_type
+            )
+            for attr in attributes
+        ],
+        available_regions=[
+            Region(
+                id=region.id,
+                region_code=region.region_code,
+                region_name=region.region_name
+            )
+            for region in regions
+        ]
+    )
+
+
+def _query_resources_by_region(
+    db: Session, region_id: int, limit: int, offset: int
+) -> PaginatedResources:
+    """Page of resources in a region, ordered by resource_type."""
+    # Base query
+    base_statement = (
+        select(ResourceModel)
+        .join(ResourceRegion, ResourceModel.id == ResourceRegion.resource_id)
+        .where(ResourceRegion.region_id == region_id)
+    )
+    
+    # Get total count
+    count_statement = (
+        select(func.count())
+        .select_from(ResourceModel)
+        .join(ResourceRegion, ResourceModel.id == ResourceRegion.resource_id)
+        .where(ResourceRegion.region_id == region_id)
+    )
+    total = db.exec(count_statement).one()
+    
+    # Get paginated resources
+    statement = (
+        base_statement
+        .order_by(ResourceModel.resource_type)
+        .limit(limit)
+        .offset(offset)
+    )
+    resources = db.exec(statement).all()
+    
+    return paginate(resources, total, limit, offset)
+
+
+def _query_search_resources(
+    db: Session, query: str, region_id: Optional[int], limit: int, offset: int
+) -> PaginatedResources:
+    """Page of resources whose type matches the query, ordered by resource_type."""
+    base_statement = select(ResourceModel)
+    count_base = select(func.count()).select_from(ResourceModel)
+    
+    # Filter by region if specified
+    if region_id:
+        base_statement = (
+            base_statement
+            .join(ResourceRegion, ResourceModel.id == ResourceRegion.resource_id)
+            .where(ResourceRegion.region_id == region_id)
+        )
+        count_base = (
+            count_base
+            .join(ResourceRegion, ResourceModel.id == ResourceRegion.resource_id)
+            .where(ResourceRegion.region_id == region_id)
+        )
+    
+    # Apply search filter
+    search_filter = ResourceModel.resource_type.ilike(f"%{query}%")
+    base_statement = base_statement.where(search_filter)
+    count_base = count_base.where(search_filter)
+    
+    # Get total count
+    total = db.exec(count_base).one()
+    
+    # Get paginated results
+    statement = (
+        base_statement
+        .order_by(ResourceModel.resource_type)
+        .limit(limit)
+        .offset(offset)
+    )
+    resources = db.exec(statement).all()
+    
+    return paginate(resources, total, limit, offset)
+
+
+def _connection(rows: Sequence, first: int, total: Optional[int]) -> ResourceConnection:
+    """Wrap up to ``first + 1`` keyset-ordered rows as one connection page."""
+    page = rows[:first]
+    return ResourceConnection(
+        resources=to_summaries(page),
+        end_cursor=encode_cursor(page[-1].resource_type, page[-1].id) if page else None,
+        has_more=len(rows) > first,
+        total=total
+    )
+
+
+def _keyset_page(db: Session, statement, after: Optional[Tuple[str, int]], first: int) -> list:
+    """Seek past the cursor on (resource_type, id) and fetch one extra row for has_more."""
+    if after is not None:
+        statement = statement.where(
+            tuple_(ResourceModel.resource_type, ResourceModel.id) > tuple_(*after)
+        )
+    statement = (
+        statement
+        .order_by(ResourceModel.resource_type, ResourceModel.id)
+        .limit(first + 1)
+    )
+    return db.exec(statement).all()
+
+
+def _query_region_page(
+    db: Session, region_id: int, first: int, after: Optional[Tuple[str, int]], with_total: bool
+) -> Tuple[list, Optional[int]]:
+    """One keyset page of a region's resources, plus its count if requested."""
+    statement = (
+        select(ResourceModel)
+        .join(ResourceRegion, ResourceModel.id == ResourceRegion.resource_id)
+        .where(ResourceRegion.region_id == region_id)
+    )
+    rows = _keyset_page(db, statement, after, first)
+    
+    total = None
+    if with_total:
+        count_statement = (
+            select(func.count())
+            .select_from(ResourceRegion)
+            .where(ResourceRegion.region_id == region_id)
+        )
+        total = db.exec(count_statement).one()
+    return rows, total
+
+
+def _query_search_page(
+    db: Session,
+    query: str,
+    region_id: Optional[int],
+    first: int,
+    after: Optional[Tuple[str, int]],
+    with_total: bool
+) -> Tuple[list, Optional[int]]:
+    """One keyset page of search results, plus their count if requested."""
+    search_filter = ResourceModel.resource_type.ilike(f"%{query}%")
+    statement = select(ResourceModel).where(search_filter)
+    count_statement = select(func.count()).select_from(ResourceModel).where(search_filter)
+    
+    if region_id:
+        statement = (
+            statement
+            .join(ResourceRegion, ResourceModel.id == ResourceRegion.resource_id)
+            .where(ResourceRegion.region_id == region_id)
+        )
+        count_statement = (
+            count_statement
+            .join(ResourceRegion, ResourceModel.id == ResourceRegion.resource_id)
+            .where(ResourceRegion.region_id == region_id)
+        )
+    
+    rows = _keyset_page(db, statement, after, first)
+    total = db.exec(count_statement).one() if with_total else None
+    return rows, total
+
+
+async def _nothing() -> None:
+    """Placeholder for relations the query did not select."""
+    return None
+
+
+async def _stored_properties(
+    resource_ids: Sequence[int],
+    selection: ResourceDetailSelection
+) -> Dict[int, List[PropertyTreeNode]]:
+    """Pre-built property trees from the property tree store.
+    
+    Only used for deep property selections, where building the tree is the
+    expensive part, and only while the store matches the current catalog.
+    """
+    store = get_property_tree_store()
+    if store is None or not selection.properties or selection.property_depth <= LEVELWISE_MAX_DEPTH:
+        return {}
+    
+    matches = store.cached_match()
+    if matches is None:
+        matches = await run_db(store.matches_catalog)
+    if not matches:
+        return {}
+    
+    return {
+        resource_id: deserialize_properties(payload)
+        for resource_id, payload in store.get_many(resource_ids).items()
+    }
+
+
+async def _fetch_resource_detail(
+    resource_id: int,
+    loaders: Loaders,
+    selection: ResourceDetailSelection
+) -> Optional[ResourceDetail]:
+    """Build a resource's details from the catalog snapshot or the database.
+    
+    Only the relations in ``selection`` are loaded, and the property tree is
+    built no deeper than the nestedProperties levels the query selected.
+    Unselected lists are left empty. Database lookups go through the
+    request's DataLoaders, so several aliased resourceDetail fields share
+    batched queries.
+    """
+    snapshot = get_snapshot()
+    if snapshot is not None:
+        resource = snapshot.resources_by_id.get(resource_id)
+        if not resource:
+            return None
+        return _resource_detail(
+            resource,
+            build_resource_properties(
+                resource_id, snapshot.graph, max_depth=selection.property_depth
+            ) if selection.properties else [],
+            snapshot.attributes_by_resource.get(resource_id, ()) if selection.attributes else [],
+            snapshot.regions_for_resource(resource_id) if selection.available_regions else []
+        )
+    
+    resource = await loaders.resource.load(resource_id)
+    if not resource:
+        return None
+    
+    stored = (await _stored_properties([resource_id], selection)).get(resource_id)
+    attributes, regions, graph = await asyncio.gather(
+        loaders.attributes_by_resource.load(resource_id) if selection.attributes else _nothing(),
+        loaders.regions_by_resource.load(resource_id) if selection.available_regions else _nothing(),
+        loaders.property_graph(
+            resource_id, selection.property_depth
+        ) if selection.properties and stored is None else _nothing(),
+    )
+    if stored is None and graph is not None:
+        stored = build_resource_properties(
+            resource_id, graph, max_depth=selection.property_depth
+        )
+    return _resource_detail(
+        resource,
+        stored or [],
+        attributes or [],
+        regions or []
+    )
+
+
+async def _fetch_resource_details(
+    resource_ids: Sequence[int],
+    loaders: Loaders,
+    selection: ResourceDetailSelection
+) -> Dict[int, Optional[ResourceDetail]]:
+    """Build the details of several resources with set-based loading.
+    
+    Every relation is loaded for all resources at once, into one property
+    graph, so the number of queries does not grow with the batch and type
+    subtrees shared between the resources are built only once.
+    """
+    snapshot = get_snapshot()
+    if snapshot is not None:
+        builder = SharedSubtreeBuilder(snapshot.graph)
+        details = {}
+        for resource_id in resource_ids:
+            resource = snapshot.resources_by_id.get(resource_id)
+            details[resource_id] = _resource_detail(
+                resource,
+                build_resource_properties(
+                    resource_id, snapshot.graph,
+                    max_depth=selection.property_depth, builder=builder
+                ) if selection.properties else [],
+                snapshot.attributes_by_resource.get(resource_id, ()) if selection.attributes else [],
+                snapshot.regions_for_resource(resource_id) if selection.available_regions else []
+            ) if resource else None
+        return details
+    
+    resources = await loaders.resource.load_many(resource_ids)
+    found = [resource.id for resource in resources if resource]
+    properties = await _stored_properties(found, selection)
+    unbuilt = [resource_id for resource_id in found if resource_id not in properties]
+    attributes, regions, graph = await asyncio.gather(
+        loaders.attributes_by_resource.load_many(found) if selection.attributes else _nothing(),
+        loaders.regions_by_resource.load_many(found) if selection.available_regions else _nothing(),
+        loaders.property_graph_many(
+            unbuilt, selection.property_depth
+        ) if selection.properties and unbuilt else _nothing(),
+    )
+    attributes = dict(zip(found, attributes or []))
+    regions = dict(zip(found, regions or []))
+    if graph is not None:
+        builder = SharedSubtreeBuilder(graph)
+        for resource_id in unbuilt:
+            properties[resource_id] = build_resource_properties(
+                resource_id, graph, max_depth=selection.property_depth, builder=builder
+            )
+    
+    return {
+        resource_id: _resource_detail(
+            resource,
+            properties.get(resource_id, []),
+            attributes.get(resource_id, []),
+            regions.get(resource_id, [])
+        ) if resource else None
+        for resource_id, resource in zip(resource_ids, resources)
+    }
+
+
+async def _resource_details_in_order(
+    resource_ids: Sequence[Optional[int]],
+    loaders: Loaders,
+    selection: ResourceDetailSelection
+) -> List[Optional[ResourceDetail]]:
+    """Details for resource ids (None for unknown ones), in input order.
+    
+    Goes through the resourceDetail cache when it is enabled, so only
+    uncached resources are loaded.
+    """
+    unique_ids = list(dict.fromkeys(resource_id for resource_id in resource_ids if resource_id is not None))
+    cache = get_resource_detail_cache()
+    details: Dict[int, Optional[ResourceDetail]] = {}
+    
+    missing = unique_ids
+    if cache is not None:
+        missing = []
+        for resource_id in unique_ids:
+            cached = cache.get((resource_id, selection))
+            if cached is MISSING:
+                missing.append(resource_id)
+            else:
+                details[resource_id] = cached
+    
+    if missing:
+        version = get_catalog_version()
+        fetched = await _fetch_resource_details(missing, loaders, selection)
+        details.update(fetched)
+        if cache is not None:
+            for resource_id, detail in fetched.items():
+                if detail is not None:
+                    cache.put((resource_id, selection), detail, version)
+    
+    return [details.get(resource_id) for resource_id in resource_ids]
 
 
 @strawberry.type
@@ -25,9 +409,9 @@ class ResourceQueries:
     """Resource query resolvers."""
     
     @strawberry.field
-    def resources_by_region(
-        self, 
-        region_id: int, 
+    async def resources_by_region(
+        self,
+        region_id: int,
         limit: int = 50,
         offset: int = 0,
         info = None
@@ -36,126 +420,101 @@ class ResourceQueries:
         
         Args:
             region_id: ID of the AWS region
-            limit: Number of resources per page (default: 50, max: 100)
-            offset: Number of resources to skip (default: 0)
+            limit: Number of resources per page (default: 50, clamped to 1..100)
+            offset: Number of resources to skip (default: 0, at least 0)
         """
-        # Enforce max limit
-        limit = min(limit, 100)
-        
-        db: Session = next(get_db())
-        try:
-            # Base query
-            base_statement = (
-                select(ResourceModel)
-                .join(ResourceRegion, ResourceModel.id == ResourceRegion.resource_id)
-                .where(ResourceRegion.region_id == region_id)
-            )
-            
-            # Get total count
-            count_statement = (
-                select(func.count())
-                .select_from(ResourceModel)
-                .join(ResourceRegion, ResourceModel.id == ResourceRegion.resource_id)
-                .where(ResourceRegion.region_id == region_id)
-            )
-            total = db.exec(count_statement).one()
-            
-            # Get paginated resources
-            statement = (
-                base_statement
-                .order_by(ResourceModel.resource_type)
-                .limit(limit)
-                .offset(offset)
-            )
-            resources = db.exec(statement).all()
-            
-            return PaginatedResources(
-                resources=[
-                    ResourceSummary(
-                        id=resource.id,
-                        resource_type=resource.resource_type,
-                        documentation_url=resource.documentation_url
-                    )
-                    for resource in resources
-                ],
-                total=total,
-                limit=limit,
-                offset=offset,
-                has_more=(offset + limit) < total
-            )
-        finally:
-            db.close()
+        limit, offset = page_bounds(limit, offset)
+        
+        snapshot = get_snapshot()
+        if snapshot is not None:
+            resources = snapshot.resources_in_region(region_id)
+            return paginate(resources[offset:offset + limit], len(resources), limit, offset)
+        
+        if settings.REGION_INDEX_ENABLED:
+            index = get_region_index() or await run_db(load_region_index)
+            resources = index.resources_in(index.region_bits(region_id))
+            return paginate(resources[offset:offset + limit], len(resources), limit, offset)
+        
+        return await run_db(_query_resources_by_region, region_id, limit, offset)
     
     @strawberry.field
-    def resource_detail(self, resource_id: int, info) -> Optional[ResourceDetail]:
+    async def resource_detail(self, resource_id: int, info) -> Optional[ResourceDetail]:
         """Get complete resource details with all properties, nested structures, and attributes."""
-        db: Session = next(get_db())
-        try:
-            # Get resource with eager loading
-            statement = (
-                select(ResourceModel)
-                .where(ResourceModel.id == resource_id)
-                .options(
-                    selectinload(ResourceModel.properties),
-                    selectinload(ResourceModel.attributes),
-                    selectinload(ResourceModel.resource_regions).selectinload(ResourceRegion.region)
-                )
-            )
-            resource = db.exec(statement).first()
-            
-            if not resource:
+        loaders = get_loaders(info)
+        selection = resource_detail_selection(info)
+        cache = get_resource_detail_cache()
+        if cache is None:
+            return await _fetch_resource_detail(resource_id, loaders, selection)
+        
+        # Results only hold what was selected, so the selection is part of the key
+        cache_key = (resource_id, selection)
+        cached = cache.get(cache_key)
+        if cached is not MISSING:
+            return cached
+        
+        version = get_catalog_version()
+        detail = await _fetch_resource_detail(resource_id, loaders, selection)
+        if detail is not None:
+            cache.put(cache_key, detail, version)
+        return detail
+    
+    @strawberry.field
+    async def resource_details(
+        self, resource_ids: List[int], info
+    ) -> List[Optional[ResourceDetail]]:
+        """Get details of many resources at once, in the order of resourceIds.
+        
+        Loads all of them with a fixed number of queries; unknown ids give null.
+        """
+        return await _resource_details_in_order(
+            resource_ids, get_loaders(info), resource_detail_selection(info)
+        )
+    
+    @strawberry.field
+    async def resource_details_by_type(
+        self, resource_types: List[str], info
+    ) -> List[Optional[ResourceDetail]]:
+        """Get details of many resources by type (e.g. "AWS::S3::Bucket"), in input order.
+        
+        Unknown types give null.
+        """
+        loaders = get_loaders(info)
+        snapshot = get_snapshot()
+        if snapshot is not None:
+            resource_ids = [snapshot.resource_ids_by_type.get(name) for name in resource_types]
+        else:
+            resource_ids = await loaders.resource_id_by_type.load_many(resource_types)
+        
+        return await _resource_details_in_order(
+            resource_ids, loaders, resource_detail_selection(info)
+        )
+    
+    @strawberry.field
+    async def resource_property_graph(self, resource_id: int, info) -> Optional[ResourcePropertyGraph]:
+        """Get a resource's properties as a normalized graph instead of an inlined tree.
+        
+        Shared types such as Tag appear once in types rather than under every
+        property that uses them, so the response is much smaller for
+        resources with deep or shared type graphs.
+        """
+        snapshot = get_snapshot()
+        if snapshot is not None:
+            if resource_id not in snapshot.resources_by_id:
                 return None
-            
-            # Build property tree (only root level properties of the resource)
-            root_statement = (
-                select(PropertyModel)
-                .where(PropertyModel.resource_id == resource_id)
-                .order_by(PropertyModel.property_name)
-            )
-            root_properties = db.exec(root_statement).all()
-            
-            properties = [
-                build_property_tree(prop, db)
-                for prop in root_properties
-            ]
-            
-            # Get attributes
-            attributes = [
-                ResourceAttribute(
-                    id=attr.id,
-                    attribute_name=attr.attribute_name,
-                    primitive_type=attr.primitive_type,
-                    is_list=attr.is_list or False,
-                    list_item_type=attr.list_item_type
-                )
-                for attr in resource.attributes
-            ]
-            
-            # Get available regions
-            available_regions = [
-                Region(
-                    id=rr.region.id,
-                    region_code=rr.region.region_code,
-                    region_name=rr.region.region_name
-                )
-                for rr in resource.resource_regions
-            ]
-            
-            return ResourceDetail(
-                id=resource.id,
-                resource_type=resource.resource_type,
-                documentation_url=resource.documentation_url,
-                properties=properties,
-                attributes=attributes,
-                available_regions=available_regions
-            )
-        finally:
-            db.close()
+            graph = snapshot.graph
+        else:
+            loaders = get_loaders(info)
+            if not await loaders.resource.load(resource_id):
+                return None
+            graph = await loaders.property_graph(resource_id)
+        
+        properties, types = build_normalized_graph(resource_id, graph)
+        return ResourcePropertyGraph(resource_id=resource_id, properties=properties, types=types)
     
     @strawberry.field
-    def search_resources(
-        self, 
-        query: str, 
+    async def search_resources(
+        self,
+        query: str,
         region_id: Optional[int] = None,
         limit: int = 50,
         offset: int = 0,
@@ -166,61 +525,121 @@ class ResourceQueries:
         Args:
             query: Search term to match against resource types
             region_id: Optional region ID to filter by
-            limit: Number of resources per page (default: 50, max: 100)
-            offset: Number of resources to skip (default: 0)
+            limit: Number of resources per page (default: 50, clamped to 1..100)
+            offset: Number of resources to skip (default: 0, at least 0)
         """
-        # Enforce max limit
-        limit = min(limit, 100)
-        
-        db: Session = next(get_db())
-        try:
-            base_statement = select(ResourceModel)
-            count_base = select(func.count()).select_from(ResourceModel)
-            
-            # Filter by region if specified
-            if region_id:
-                base_statement = (
-                    base_statement
-                    .join(ResourceRegion, ResourceModel.id == ResourceRegion.resource_id)
-                    .where(ResourceRegion.region_id == region_id)
-                )
-                count_base = (
-                    count_base
-                    .join(ResourceRegion, ResourceModel.id == ResourceRegion.resource_id)
-                    .where(ResourceRegion.region_id == region_id)
-                )
-            
-            # Apply search filter
-            search_filter = ResourceModel.resource_type.ilike(f"%{query}%")
-            base_statement = base_statement.where(search_filter)
-            count_base = count_base.where(search_filter)
-            
-            # Get total count
-            total = db.exec(count_base).one()
-            
-            # Get paginated results
-            statement = (
-                base_statement
-                .order_by(ResourceModel.resource_type)
-                .limit(limit)
-                .offset(offset)
-            )
-            resources = db.exec(statement).all()
-            
-            return PaginatedResources(
-                resources=[
-                    ResourceSummary(
-                        id=resource.id,
-                        resource_type=resource.resource_type,
-                        documentation_url=resource.documentation_url
-                    )
-                    for resource in resources
-                ],
-                total=total,
-                limit=limit,
-                offset=offset,
-                has_more=(offset + limit) < total
+        limit, offset = page_bounds(limit, offset)
+        
+        snapshot = get_snapshot()
+        if snapshot is not None:
+            resources = snapshot.search(query, region_id)
+            return paginate(resources[offset:offset + limit], len(resources), limit, offset)
+        
+        if settings.REGION_INDEX_ENABLED:
+            index = get_region_index() or await run_db(load_region_index)
+            resources = index.search(query, region_id)
+            return paginate(resources[offset:offset + limit], len(resources), limit, offset)
+        
+        return await run_db(_query_search_resources, query, region_id, limit, offset)
+    
+    @strawberry.field
+    async def resources_by_region_connection(
+        self,
+        region_id: int,
+        first: int = 50,
+        after: Optional[str] = None,
+        info = None
+    ) -> ResourceConnection:
+        """Get resources available in a region with cursor (keyset) pagination.
+        
+        Unlike resourcesByRegion, deep pages cost the same as the first one.
+        
+        Args:
+            region_id: ID of the AWS region
+            first: Number of resources per page (default: 50, clamped to 1..100)
+            after: endCursor of the previous page
+        """
+        first = max(1, min(first, 100))
+        cursor = decode_cursor(after)
+        with_total = selects(field_selections(info), "total")
+        
+        snapshot = get_snapshot()
+        if snapshot is not None:
+            resources = snapshot.resources_in_region(region_id)
+            start = snapshot.seek(resources, cursor)
+            return _connection(resources[start:start + first + 1], first, len(resources))
+        
+        # Per-region counts only change with the catalog, so they are cached
+        version = get_catalog_version()
+        total = region_counts.get(region_id) if with_total else None
+        needs_count = with_total and total is MISSING
+        rows, counted = await run_db(_query_region_page, region_id, first, cursor, needs_count)
+        if needs_count:
+            total = counted
+            region_counts.put(region_id, total, version)
+        return _connection(rows, first, total)
+    
+    @strawberry.field
+    async def search_resources_connection(
+        self,
+        query: str,
+        region_id: Optional[int] = None,
+        first: int = 50,
+        after: Optional[str] = None,
+        info = None
+    ) -> ResourceConnection:
+        """Search resources by type with cursor (keyset) pagination.
+        
+        Args:
+            query: Search term to match against resource types
+            region_id: Optional region ID to filter by
+            first: Number of resources per page (default: 50, clamped to 1..100)
+            after: endCursor of the previous page
+        """
+        first = max(1, min(first, 100))
+        cursor = decode_cursor(after)
+        with_total = selects(field_selections(info), "total")
+        
+        snapshot = get_snapshot()
+        if snapshot is not None:
+            resources = snapshot.search(query, region_id)
+            start = snapshot.seek(resources, cursor)
+            return _connection(resources[start:start + first + 1], first, len(resources))
+        
+        rows, total = await run_db(_query_search_page, query, region_id, first, cursor, with_total)
+        return _connection(rows, first, total)
+    
+    @strawberry.field
+    async def ranked_search_resources(
+        self,
+        query: str,
+        region_id: Optional[int] = None,
+        include_properties: bool = False,
+        limit: int = 20
+    ) -> List[ResourceSearchResult]:
+        """Relevance-ranked search for autocomplete.
+        
+        Matches ``::``-separated and camel-case words of resource types by
+        exact word, prefix, abbreviated camel-case words ("secgr" for
+        SecurityGroup) or small typos, best matches first.
+        
+        Args:
+            query: Search term, e.g. "ec2 secgroup"
+            region_id: Optional region ID to filter by
+            include_properties: Also match root property names (ranked lower)
+            limit: Number of results (default: 20, clamped to 1..100)
+        """
+        limit = max(1, min(limit, 100))
+        
+        index = get_search_index()
+        if index is None:
+            index = await run_db(load_search_index)
+        
+        return [
+            ResourceSearchResult(
+                resource=to_summaries([hit.resource])[0],
+                score=hit.score,
+                matched_properties=list(hit.matched_properties)
             )
-        finally:
-            db.close()
-
+            for hit in index.search(query, region_id, include_properties, limit)
+        ]
@@ -0,0 +1,121 @@
+"""GraphQL HTTP router with persisted queries and conditional GET caching.
+
+Catalog queries are read-only and their results only change with the
+catalog, so GET responses carry an ETag derived from the stored catalog
+version being served (the loaded snapshot's, or the newest one in the
+database) and the operation. Every worker serving the same catalog
+produces the same ETag. A matching ``If-None-Match`` is answered with 304
+before any resolver runs.
+"""
+import dataclasses
+import hashlib
+import json
+from typing import Optional
+from fastapi import Request, Response
+from graphql import GraphQLError
+from strawberry.fastapi import GraphQLRouter
+from strawberry.http import GraphQLRequestData
+from strawberry.types import ExecutionResult
+from app.config import settings
+from app.database import run_db
+from app.catalog import get_snapshot, latest_catalog_version, stored_catalog_version
+from app.graphql.persisted import persisted_queries, query_hash
+
+def _error_result(message: str, code: str) -> ExecutionResult:
+    return ExecutionResult(data=None, errors=[GraphQLError(message, extensions={"code": code})])
+
+
+def _etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """Weak If-None-Match comparison."""
+    if not if_none_match:
+        return False
+    candidates = {tag.strip() for tag in if_none_match.split(",")}
+    return "*" in candidates or etag in candidates or etag[2:] in candidates
+
+
+async def _catalog_key() -> str:
+    snapshot = get_snapshot()
+    if snapshot is not None:
+        return f"snapshot:{snapshot.catalog_version}"
+    # The version follower reads the stored version every CATALOG_VERSION_CHECK_SECONDS;
+    # when it has not done so lately, read it here
+    stored = stored_catalog_version(2 * settings.CATALOG_VERSION_CHECK_SECONDS)
+    if stored is None:
+        stored = await run_db(latest_catalog_version)
+    return f"database:{stored}"
+
+
+async def _etag(request_data: GraphQLRequestData) -> str:
+    operation = json.dumps(
+        [
+            settings.APP_VERSION,
+            await _catalog_key(),
+            request_data.query,
+            request_data.variables,
+            request_data.operation_name,
+        ],
+        sort_keys=True,
+        separators=(",", ":"),
+    )
+    return 'W/"' + hashlib.sha256(operation.encode()).hexdigest()[:32] + '"'
+
+
+class CachingGraphQLRouter(GraphQLRouter):
+    """GraphQLRouter resolving persisted queries and adding HTTP cache validators."""
+
+    async def execute_single(
+        self,
+        request: Request,
+        request_adapter,
+        sub_response: Response,
+        context,
+        root_value,
+        request_data: GraphQLRequestData,
+    ) -> ExecutionResult:
+        persisted = (request_data.extensions or {}).get("persistedQuery")
+        if persisted:
+            sha256_hash = persisted.get("sha256Hash") if isinstance(persisted, dict) else None
+            if not isinstance(sha256_hash, str):
+                return _error_result("persistedQuery must carry a sha256Hash string", "INVALID_PERSISTED_QUERY")
+            if request_data.query is None:
+                query = persisted_queries.get(sha256_hash)
+                if query is None:
+                    return _error_result("PersistedQueryNotFound", "PERSISTED_QUERY_NOT_FOUND")
+                request_data = dataclasses.replace(request_data, query=query)
+            elif query_hash(request_data.query) != sha256_hash:
+                return _error_result("provided sha does not match query", "INVALID_PERSISTED_QUERY")
+            else:
+                persisted_queries.register(sha256_hash, request_data.query)
+
+        cacheable = settings.HTTP_CACHE_ENABLED and request_adapter.method == "GET" and request_data.query
+        if not cacheable:
+            return await super().execute_single(
+                request, request_adapter, sub_response, context, root_value, request_data
+            )
+
+        etag = await _etag(request_data)
+        sub_response.headers["ETag"] = etag
+        sub_response.headers["Cache-Control"] = settings.HTTP_CACHE_CONTROL
+        if _etag_matches(request.headers.get("if-none-match"), etag):
+            sub_response.status_code = 304
+            return ExecutionResult(data=None, errors=None)
+
+        result = await super().execute_single(
+            request, request_adapter, sub_response, context, root_value, request_data
+        )
+        if result.errors:
+            # Never let caches keep error responses
+            del sub_response.headers["ETag"]
+            sub_response.headers["Cache-Control"] = "no-store"
+        return result
+
+    def create_response(self, response_data, sub_response: Response) -> Response:
+        if sub_response.status_code == 304:
+            # 304 responses carry the validators but no body
+            response = Response(status_code=304)
+            response.headers.raw.extend(
+                (name, value) for name, value in sub_response.headers.raw
+                if name.lower() != b"content-length"
+            )
+            return response
+        return super().create_response(response_data, sub_response)
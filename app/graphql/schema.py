@@ -1,19 +1,26 @@
 """Main GraphQL schema combining all queries."""
 from typing import List, Optional
 import strawberry
+from app.config import settings
 from app.graphql.types import (
     Region,
     ResourceSummary,
     ResourceDetail,
 )
-from app.graphql.queries import RegionQueries, ResourceQueries
+from app.graphql.extensions import CachedDocuments, Instrumentation, QueryCostLimiter
+from app.graphql.queries import CatalogQueries, RegionQueries, ResourceQueries, RegionSetQueries
 
 
 @strawberry.type
-class Query(RegionQueries, ResourceQueries):
+class Query(RegionQueries, ResourceQueries, RegionSetQueries, CatalogQueries):
     """Root query combining all domain queries."""
     pass
 
 
-schema = strawberry.Schema(query=Query)
+extensions = [CachedDocuments, QueryCostLimiter]
+if settings.METRICS_ENABLED:
+    # First, so that parsing and validation count towards the operation time
+    extensions.insert(0, Instrumentation)
+
+schema = strawberry.Schema(query=Query, extensions=extensions)
 
@@ -1,15 +1,31 @@
 """GraphQL types package."""
-from app.graphql.types.region import Region
-from app.graphql.types.resource import ResourceSummary, ResourceAttribute, ResourceDetail, PaginatedResources
-from app.graphql.types.property import PropertyTypeInfo, PropertyDetail
+from app.graphql.types.region import Region, RegionResourceCount
+from app.graphql.types.resource import (
+    ResourceSummary,
+    ResourceAttribute,
+    ResourceDetail,
+    PaginatedResources,
+    ResourceConnection,
+    ResourceSearchResult,
+    ResourcePropertyGraph,
+)
+from app.graphql.types.property import PropertyTypeInfo, PropertyDetail, PropertyNode
+from app.graphql.types.catalog import CatalogChanges, ResourceChange
 
 __all__ = [
     "Region",
+    "RegionResourceCount",
     "ResourceSummary",
     "ResourceAttribute",
     "ResourceDetail",
     "PaginatedResources",
+    "ResourceConnection",
+    "ResourceSearchResult",
+    "ResourcePropertyGraph",
     "PropertyTypeInfo",
     "PropertyDetail",
+    "PropertyNode",
+    "CatalogChanges",
+    "ResourceChange",
 ]
 
@@ -0,0 +1,32 @@
+"""GraphQL types for catalog versions and changes."""
+from typing import List
+import strawberry
+
+
+@strawberry.type
+class ResourceChange:
+    """Net change of one resource since the requested catalog version."""
+    resource_id: int
+    resource_type: str
+    change: str  # added, updated or removed
+    version: int  # Last version that changed the resource
+    
+    # Changed property paths (TypeName.PropertyName for shared types), attributes and regions
+    properties: List[str]
+    attributes: List[str]
+    regions_added: List[str]
+    regions_removed: List[str]
+
+
+@strawberry.type
+class CatalogChanges:
+    """What changed in the catalog between two versions.
+    
+    With fullRefresh the changes are unknown (the version is too old, from a
+    different database or before a full reload): refetch everything.
+    """
+    since_version: int
+    catalog_version: int
+    full_refresh: bool
+    regions_changed: bool
+    resources: List[ResourceChange]
@@ -3,12 +3,30 @@ from typing import Optional, List
 import strawberry
 
 
+@strawberry.type
+class PropertyNode:
+    """A property without its nested tree; complexTypeId refers to a PropertyTypeInfo."""
+    id: int
+    property_name: str
+    documentation_url: Optional[str]
+    update_type: Optional[str]
+    is_required: bool
+    is_list: bool
+    is_map: bool
+    primitive_type: Optional[str]
+    complex_type_id: Optional[int]
+    list_allows_duplicates: Optional[bool]
+
+
 @strawberry.type
 class PropertyTypeInfo:
     """Information about a complex property type."""
     id: int
     type_name: str
     documentation_url: Optional[str]
+    
+    # The type's own properties, when returned as part of a property graph
+    properties: List[PropertyNode] = strawberry.field(default_factory=list)
 
 
 @strawberry.type
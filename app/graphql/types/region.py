@@ -9,3 +9,10 @@ class Region:
     region_code: str
     region_name: str
 
+
+@strawberry.type
+class RegionResourceCount:
+    """Number of resources available in a region."""
+    region: Region
+    resource_count: int
+
@@ -2,7 +2,7 @@
 from typing import Optional, List
 import strawberry
 from app.graphql.types.region import Region
-from app.graphql.types.property import PropertyDetail
+from app.graphql.types.property import PropertyDetail, PropertyNode, PropertyTypeInfo
 
 
 @strawberry.type
@@ -23,6 +23,23 @@ class PaginatedResources:
     has_more: bool
 
 
+@strawberry.type
+class ResourceConnection:
+    """Cursor-paginated list of resources; pass endCursor as `after` for the next page."""
+    resources: List[ResourceSummary]
+    end_cursor: Optional[str]
+    has_more: bool
+    total: Optional[int] = None
+
+
+@strawberry.type
+class ResourceSearchResult:
+    """A ranked search match; matchedProperties lists root property names that matched."""
+    resource: ResourceSummary
+    score: float
+    matched_properties: List[str]
+
+
 @strawberry.type
 class ResourceAttribute:
     """Return values (Fn::GetAtt) for CloudFormation resources."""
@@ -43,3 +60,16 @@ class ResourceDetail:
     attributes: List[ResourceAttribute]
     available_regions: List[Region]
 
+
+@strawberry.type
+class ResourcePropertyGraph:
+    """A resource's properties in normalized form.
+    
+    Root properties reference their complex type by complexTypeId, and every
+    type reachable from them is listed once in types with its own
+    properties, however many places use it. Expanding the graph client-side
+    gives the same tree as ResourceDetail.properties.
+    """
+    resource_id: int
+    properties: List[PropertyNode]
+    types: List[PropertyTypeInfo]
@@ -1,5 +1,44 @@
 """GraphQL utility functions."""
-from app.graphql.utils.property_tree import build_property_tree
-
-__all__ = ["build_property_tree"]
+from app.graphql.utils.property_node import PropertyTreeNode
+from app.graphql.utils.property_tree import (
+    SharedSubtreeBuilder,
+    build_normalized_graph,
+    build_property_tree,
+    build_property_tree_from_graph,
+    build_resource_properties,
+)
+from app.graphql.utils.cursor import encode_cursor, decode_cursor
+from app.graphql.utils.results import page_bounds, paginate, to_regions, to_summaries
+from app.graphql.utils.property_codec import serialize_properties, deserialize_properties, property_to_json
+from app.graphql.utils.selection import (
+    ResourceDetailSelection,
+    field_selections,
+    iter_fields,
+    nested_depth,
+    resource_detail_selection,
+    selects,
+)
 
+__all__ = [
+    "PropertyTreeNode",
+    "SharedSubtreeBuilder",
+    "build_normalized_graph",
+    "build_property_tree",
+    "build_property_tree_from_graph",
+    "build_resource_properties",
+    "encode_cursor",
+    "decode_cursor",
+    "page_bounds",
+    "paginate",
+    "to_regions",
+    "to_summaries",
+    "serialize_properties",
+    "deserialize_properties",
+    "property_to_json",
+    "ResourceDetailSelection",
+    "field_selections",
+    "iter_fields",
+    "nested_depth",
+    "resource_detail_selection",
+    "selects",
+]
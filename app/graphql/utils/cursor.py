@@ -0,0 +1,23 @@
+"""Opaque keyset cursors for resource pagination."""
+import base64
+import json
+from typing import Optional, Tuple
+
+
+def encode_cursor(resource_type: str, resource_id: int) -> str:
+    """Cursor pointing just after the given resource."""
+    payload = json.dumps([resource_type, resource_id], separators=(",", ":"))
+    return base64.urlsafe_b64encode(payload.encode()).decode()
+
+
+def decode_cursor(cursor: Optional[str]) -> Optional[Tuple[str, int]]:
+    """``(resource_type, id)`` keyset from a cursor, or None for the first page."""
+    if not cursor:
+        return None
+    try:
+        resource_type, resource_id = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+        if not isinstance(resource_type, str) or not isinstance(resource_id, int):
+            raise TypeError
+    except (ValueError, TypeError):
+        raise ValueError("Invalid pagination cursor")
+    return resource_type, resource_id
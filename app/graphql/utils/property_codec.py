@@ -0,0 +1,85 @@
+"""Compact serialization of built property trees.
+
+Each nested property list is written once and referenced by index, so
+subtrees shared by the builder (``Tag``...) stay shared after decoding.
+"""
+import json
+import zlib
+from typing import List, Sequence, Tuple
+from strawberry.utils.str_converters import to_camel_case
+from app.catalog.rows import PropertyRow
+from app.graphql.utils.property_node import PropertyTreeNode
+
+FORMAT_VERSION = 1
+
+_FIELDS = (
+    "id",
+    "property_name",
+    "documentation_url",
+    "update_type",
+    "is_required",
+    "is_list",
+    "is_map",
+    "primitive_type",
+    "complex_type_id",
+    "complex_type_name",
+    "list_allows_duplicates",
+)
+
+
+_JSON_NAMES = tuple(to_camel_case(field) for field in _FIELDS)
+
+
+def property_to_json(prop: PropertyTreeNode) -> dict:
+    """A property tree as plain JSON, with the field names of the GraphQL schema."""
+    value = {name: getattr(prop, field) for name, field in zip(_JSON_NAMES, _FIELDS)}
+    nested = prop.nested_properties
+    value["nestedProperties"] = None if nested is None else [property_to_json(child) for child in nested]
+    return value
+
+
+def serialize_properties(properties: List[PropertyTreeNode]) -> bytes:
+    """Encode a resource's root properties and everything nested below them."""
+    subtrees: List[list] = []
+    refs = {}
+
+    def encode_list(nested: Sequence[PropertyTreeNode]) -> int:
+        ref = refs.get(id(nested))
+        if ref is None:
+            # Children are appended first, so references always point backwards
+            nodes = [encode(prop) for prop in nested]
+            ref = refs[id(nested)] = len(subtrees)
+            subtrees.append(nodes)
+        return ref
+
+    def encode(prop: PropertyTreeNode) -> list:
+        nested = prop.nested_properties
+        return [getattr(prop, field) for field in _FIELDS] + [
+            None if nested is None else encode_list(nested)
+        ]
+
+    roots = [encode(prop) for prop in properties]
+    return zlib.compress(
+        json.dumps([FORMAT_VERSION, roots, subtrees], separators=(",", ":")).encode()
+    )
+
+
+def deserialize_properties(payload: bytes) -> List[PropertyTreeNode]:
+    """Decode the output of serialize_properties."""
+    version, roots, subtrees = json.loads(zlib.decompress(payload))
+    if version != FORMAT_VERSION:
+        raise ValueError(f"Unsupported property tree format {version}")
+
+    built: List[Tuple[PropertyTreeNode, ...]] = []
+
+    def decode(node: list) -> PropertyTreeNode:
+        values = dict(zip(_FIELDS, node))
+        complex_type_name = values.pop("complex_type_name")
+        # Where a property sits in the catalog is not part of its tree
+        row = PropertyRow(resource_id=None, property_type_id=None, **values)
+        nested = node[-1]
+        return PropertyTreeNode(row, complex_type_name, None if nested is None else built[nested])
+
+    for nodes in subtrees:
+        built.append(tuple(decode(node) for node in nodes))
+    return [decode(node) for node in roots]
@@ -0,0 +1,50 @@
+"""Compact nodes of built property trees.
+
+A tree node only needs its property row, the name of its complex type and
+its nested nodes. Keeping the row by reference in a ``__slots__`` object
+costs a fraction of a ``PropertyDetail`` dataclass with eleven copied
+fields, which matters for large trees and for the resolved-detail cache.
+
+Nodes expose the attributes of ``PropertyDetail``, so Strawberry's default
+resolvers read them directly wherever a ``PropertyDetail`` is declared:
+the GraphQL type stays the serialization boundary without converting
+every node first.
+"""
+from operator import attrgetter
+from typing import Optional, Sequence
+from app.catalog.rows import PropertyRow
+
+
+def _flag(name: str) -> property:
+    getter = attrgetter(name)
+    return property(lambda node: getter(node.row) or False)
+
+
+class PropertyTreeNode:
+    """A property in a built tree; ``nested_properties`` is None for leaves and cut-off types."""
+
+    __slots__ = ("row", "complex_type_name", "nested_properties")
+
+    def __init__(
+        self,
+        row: PropertyRow,
+        complex_type_name: Optional[str] = None,
+        nested_properties: Optional[Sequence["PropertyTreeNode"]] = None,
+    ):
+        self.row = row
+        self.complex_type_name = complex_type_name
+        self.nested_properties = nested_properties
+
+    id = property(attrgetter("row.id"))
+    property_name = property(attrgetter("row.property_name"))
+    documentation_url = property(attrgetter("row.documentation_url"))
+    update_type = property(attrgetter("row.update_type"))
+    is_required = _flag("is_required")
+    is_list = _flag("is_list")
+    is_map = _flag("is_map")
+    primitive_type = property(attrgetter("row.primitive_type"))
+    complex_type_id = property(attrgetter("row.complex_type_id"))
+    list_allows_duplicates = property(attrgetter("row.list_allows_duplicates"))
+
+    def __repr__(self) -> str:
+        return f"PropertyTreeNode({self.row.property_name!r}, id={self.row.id})"
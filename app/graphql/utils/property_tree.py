@@ -1,43 +1,166 @@
 """Utility functions for building property trees."""
-from sqlmodel import Session, select
-from app.models import Property as PropertyModel, PropertyType as PropertyTypeModel
-from app.graphql.types import PropertyDetail
+from collections import deque
+from typing import Dict, FrozenSet, List, Optional, Tuple
+from sqlmodel import Session
+from app.config import settings
+from app.metrics import span
+from app.models import Property as PropertyModel
+from app.catalog.property_graph import PropertyGraph, load_type_graph
+from app.catalog.rows import PropertyRow
+from app.graphql.types import PropertyNode, PropertyTypeInfo
+from app.graphql.utils.property_node import PropertyTreeNode
 
 
-def build_property_tree(property_obj: PropertyModel, db: Session, visited_types: set = None) -> PropertyDetail:
-    """Recursively build property tree with nested properties."""
+def build_property_tree_from_graph(
+    property_obj: PropertyRow,
+    graph: PropertyGraph,
+    visited_types: Optional[set] = None,
+    max_depth: Optional[int] = None
+) -> PropertyTreeNode:
+    """Recursively build property tree with nested properties from a loaded graph.
+
+    Nodes reference their property row instead of copying its fields, see
+    :class:`~app.graphql.utils.property_node.PropertyTreeNode`.
+
+    ``max_depth`` limits how many levels of nested properties are expanded
+    below this property (unlimited when None).
+    """
     if visited_types is None:
         visited_types = set()
-    
+
     complex_type_name = None
     nested_properties = None
-    
+
     # If this property has a complex type, get its nested properties
     if property_obj.complex_type_id:
-        statement = select(PropertyTypeModel).where(
-            PropertyTypeModel.id == property_obj.complex_type_id
-        )
-        complex_type = db.exec(statement).first()
-        
+        complex_type = graph.types.get(property_obj.complex_type_id)
+
         if complex_type:
             complex_type_name = complex_type.type_name
-            
+
             # Avoid infinite recursion for circular references
-            if complex_type.id not in visited_types:
+            if complex_type.id not in visited_types and max_depth != 0:
                 visited_types.add(complex_type.id)
-                
-                # Get properties of this complex type
-                nested_statement = select(PropertyModel).where(
-                    PropertyModel.property_type_id == complex_type.id
+                child_depth = None if max_depth is None else max_depth - 1
+
+                nested_properties = tuple(
+                    build_property_tree_from_graph(prop, graph, visited_types.copy(), child_depth)
+                    for prop in graph.properties_by_type.get(complex_type.id, [])
                 )
-                nested_props = db.exec(nested_statement).all()
-                
-                nested_properties = [
-                    build_property_tree(prop, db, visited_types.copy())
-                    for prop in nested_props
-                ]
-    
-    return PropertyDetail(
+
+    return PropertyTreeNode(property_obj, complex_type_name, nested_properties)
+
+
+class SharedSubtreeBuilder:
+    """Builds property trees where each expanded type subtree is built once.
+
+    A type is still never expanded again on its own ancestor path, so the
+    subtree of a type only depends on the ancestors that are reachable from
+    it. For acyclic types such as ``Tag`` that set is empty and the nested
+    property list is built a single time and shared by reference everywhere
+    the type is used.
+    """
+
+    def __init__(self, graph: PropertyGraph):
+        self.graph = graph
+        self._reachable: Dict[int, FrozenSet[int]] = {}
+        self._subtrees: Dict[
+            Tuple[int, FrozenSet[int], Optional[int]], Tuple[PropertyTreeNode, ...]
+        ] = {}
+
+    def reachable_types(self, type_id: int) -> FrozenSet[int]:
+        """All type ids reachable from a type through its nested properties."""
+        reachable = self._reachable.get(type_id)
+        if reachable is None:
+            seen = set()
+            stack = [type_id]
+            while stack:
+                current = stack.pop()
+                for prop in self.graph.properties_by_type.get(current, []):
+                    child = prop.complex_type_id
+                    if child and child in self.graph.types and child not in seen:
+                        seen.add(child)
+                        stack.append(child)
+            reachable = frozenset(seen)
+            self._reachable[type_id] = reachable
+        return reachable
+
+    def nested_properties(
+        self,
+        type_id: int,
+        ancestors: FrozenSet[int],
+        max_depth: Optional[int] = None
+    ) -> Tuple[PropertyTreeNode, ...]:
+        """Nested property list of a type expanded below the given ancestors."""
+        key = (type_id, ancestors & self.reachable_types(type_id), max_depth)
+        subtree = self._subtrees.get(key)
+        if subtree is None:
+            child_ancestors = ancestors | {type_id}
+            child_depth = None if max_depth is None else max_depth - 1
+            subtree = tuple(
+                self.build(prop, child_ancestors, child_depth)
+                for prop in self.graph.properties_by_type.get(type_id, [])
+            )
+            self._subtrees[key] = subtree
+        return subtree
+
+    def build(
+        self,
+        property_obj: PropertyRow,
+        ancestors: FrozenSet[int] = frozenset(),
+        max_depth: Optional[int] = None
+    ) -> PropertyTreeNode:
+        """Build the tree of a single property, expanding at most ``max_depth`` levels."""
+        complex_type_name = None
+        nested_properties = None
+
+        if property_obj.complex_type_id:
+            complex_type = self.graph.types.get(property_obj.complex_type_id)
+
+            if complex_type:
+                complex_type_name = complex_type.type_name
+
+                # Avoid infinite recursion for circular references
+                if complex_type.id not in ancestors and max_depth != 0:
+                    nested_properties = self.nested_properties(
+                        complex_type.id, ancestors, max_depth
+                    )
+
+        return PropertyTreeNode(property_obj, complex_type_name, nested_properties)
+
+
+def build_resource_properties(
+    resource_id: int,
+    graph: PropertyGraph,
+    share_subtrees: Optional[bool] = None,
+    max_depth: Optional[int] = None,
+    builder: Optional[SharedSubtreeBuilder] = None
+) -> List[PropertyTreeNode]:
+    """Build the property trees of all root properties of a resource.
+
+    With ``share_subtrees`` (defaulting to ``PROPERTY_TREE_SHARE_SUBTREES``),
+    identical type subtrees are built once and reused by reference. Passing
+    the same ``builder`` for several resources of one graph shares subtrees
+    between them too. ``max_depth`` stops expansion after that many nested
+    levels.
+    """
+    if share_subtrees is None:
+        share_subtrees = settings.PROPERTY_TREE_SHARE_SUBTREES
+
+    root_properties = graph.root_properties.get(resource_id, [])
+    with span("build_property_tree"):
+        if share_subtrees:
+            builder = builder or SharedSubtreeBuilder(graph)
+            return [builder.build(prop, max_depth=max_depth) for prop in root_properties]
+
+        return [
+            build_property_tree_from_graph(prop, graph, max_depth=max_depth)
+            for prop in root_properties
+        ]
+
+
+def _property_node(property_obj: PropertyRow) -> PropertyNode:
+    return PropertyNode(
         id=property_obj.id,
         property_name=property_obj.property_name,
         documentation_url=property_obj.documentation_url,
@@ -47,8 +170,44 @@ def build_property_tree(property_obj: PropertyModel, db: Session, visited_types:
         is_map=property_obj.is_map or False,
         primitive_type=property_obj.primitive_type,
         complex_type_id=property_obj.complex_type_id,
-        complex_type_name=complex_type_name,
-        list_allows_duplicates=property_obj.list_allows_duplicates,
-        nested_properties=nested_properties
+        list_allows_duplicates=property_obj.list_allows_duplicates
     )
 
+
+def build_normalized_graph(
+    resource_id: int,
+    graph: PropertyGraph
+) -> Tuple[List[PropertyNode], List[PropertyTypeInfo]]:
+    """Root properties of a resource and every type reachable from them, each listed once.
+
+    Types are in breadth-first order from the roots. References to types
+    missing from the graph are kept but have no entry, just as the tree
+    builder leaves their nested properties empty.
+    """
+    root_properties = graph.root_properties.get(resource_id, [])
+    types: List[PropertyTypeInfo] = []
+    seen = set()
+    queue = deque(prop.complex_type_id for prop in root_properties)
+    with span("build_normalized_graph"):
+        while queue:
+            type_id = queue.popleft()
+            if not type_id or type_id in seen or type_id not in graph.types:
+                continue
+            seen.add(type_id)
+            complex_type = graph.types[type_id]
+            properties = graph.properties_by_type.get(type_id, [])
+            types.append(PropertyTypeInfo(
+                id=complex_type.id,
+                type_name=complex_type.type_name,
+                documentation_url=complex_type.documentation_url,
+                properties=[_property_node(prop) for prop in properties]
+            ))
+            queue.extend(prop.complex_type_id for prop in properties)
+
+        return [_property_node(prop) for prop in root_properties], types
+
+
+def build_property_tree(property_obj: PropertyModel, db: Session, visited_types: set = None) -> PropertyTreeNode:
+    """Build property tree with nested properties, loading its type graph in bulk."""
+    graph = load_type_graph(db, [property_obj.complex_type_id])
+    return build_property_tree_from_graph(property_obj, graph, visited_types)
@@ -0,0 +1,49 @@
+"""Conversion of catalog rows to GraphQL result types shared by the query modules."""
+from typing import List, Sequence, Tuple
+from app.graphql.types import PaginatedResources, Region, ResourceSummary
+
+MAX_PAGE_SIZE = 100
+
+
+def page_bounds(limit: int, offset: int) -> Tuple[int, int]:
+    """``limit`` clamped to 1..MAX_PAGE_SIZE and ``offset`` to at least 0.
+
+    Pages are also sliced from in-memory lists, where a negative bound
+    would silently select the wrong rows.
+    """
+    return max(1, min(limit, MAX_PAGE_SIZE)), max(0, offset)
+
+
+def to_regions(regions) -> List[Region]:
+    """Convert region rows (ORM models or snapshot rows) to GraphQL regions."""
+    return [
+        Region(
+            id=region.id,
+            region_code=region.region_code,
+            region_name=region.region_name
+        )
+        for region in regions
+    ]
+
+
+def to_summaries(resources: Sequence) -> List[ResourceSummary]:
+    """Convert resource rows (ORM models or snapshot rows) to summaries."""
+    return [
+        ResourceSummary(
+            id=resource.id,
+            resource_type=resource.resource_type,
+            documentation_url=resource.documentation_url
+        )
+        for resource in resources
+    ]
+
+
+def paginate(resources: Sequence, total: int, limit: int, offset: int) -> PaginatedResources:
+    """Wrap one page of resource rows (ORM models or snapshot rows)."""
+    return PaginatedResources(
+        resources=to_summaries(resources),
+        total=total,
+        limit=limit,
+        offset=offset,
+        has_more=(offset + limit) < total
+    )
@@ -0,0 +1,68 @@
+"""Helpers for inspecting which fields a query actually selected."""
+from typing import Iterable, Iterator, NamedTuple, Optional
+from strawberry.types.nodes import FragmentSpread, InlineFragment, SelectedField
+
+
+def iter_fields(selections: Iterable) -> Iterator[SelectedField]:
+    """Selected fields, with fragment spreads and inline fragments flattened."""
+    for selection in selections:
+        if isinstance(selection, SelectedField):
+            yield selection
+        elif isinstance(selection, (FragmentSpread, InlineFragment)):
+            yield from iter_fields(selection.selections)
+
+
+def field_selections(info) -> list:
+    """Selections made on the current field's result type."""
+    return [
+        selection
+        for field in iter_fields(info.selected_fields)
+        for selection in field.selections
+    ]
+
+
+def selects(selections: Iterable, name: str) -> bool:
+    """Whether a field with the given GraphQL name is selected."""
+    return any(field.name == name for field in iter_fields(selections))
+
+
+def nested_depth(selections: Iterable, name: str = "nestedProperties") -> int:
+    """How many levels of a self-referential field are selected below these selections."""
+    depths = [
+        1 + nested_depth(field.selections, name)
+        for field in iter_fields(selections)
+        if field.name == name
+    ]
+    return max(depths, default=0)
+
+
+class ResourceDetailSelection(NamedTuple):
+    """The parts of a ResourceDetail a query asked for.
+
+    ``property_depth`` is None when ``properties`` is not selected, otherwise
+    the number of ``nestedProperties`` levels selected below the root
+    properties.
+    """
+    property_depth: Optional[int]
+    attributes: bool
+    available_regions: bool
+
+    @property
+    def properties(self) -> bool:
+        return self.property_depth is not None
+
+
+def resource_detail_selection(info) -> ResourceDetailSelection:
+    """Work out which ResourceDetail relations the current field selected."""
+    selections = field_selections(info)
+
+    property_depth = None
+    property_fields = [field for field in iter_fields(selections) if field.name == "properties"]
+    if property_fields:
+        property_depth = max(nested_depth(field.selections) for field in property_fields)
+
+    return ResourceDetailSelection(
+        property_depth=property_depth,
+        attributes=selects(selections, "attributes"),
+        available_regions=selects(selections, "availableRegions"),
+    )
@@ -1,15 +1,58 @@
 """FastAPI application with Strawberry GraphQL."""
-from fastapi import FastAPI
+import asyncio
+import contextlib
+import time
+from contextlib import asynccontextmanager
+from fastapi import FastAPI, Response
 from fastapi.middleware.cors import CORSMiddleware
-from strawberry.fastapi import GraphQLRouter
 from app.config import settings
+from app.database import dispose_engines, run_db
 from app.graphql import schema
+from app.graphql.context import get_context
+from app.graphql.router import CachingGraphQLRouter
+from app.catalog import follow_stored_version, init_snapshot
+from app.api import admin_router, metrics_router, stream_router
+from app import STARTED_AT
+from app.startup import follow_catalog_versions, startup, warm_up
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Load in-memory catalog structures, then warm up in the background until ready.
+    
+    Also follows the catalog version recorded by ingest until shutdown.
+    """
+    startup.record("import", time.perf_counter() - STARTED_AT)
+    # Seen before the snapshot is loaded, so an ingest while loading is followed
+    with startup.phase("catalog_version"):
+        await run_db(follow_stored_version)
+    with startup.phase("snapshot", required=True):
+        init_snapshot()
+    
+    warm_up_task = None
+    if settings.WARMUP_ENABLED:
+        warm_up_task = asyncio.create_task(warm_up(schema))
+    else:
+        startup.mark_ready()
+    version_task = None
+    if settings.CATALOG_VERSION_CHECK_SECONDS > 0:
+        version_task = asyncio.create_task(follow_catalog_versions())
+    yield
+    
+    for task in (warm_up_task, version_task):
+        if task is not None and not task.done():
+            task.cancel()
+            with contextlib.suppress(asyncio.CancelledError):
+                await task
+    await dispose_engines()
+
 
 # Create FastAPI app
 app = FastAPI(
     title=settings.APP_TITLE,
     description=settings.APP_DESCRIPTION,
-    version=settings.APP_VERSION
+    version=settings.APP_VERSION,
+    lifespan=lifespan
 )
 
 # Configure CORS
@@ -22,14 +65,24 @@ app.add_middleware(
 )
 
 # Create GraphQL router
-graphql_app = GraphQLRouter(
+graphql_app = CachingGraphQLRouter(
     schema,
-    graphiql=settings.IS_LOCAL
+    graphiql=settings.IS_LOCAL,
+    context_getter=get_context
 )
 
 # Mount GraphQL endpoint
 app.include_router(graphql_app, prefix="/graphql")
 
+# Mount admin endpoints
+app.include_router(admin_router)
+
+# Mount NDJSON streaming of large resource details
+app.include_router(stream_router)
+
+# Mount Prometheus metrics
+app.include_router(metrics_router)
+
 
 @app.get("/")
 async def root():
@@ -44,6 +97,14 @@ async def root():
 
 @app.get("/health")
 async def health_check():
-    """Health check endpoint."""
+    """Health check endpoint (liveness: answers as soon as the server is up)."""
     return {"status": "healthy"}
 
+
+@app.get("/ready")
+async def readiness_check(response: Response):
+    """Readiness endpoint: 503 until warm-up has finished, with startup phase timings."""
+    if not startup.ready:
+        response.status_code = 503
+    return startup.status()
+
@@ -0,0 +1,343 @@
+"""Process-wide latency histograms and per-request traces.
+
+Metrics are kept in memory and rendered in the Prometheus text exposition
+format by ``GET /metrics``. While a GraphQL operation runs, a
+:class:`RequestTrace` is bound to the current context, so SQL statements
+(recorded by SQLAlchemy engine events, also from worker threads and async
+sessions) and timed code sections are attributed to the operation that
+caused them.
+"""
+import threading
+import time
+from abc import ABC, abstractmethod
+from bisect import bisect_left
+from contextlib import contextmanager
+from contextvars import ContextVar, Token
+from typing import Dict, Iterator, List, Optional, Sequence, Tuple
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+STATEMENT_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0)
+COUNT_BUCKETS = (0, 1, 2, 5, 10, 20, 50, 100, 200, 500)
+
+# Label sets per metric; further ones are folded into "other" so clients
+# sending random operation names cannot grow the registry without bound
+MAX_SERIES = 200
+
+# Length of SQL text kept in debug traces
+TRACE_SQL_LENGTH = 200
+
+NO_OPERATION = "none"
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(labels: Sequence[Tuple[str, str]]) -> str:
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{name}="{_escape(value)}"' for name, value in labels) + "}"
+
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if not float(value).is_integer() else str(int(value))
+
+
+class _Metric(ABC):
+    """A named metric family; subclasses yield its samples."""
+
+    kind = "untyped"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._series: Dict[Tuple[str, ...], object] = {}
+        self._lock = threading.Lock()
+
+    def _key(self, labels: Dict[str, str]) -> Tuple[str, ...]:
+        key = tuple(str(labels.get(name, "")) for name in self.labelnames)
+        if key not in self._series and len(self._series) >= MAX_SERIES:
+            return ("other",) * len(self.labelnames)
+        return key
+
+    @abstractmethod
+    def samples(self) -> Iterator[Tuple[str, Tuple[Tuple[str, str], ...], float]]:
+        """(sample name, labels, value) of every series."""
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.kind}"]
+        for name, labels, value in self.samples():
+            lines.append(f"{name}{_format_labels(labels)} {_format_value(value)}")
+        return lines
+
+
+class Counter(_Metric):
+    """Monotonic counter per label set."""
+
+    kind = "counter"
+
+    def inc(self, amount: float = 1.0, **labels: str) -> None:
+        with self._lock:
+            key = self._key(labels)
+            self._series[key] = self._series.get(key, 0.0) + amount
+
+    def samples(self):
+        with self._lock:
+            series = list(self._series.items())
+        for key, value in sorted(series):
+            yield self.name, tuple(zip(self.labelnames, key)), value
+
+
+class Gauge(_Metric):
+    """Last value set per label set."""
+
+    kind = "gauge"
+
+    def set(self, value: float, **labels: str) -> None:
+        with self._lock:
+            self._series[self._key(labels)] = float(value)
+
+    def samples(self):
+        with self._lock:
+            series = list(self._series.items())
+        for key, value in sorted(series):
+            yield self.name, tuple(zip(self.labelnames, key)), value
+
+
+class Histogram(_Metric):
+    """Cumulative-bucket histogram per label set."""
+
+    kind = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Sequence[str] = (),
+        buckets: Sequence[float] = LATENCY_BUCKETS,
+    ):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+
+    def observe(self, value: float, **labels: str) -> None:
+        with self._lock:
+            key = self._key(labels)
+            series = self._series.get(key)
+            if series is None:
+                # Per-bucket counts (last one is +Inf), then sum
+                series = self._series[key] = [0] * (len(self.buckets) + 1) + [0.0]
+            series[bisect_left(self.buckets, value)] += 1
+            series[-1] += value
+
+    def samples(self):
+        with self._lock:
+            series = [(key, list(values)) for key, values in self._series.items()]
+        for key, values in sorted(series):
+            labels = tuple(zip(self.labelnames, key))
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float("inf"),), values[:-1]):
+                cumulative += count
+                yield f"{self.name}_bucket", labels + (("le", _format_value(bound)),), cumulative
+            yield f"{self.name}_sum", labels, values[-1]
+            yield f"{self.name}_count", labels, cumulative
+
+
+class MetricsRegistry:
+    """Set of metrics rendered together."""
+
+    def __init__(self):
+        self._metrics: List[_Metric] = []
+
+    def counter(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> Counter:
+        metric = Counter(name, documentation, labelnames)
+        self._metrics.append(metric)
+        return metric
+
+    def gauge(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> Gauge:
+        metric = Gauge(name, documentation, labelnames)
+        self._metrics.append(metric)
+        return metric
+
+    def histogram(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Sequence[str] = (),
+        buckets: Sequence[float] = LATENCY_BUCKETS,
+    ) -> Histogram:
+        metric = Histogram(name, documentation, labelnames, buckets)
+        self._metrics.append(metric)
+        return metric
+
+    def render(self) -> str:
+        """All metrics in the Prometheus text exposition format."""
+        lines: List[str] = []
+        for metric in self._metrics:
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+
+registry = MetricsRegistry()
+
+OPERATION_DURATION = registry.histogram(
+    "graphql_operation_duration_seconds", "GraphQL operation latency.", ("operation",)
+)
+OPERATION_STATEMENTS = registry.histogram(
+    "graphql_operation_db_statements", "SQL statements run per GraphQL operation.",
+    ("operation",), COUNT_BUCKETS,
+)
+RESOLVER_DURATION = registry.histogram(
+    "graphql_resolver_duration_seconds", "Root field resolver latency.", ("operation", "field")
+)
+STATEMENT_DURATION = registry.histogram(
+    "db_statement_duration_seconds", "SQL statement latency.", ("operation", "statement"),
+    STATEMENT_BUCKETS,
+)
+STATEMENT_ROWS = registry.counter(
+    "db_statement_rows_total",
+    "Rows reported by the driver for SQL statements (drivers that do not report rows add 0).",
+    ("operation",),
+)
+SPAN_DURATION = registry.histogram(
+    "app_span_duration_seconds", "Latency of instrumented code sections.", ("operation", "span")
+)
+STARTUP_PHASE_DURATION = registry.gauge(
+    "app_startup_phase_seconds", "Duration of each startup and warm-up phase.", ("phase",)
+)
+STARTUP_READY = registry.gauge(
+    "app_ready", "1 once warm-up has finished and /ready reports ready."
+)
+
+
+class RequestTrace:
+    """Timings collected while one GraphQL operation runs.
+
+    Totals are always kept; individual events only when ``detailed``, for
+    the debug trace returned in the response's ``extensions``.
+    """
+
+    def __init__(self, operation: str = "anonymous", detailed: bool = False):
+        self.operation = operation
+        self.detailed = detailed
+        self.started = time.perf_counter()
+        self.duration: Optional[float] = None
+        self.statements = 0
+        self.statement_seconds = 0.0
+        self.rows = 0
+        self.events: List[dict] = []
+        # Statements can be recorded from worker threads
+        self._lock = threading.Lock()
+
+    def _event(self, kind: str, name: str, start: float, duration: float, **extra) -> None:
+        self.events.append({
+            "kind": kind,
+            "name": name,
+            "start_ms": round((start - self.started) * 1000, 3),
+            "duration_ms": round(duration * 1000, 3),
+            **extra,
+        })
+
+    def add_statement(self, sql: str, start: float, duration: float, rows: int) -> None:
+        with self._lock:
+            self.statements += 1
+            self.statement_seconds += duration
+            self.rows += max(rows, 0)
+            if self.detailed:
+                self._event("sql", " ".join(sql.split())[:TRACE_SQL_LENGTH], start, duration, rows=rows)
+
+    def add_timing(self, kind: str, name: str, start: float, duration: float) -> None:
+        if self.detailed:
+            with self._lock:
+                self._event(kind, name, start, duration)
+
+    def finish(self) -> float:
+        self.duration = time.perf_counter() - self.started
+        return self.duration
+
+    def summary(self) -> dict:
+        """The trace as returned to clients."""
+        duration = self.duration if self.duration is not None else time.perf_counter() - self.started
+        with self._lock:
+            return {
+                "operation": self.operation,
+                "duration_ms": round(duration * 1000, 3),
+                "statements": self.statements,
+                "statement_ms": round(self.statement_seconds * 1000, 3),
+                "rows": self.rows,
+                "events": sorted(self.events, key=lambda event: event["start_ms"]),
+            }
+
+
+_current_trace: ContextVar[Optional[RequestTrace]] = ContextVar("request_trace", default=None)
+
+
+def start_trace(trace: RequestTrace) -> Token:
+    """Bind a trace to the current context (and the tasks and threads it spawns)."""
+    return _current_trace.set(trace)
+
+
+def end_trace(token: Token) -> None:
+    _current_trace.reset(token)
+
+
+def current_trace() -> Optional[RequestTrace]:
+    return _current_trace.get()
+
+
+def current_operation() -> str:
+    """Operation name used as the metric label for work done right now."""
+    trace = _current_trace.get()
+    return trace.operation if trace is not None else NO_OPERATION
+
+
+@contextmanager
+def span(name: str) -> Iterator[None]:
+    """Time a section of code into ``app_span_duration_seconds`` and the current trace."""
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        duration = time.perf_counter() - start
+        trace = _current_trace.get()
+        SPAN_DURATION.observe(duration, operation=current_operation(), span=name)
+        if trace is not None:
+            trace.add_timing("span", name, start, duration)
+
+
+def _statement_kind(sql: str) -> str:
+    words = sql.split(None, 1)
+    return words[0].lower() if words else ""
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault("statement_start", []).append(time.perf_counter())
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    starts = conn.info.get("statement_start")
+    if not starts:
+        return
+    start = starts.pop()
+    duration = time.perf_counter() - start
+    # SELECT row counts are only reported by some drivers (psycopg2, asyncpg); SQLite gives -1
+    rows = getattr(cursor, "rowcount", -1)
+    operation = current_operation()
+
+    STATEMENT_DURATION.observe(duration, operation=operation, statement=_statement_kind(statement))
+    if rows > 0:
+        STATEMENT_ROWS.inc(rows, operation=operation)
+    trace = _current_trace.get()
+    if trace is not None:
+        trace.add_statement(statement, start, duration, rows)
+
+
+def instrument_engine(engine: Engine) -> None:
+    """Record the count and duration of every statement run on ``engine``."""
+    if not event.contains(engine, "before_cursor_execute", _before_cursor_execute):
+        event.listen(engine, "before_cursor_execute", _before_cursor_execute)
+        event.listen(engine, "after_cursor_execute", _after_cursor_execute)
@@ -2,6 +2,7 @@
 from app.models.region import Region
 from app.models.resource import Resource, ResourceRegion, ResourceAttribute
 from app.models.property import Property, PropertyType
+from app.models.catalog import CatalogVersion, CatalogChange
 
 __all__ = [
     "Region",
@@ -10,5 +11,7 @@ __all__ = [
     "ResourceAttribute",
     "Property",
     "PropertyType",
+    "CatalogVersion",
+    "CatalogChange",
 ]
 
@@ -0,0 +1,37 @@
+"""Catalog version and changelog models."""
+from datetime import datetime
+from typing import Optional
+from sqlmodel import SQLModel, Field
+
+
+class CatalogVersion(SQLModel, table=True):
+    """One ingest that changed the catalog; the id is the catalog version.
+    
+    A full version (the initial load) records no individual changes: clients
+    older than it have to refetch everything.
+    """
+    __tablename__ = "catalog_versions"
+    
+    id: Optional[int] = Field(default=None, primary_key=True)
+    created_at: Optional[datetime] = Field(default_factory=datetime.utcnow)
+    source: str = Field(max_length=30, nullable=False)  # ingest, ...
+    is_full: bool = Field(default=False)
+    changed_rows: int = Field(default=0)
+
+
+class CatalogChange(SQLModel, table=True):
+    """A resource-level change made by a catalog version.
+    
+    ``resource_id`` has no foreign key, removed resources keep their entries.
+    Changes to shared property types are recorded against every resource
+    that reaches the type.
+    """
+    __tablename__ = "catalog_changes"
+    
+    id: Optional[int] = Field(default=None, primary_key=True)
+    version_id: int = Field(foreign_key="catalog_versions.id", nullable=False, index=True)
+    resource_id: Optional[int] = Field(default=None, index=True)  # NULL for region entries
+    resource_type: Optional[str] = Field(default=None, max_length=100)
+    entity: str = Field(max_length=30, nullable=False)  # resource, property, property_type, attribute, region_availability, region
+    name: Optional[str] = Field(default=None, max_length=300)  # property path, attribute name or region code
+    change: str = Field(max_length=10, nullable=False)  # added, updated, removed
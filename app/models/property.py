@@ -1,5 +1,6 @@
 """Property-related models."""
 from typing import Optional, List, TYPE_CHECKING
+from sqlalchemy import Index
 from sqlmodel import SQLModel, Field, Relationship
 
 if TYPE_CHECKING:
@@ -40,10 +41,16 @@ class Property(SQLModel, table=True):
     - Must have exactly one type specified (primitive OR complex)
     """
     __tablename__ = "properties"
+    __table_args__ = (
+        # Root properties of a resource, in the order they are listed
+        Index("ix_properties_resource_id_property_name", "resource_id", "property_name"),
+        # Properties of a type, in the order they are listed
+        Index("ix_properties_property_type_id_id", "property_type_id", "id"),
+    )
 
     id: Optional[int] = Field(default=None, primary_key=True)
-    resource_id: Optional[int] = Field(default=None, foreign_key="resources.id", index=True)
-    property_type_id: Optional[int] = Field(default=None, foreign_key="property_types.id", index=True)
+    resource_id: Optional[int] = Field(default=None, foreign_key="resources.id")
+    property_type_id: Optional[int] = Field(default=None, foreign_key="property_types.id")
     property_name: str = Field(max_length=100, nullable=False)
     documentation_url: Optional[str] = None
     update_type: Optional[str] = Field(default=None, max_length=20)  # Mutable, Immutable, or Conditional
@@ -1,6 +1,7 @@
 """Resource-related models."""
 from datetime import datetime
 from typing import Optional, List, TYPE_CHECKING
+from sqlalchemy import Index
 from sqlmodel import SQLModel, Field, Relationship
 
 if TYPE_CHECKING:
@@ -30,10 +31,16 @@ class Resource(SQLModel, table=True):
 class ResourceRegion(SQLModel, table=True):
     """Many-to-many relationship: which resources are available in which regions."""
     __tablename__ = "resource_regions"
+    __table_args__ = (
+        # One row per pair; also serves lookups by resource_id
+        Index("uq_resource_regions_resource_id_region_id", "resource_id", "region_id", unique=True),
+        # Resources of a region, without visiting the table rows
+        Index("ix_resource_regions_region_id_resource_id", "region_id", "resource_id"),
+    )
 
     id: Optional[int] = Field(default=None, primary_key=True)
-    resource_id: int = Field(foreign_key="resources.id", nullable=False, index=True)
-    region_id: int = Field(foreign_key="regions.id", nullable=False, index=True)
+    resource_id: int = Field(foreign_key="resources.id", nullable=False)
+    region_id: int = Field(foreign_key="regions.id", nullable=False)
 
     # Relationships
     resource: Optional["Resource"] = Relationship(back_populates="resource_regions")
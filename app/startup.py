@@ -0,0 +1,244 @@
+"""Startup lifecycle: warm-up, readiness and startup timings.
+
+The first requests after a deploy used to pay for opening database
+connections, configuring SQLAlchemy mappers, building lazy in-memory
+indexes and filling the document and resourceDetail caches. After the
+catalog snapshot is loaded, :func:`warm_up` does that work in the
+background while ``/health`` already answers: it opens pool connections,
+configures mappers, prefetches ``WARMUP_RESOURCE_TYPES`` and runs a known
+query set through the schema. ``/ready`` answers 503 until it is done.
+
+Warm-up ends with a full collection and ``gc.freeze()``: otherwise the
+objects allocated while starting push the collector over its threshold and
+the first request pays for a full collection of the whole heap.
+
+Every phase is timed from ``app.STARTED_AT`` (the first import of the
+package) and reported by ``/ready`` and the ``app_startup_phase_seconds``
+gauge. A failing warm-up phase is logged and reported, but does not keep
+the process unready: it only means the first requests are slower.
+
+While serving, :func:`follow_catalog_versions` polls the newest catalog
+version recorded by ingest (or by an admin bump), so it invalidates the
+caches of every worker and reloads their snapshots without a call to each.
+"""
+import asyncio
+import gc
+import json
+import logging
+import time
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, List, Optional
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy import text
+from sqlalchemy.orm import configure_mappers
+from app import STARTED_AT
+from app.catalog import follow_stored_version, reload_snapshot
+from app.config import settings
+from app.database import async_engine, engine, run_db
+from app.graphql.context import Context
+from app.metrics import STARTUP_PHASE_DURATION, STARTUP_READY
+
+logger = logging.getLogger(__name__)
+
+# Known query set run at warm-up; later documents get variables from earlier results
+REGIONS_QUERY = """
+query WarmupRegions {
+  regions { id regionCode regionName }
+}
+"""
+
+REGION_QUERIES = """
+query WarmupResourcesByRegion($regionId: Int!) {
+  resourcesByRegion(regionId: $regionId, limit: 50) {
+    resources { id resourceType }
+    total
+    hasMore
+  }
+  resourcesByRegionConnection(regionId: $regionId, first: 50) {
+    resources { id resourceType }
+    endCursor
+    hasMore
+  }
+  searchResources(query: "AWS::", regionId: $regionId, limit: 50) {
+    resources { id resourceType }
+    total
+  }
+}
+"""
+
+# Same selection as GetResourceDetail in sample_queries.graphql, so that
+# prefetched results are the ones the resourceDetail cache is asked for
+PROPERTY_FIELDS = """
+  id propertyName documentationUrl updateType isRequired isList isMap
+  primitiveType complexTypeId complexTypeName listAllowsDuplicates
+"""
+
+PREFETCH_QUERY = f"""
+query WarmupResourceDetails($resourceTypes: [String!]!) {{
+  resourceDetailsByType(resourceTypes: $resourceTypes) {{
+    id
+    resourceType
+    documentationUrl
+    availableRegions {{ id regionCode regionName }}
+    properties {{
+      {PROPERTY_FIELDS}
+      nestedProperties {{
+        {PROPERTY_FIELDS}
+        nestedProperties {{ id propertyName primitiveType complexTypeName isRequired isList isMap }}
+      }}
+    }}
+    attributes {{ id attributeName primitiveType isList listItemType }}
+  }}
+}}
+"""
+
+
+class StartupState:
+    """Startup phase timings and whether warm-up has finished."""
+
+    def __init__(self):
+        self.phases: Dict[str, float] = {}
+        self.errors: Dict[str, str] = {}
+        self.ready = False
+        self.ready_after: Optional[float] = None
+
+    def record(self, phase: str, seconds: float) -> None:
+        self.phases[phase] = seconds
+        STARTUP_PHASE_DURATION.set(seconds, phase=phase)
+
+    @contextmanager
+    def phase(self, name: str, required: bool = False) -> Iterator[None]:
+        """Time a phase; failures of optional phases are logged and reported, not raised."""
+        started = time.perf_counter()
+        try:
+            yield
+        except Exception as exc:
+            if required:
+                raise
+            self.errors[name] = f"{type(exc).__name__}: {exc}"
+            logger.exception("Warm-up phase %s failed", name)
+        finally:
+            self.record(name, time.perf_counter() - started)
+
+    def mark_ready(self) -> None:
+        self.ready = True
+        self.ready_after = time.perf_counter() - STARTED_AT
+        self.record("ready", self.ready_after)
+        STARTUP_READY.set(1)
+        logger.info("Ready %.2fs after start: %s", self.ready_after, self.summary())
+
+    def summary(self) -> str:
+        return ", ".join(f"{phase} {seconds:.3f}s" for phase, seconds in self.phases.items())
+
+    def status(self) -> Dict[str, Any]:
+        return {
+            "status": "ready" if self.ready else "warming_up",
+            "seconds_since_start": round(time.perf_counter() - STARTED_AT, 3),
+            "ready_after_seconds": round(self.ready_after, 3) if self.ready_after is not None else None,
+            "phases": {phase: round(seconds, 4) for phase, seconds in self.phases.items()},
+            "errors": self.errors,
+        }
+
+
+startup = StartupState()
+
+
+def _open_connections(count: int) -> None:
+    """Check out ``count`` connections at once so that the pool keeps them open."""
+    connections = []
+    try:
+        for _ in range(count):
+            connection = engine.connect()
+            connections.append(connection)
+            connection.execute(text("SELECT 1"))
+    finally:
+        for connection in connections:
+            connection.close()
+
+
+async def _open_async_connection() -> None:
+    async with async_engine.connect() as connection:
+        await connection.execute(text("SELECT 1"))
+
+
+async def warm_pools() -> None:
+    count = max(settings.WARMUP_POOL_CONNECTIONS, 1)
+    await run_in_threadpool(_open_connections, count)
+    if async_engine is not None:
+        await asyncio.gather(*(_open_async_connection() for _ in range(count)))
+
+
+async def _execute(schema, operation_name: Optional[str], query: str, variables: Optional[dict] = None):
+    """Run one document like a request would; errors are logged, not raised."""
+    result = await schema.execute(
+        query, variable_values=variables, operation_name=operation_name, context_value=Context()
+    )
+    if result.errors:
+        logger.warning("Warm-up query %s failed: %s", operation_name, result.errors[0].message)
+    return result
+
+
+def _query_file_requests(path: str) -> List[dict]:
+    """Requests from WARMUP_QUERIES_FILE: a JSON list of {query, variables, operationName}."""
+    with open(path) as f:
+        requests = json.load(f)
+    if not isinstance(requests, list):
+        raise ValueError(f"{path} must hold a JSON list of requests")
+    return requests
+
+
+async def run_query_set(schema) -> None:
+    """Run the built-in query set, then the requests of WARMUP_QUERIES_FILE."""
+    result = await _execute(schema, "WarmupRegions", REGIONS_QUERY)
+    regions = (result.data or {}).get("regions") or []
+    if regions:
+        await _execute(schema, "WarmupResourcesByRegion", REGION_QUERIES, {"regionId": int(regions[0]["id"])})
+
+    if settings.WARMUP_QUERIES_FILE:
+        for request in _query_file_requests(settings.WARMUP_QUERIES_FILE):
+            await _execute(
+                schema, request.get("operationName"), request["query"], request.get("variables")
+            )
+
+
+async def prefetch_resources(schema) -> None:
+    await _execute(schema, "WarmupResourceDetails", PREFETCH_QUERY, {"resourceTypes": settings.WARMUP_RESOURCE_TYPES})
+
+
+async def warm_up(schema) -> None:
+    """Run the warm-up phases, then report ready."""
+    started = time.perf_counter()
+    with startup.phase("pool"):
+        await warm_pools()
+    with startup.phase("mappers"):
+        configure_mappers()
+    if settings.WARMUP_RESOURCE_TYPES:
+        with startup.phase("prefetch"):
+            await prefetch_resources(schema)
+    with startup.phase("queries"):
+        await run_query_set(schema)
+    with startup.phase("gc"):
+        # Startup objects live as long as the process: keep them out of later collections
+        gc.collect()
+        gc.freeze()
+    startup.record("warm_up", time.perf_counter() - started)
+    startup.mark_ready()
+
+
+async def check_catalog_version() -> bool:
+    """Follow the stored catalog version once, reloading the snapshot when it changed."""
+    changed = await run_db(follow_stored_version)
+    if changed and settings.CATALOG_SNAPSHOT_ENABLED:
+        logger.info("Catalog version changed in the database; reloading the snapshot")
+        await run_in_threadpool(reload_snapshot, False)
+    return changed
+
+
+async def follow_catalog_versions() -> None:
+    """Poll the stored catalog version until cancelled."""
+    while True:
+        await asyncio.sleep(settings.CATALOG_VERSION_CHECK_SECONDS)
+        try:
+            await check_catalog_version()
+        except Exception:
+            logger.exception("Could not follow the stored catalog version")
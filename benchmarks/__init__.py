@@ -0,0 +1 @@
+"""Benchmarks and synthetic catalog data (see README)."""
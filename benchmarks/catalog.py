@@ -0,0 +1,339 @@
+"""Synthetic CloudFormation catalog for benchmarks.
+
+Usage::
+
+    python -m benchmarks.catalog                        # DATABASE_URL, must be empty
+    python -m benchmarks.catalog --reset --seed 7       # drop and recreate the tables first
+    python -m benchmarks.catalog --database-url sqlite:///bench.db
+
+The shape follows the real catalog: about 1,400 resource types over 30
+regions, where older regions offer almost everything and newer ones less;
+per-resource property types forming deep, partly shared graphs with the
+occasional cycle; and one global ``Tag`` type referenced by several hundred
+resources. The same seed always produces the same rows.
+"""
+import argparse
+import logging
+import random
+import sys
+import time
+from datetime import datetime
+from typing import Dict, List, Optional
+from sqlalchemy import func, insert, text
+from sqlalchemy.engine import Engine
+from sqlmodel import SQLModel, Session, create_engine, select
+from app.config import settings
+from app.models import (
+    Region,
+    Resource,
+    ResourceRegion,
+    ResourceAttribute,
+    Property,
+    PropertyType,
+)
+
+logger = logging.getLogger(__name__)
+
+RESOURCE_COUNT = 1400
+TAGGED_FRACTION = 0.3
+CREATED_AT = datetime(2024, 1, 1)
+INSERT_BATCH_SIZE = 5000
+
+# (code, name, share of resources available), oldest regions first
+REGIONS = [
+    ("us-east-1", "US East (N. Virginia)", 1.0),
+    ("us-west-2", "US West (Oregon)", 0.99),
+    ("eu-west-1", "Europe (Ireland)", 0.98),
+    ("us-east-2", "US East (Ohio)", 0.97),
+    ("ap-northeast-1", "Asia Pacific (Tokyo)", 0.96),
+    ("eu-central-1", "Europe (Frankfurt)", 0.96),
+    ("ap-southeast-1", "Asia Pacific (Singapore)", 0.95),
+    ("ap-southeast-2", "Asia Pacific (Sydney)", 0.95),
+    ("us-west-1", "US West (N. California)", 0.93),
+    ("ap-northeast-2", "Asia Pacific (Seoul)", 0.92),
+    ("ap-south-1", "Asia Pacific (Mumbai)", 0.92),
+    ("eu-west-2", "Europe (London)", 0.91),
+    ("ca-central-1", "Canada (Central)", 0.9),
+    ("sa-east-1", "South America (Sao Paulo)", 0.88),
+    ("eu-north-1", "Europe (Stockholm)", 0.87),
+    ("eu-west-3", "Europe (Paris)", 0.87),
+    ("ap-northeast-3", "Asia Pacific (Osaka)", 0.8),
+    ("ap-east-1", "Asia Pacific (Hong Kong)", 0.78),
+    ("me-south-1", "Middle East (Bahrain)", 0.75),
+    ("af-south-1", "Africa (Cape Town)", 0.72),
+    ("eu-south-1", "Europe (Milan)", 0.72),
+    ("ap-southeast-3", "Asia Pacific (Jakarta)", 0.66),
+    ("me-central-1", "Middle East (UAE)", 0.6),
+    ("eu-central-2", "Europe (Zurich)", 0.58),
+    ("eu-south-2", "Europe (Spain)", 0.58),
+    ("ap-south-2", "Asia Pacific (Hyderabad)", 0.56),
+    ("ap-southeast-4", "Asia Pacific (Melbourne)", 0.54),
+    ("il-central-1", "Israel (Tel Aviv)", 0.5),
+    ("ca-west-1", "Canada West (Calgary)", 0.45),
+    ("ap-southeast-5", "Asia Pacific (Malaysia)", 0.4),
+]
+
+SERVICES = [
+    "ACMPCA", "APS", "AccessAnalyzer", "AmazonMQ", "Amplify", "ApiGateway", "ApiGatewayV2",
+    "AppConfig", "AppFlow", "AppIntegrations", "AppMesh", "AppRunner", "AppStream", "AppSync",
+    "ApplicationAutoScaling", "Athena", "AuditManager", "AutoScaling", "Backup", "Batch",
+    "Bedrock", "Budgets", "CertificateManager", "Cassandra", "CleanRooms", "Cloud9",
+    "CloudFormation", "CloudFront", "CloudTrail", "CloudWatch", "CodeArtifact", "CodeBuild",
+    "CodeCommit", "CodeDeploy", "CodePipeline", "CodeStarConnections", "Cognito", "Config",
+    "Connect", "DMS", "DataBrew", "DataPipeline", "DataSync", "DataZone", "Detective",
+    "DevOpsGuru", "DirectoryService", "DocDB", "DynamoDB", "EC2", "ECR", "ECS", "EFS", "EKS",
+    "EMR", "EMRServerless", "ElastiCache", "ElasticBeanstalk", "ElasticLoadBalancingV2",
+    "Elasticsearch", "EntityResolution", "Events", "Evidently", "FIS", "FMS", "FSx",
+    "FinSpace", "Forecast", "FraudDetector", "GameLift", "GlobalAccelerator", "Glue",
+    "Grafana", "GreengrassV2", "GroundStation", "GuardDuty", "HealthLake", "IAM",
+    "IVS", "IdentityStore", "ImageBuilder", "Inspector", "InspectorV2", "IoT", "IoTAnalytics",
+    "IoTEvents", "IoTSiteWise", "IoTTwinMaker", "IoTWireless", "KMS", "Kendra", "Kinesis",
+    "KinesisAnalyticsV2", "KinesisFirehose", "LakeFormation", "Lambda", "Lex", "LicenseManager",
+    "Lightsail", "Location", "Logs", "LookoutMetrics", "MSK", "MWAA", "Macie", "MediaConnect",
+    "MediaConvert", "MediaLive", "MediaPackage", "MediaStore", "MemoryDB", "Neptune",
+    "NetworkFirewall", "NetworkManager", "OpenSearchServerless", "OpenSearchService",
+    "Organizations", "Panorama", "Personalize", "Pinpoint", "Pipes", "QLDB", "QuickSight",
+    "RAM", "RDS", "RUM", "Redshift", "RedshiftServerless", "RefactorSpaces", "Rekognition",
+    "ResilienceHub", "ResourceExplorer2", "ResourceGroups", "RoboMaker", "RolesAnywhere",
+    "Route53", "Route53Resolver", "S3", "S3Express", "S3ObjectLambda", "S3Outposts",
+    "SES", "SNS", "SQS", "SSM", "SSMContacts", "SSMIncidents", "SSO", "SageMaker", "Scheduler",
+    "SecretsManager", "SecurityHub", "ServiceCatalog", "ServiceDiscovery", "Shield", "Signer",
+    "StepFunctions", "Synthetics", "Timestream", "Transfer", "VerifiedPermissions",
+    "VoiceID", "VpcLattice", "WAFv2", "Wisdom", "WorkSpaces", "XRay",
+]
+
+NOUNS = [
+    "Access", "Account", "Action", "Alarm", "Alias", "Analysis", "App", "Application",
+    "Association", "Attachment", "Authorizer", "Backup", "Bucket", "Cache", "Capacity",
+    "Certificate", "Channel", "Cluster", "Collection", "Component", "Config", "Configuration",
+    "Connection", "Connector", "Container", "Dashboard", "Database", "Dataset", "Deployment",
+    "Destination", "Device", "Distribution", "Domain", "Endpoint", "Environment", "Event",
+    "Filter", "Flow", "Function", "Gateway", "Group", "Identity", "Image", "Index", "Instance",
+    "Integration", "Job", "Key", "Layer", "Listener", "Log", "Model", "Monitor", "Namespace",
+    "Network", "Notification", "Parameter", "Permission", "Pipeline", "Plan", "Policy", "Pool",
+    "Profile", "Project", "Queue", "Recipe", "Record", "Registry", "Replica", "Repository",
+    "Resolver", "Resource", "Role", "Route", "Rule", "Schedule", "Schema", "Secret", "Service",
+    "Session", "Set", "Snapshot", "Source", "Stack", "Stage", "Stream", "Subnet", "Subscription",
+    "Table", "Target", "Task", "Template", "Topic", "Trail", "Trigger", "User", "Version",
+    "View", "Volume", "Workflow", "Workgroup", "Workspace",
+]
+
+QUALIFIERS = ["", "", "", "Group", "Policy", "Association", "Version", "Config", "Attachment", "Rule"]
+
+PROPERTY_WORDS = [
+    "Arn", "Auto", "Bucket", "Capacity", "Certificate", "Client", "Code", "Count", "Data",
+    "Default", "Delay", "Description", "Destination", "Enabled", "Encryption", "Endpoint",
+    "Engine", "Filter", "Format", "Id", "Identity", "Interval", "Key", "Kms", "Level", "Limit",
+    "Log", "Max", "Method", "Min", "Mode", "Name", "Network", "Path", "Policy", "Port", "Prefix",
+    "Protocol", "Rate", "Retention", "Role", "Rule", "Schedule", "Security", "Size", "Source",
+    "State", "Status", "Storage", "Subnet", "Target", "Timeout", "Type", "Url", "Value",
+    "Version", "Vpc", "Window", "Zone",
+]
+
+PRIMITIVE_TYPES = ["String"] * 6 + ["Boolean"] * 2 + ["Integer"] * 2 + ["Double", "Long", "Json"]
+UPDATE_TYPES = ["Mutable"] * 6 + ["Immutable"] * 3 + ["Conditional"]
+ATTRIBUTE_NAMES = ["Arn", "Id", "Name", "CreationTime", "Endpoint", "Status", "Version"]
+
+
+def _resource_types(rng: random.Random, count: int) -> List[str]:
+    """Unique ``AWS::Service::Name`` types, a few dozen for big services and one or two for small ones."""
+    weights = [rng.paretovariate(1.2) for _ in SERVICES]
+    types = set()
+    while len(types) < count:
+        service = rng.choices(SERVICES, weights)[0]
+        name = rng.choice(NOUNS) + rng.choice(QUALIFIERS)
+        types.add(f"AWS::{service}::{name}")
+    return sorted(types)
+
+
+def _property_name(rng: random.Random, taken: set) -> str:
+    while True:
+        name = "".join(rng.sample(PROPERTY_WORDS, rng.choice((1, 2, 2, 3))))
+        if name not in taken:
+            taken.add(name)
+            return name
+
+
+class _Rows:
+    """Rows of each table with ids assigned up front, so inserts can be batched."""
+
+    def __init__(self):
+        self.tables: Dict[type, List[dict]] = {model: [] for model in (
+            Region, Resource, ResourceRegion, ResourceAttribute, PropertyType, Property
+        )}
+
+    def add(self, model: type, **values) -> int:
+        rows = self.tables[model]
+        row_id = len(rows) + 1
+        # Every row of a table has every column, as executemany requires
+        row = {column.name: None for column in model.__table__.columns}
+        row.update(values, id=row_id)
+        rows.append(row)
+        return row_id
+
+
+def _add_property(
+    rng: random.Random,
+    rows: _Rows,
+    taken: set,
+    complex_type_id: Optional[int] = None,
+    name: Optional[str] = None,
+    **owner,
+) -> None:
+    is_list = rng.random() < (0.35 if complex_type_id else 0.1)
+    rows.add(
+        Property,
+        property_name=name or _property_name(rng, taken),
+        update_type=rng.choice(UPDATE_TYPES),
+        is_required=rng.random() < 0.25,
+        is_list=is_list,
+        is_map=not is_list and complex_type_id is None and rng.random() < 0.03,
+        primitive_type=None if complex_type_id else rng.choice(PRIMITIVE_TYPES),
+        complex_type_id=complex_type_id,
+        list_allows_duplicates=(rng.random() < 0.5) if is_list else None,
+        **owner,
+    )
+
+
+def _add_type_graph(rng: random.Random, rows: _Rows, resource_id: int, resource_type: str, tag_id: int) -> List[int]:
+    """Property types of one resource; returns the ones root properties may reference.
+
+    Types form a tree up to six levels deep. Some types are referenced from
+    several parents (shared subtrees), some reference the Tag type, and a
+    few point back at an ancestor, like the recursive statement types of
+    WAFv2.
+    """
+    type_count = min(int(rng.expovariate(1 / 6)), 60)
+    type_ids: List[int] = []
+    depth: Dict[int, int] = {}
+    parent: Dict[int, Optional[int]] = {}
+    names = set()
+    for _ in range(type_count):
+        type_name = f"{resource_type}.{_property_name(rng, names)}"
+        type_id = rows.add(PropertyType, resource_id=resource_id, type_name=type_name)
+        # Attach below an existing type unless that would exceed six levels
+        candidates = [t for t in type_ids if depth[t] < 6]
+        parent[type_id] = rng.choice(candidates) if candidates and rng.random() < 0.7 else None
+        depth[type_id] = depth[parent[type_id]] + 1 if parent[type_id] else 1
+        type_ids.append(type_id)
+
+    children: Dict[Optional[int], List[int]] = {}
+    for type_id in type_ids:
+        children.setdefault(parent[type_id], []).append(type_id)
+
+    for type_id in type_ids:
+        taken: set = set()
+        for child in children.get(type_id, ()):
+            _add_property(rng, rows, taken, complex_type_id=child, property_type_id=type_id)
+        # Shared subtree: another type of the same resource used a second time
+        if len(type_ids) > 3 and rng.random() < 0.2:
+            _add_property(rng, rows, taken, complex_type_id=rng.choice(type_ids), property_type_id=type_id)
+        # Cycle back to the parent type
+        if parent[type_id] and rng.random() < 0.03:
+            _add_property(rng, rows, taken, complex_type_id=parent[type_id], property_type_id=type_id)
+        if rng.random() < 0.04:
+            _add_property(rng, rows, taken, complex_type_id=tag_id, name="Tags", property_type_id=type_id)
+        for _ in range(rng.randint(1, 8)):
+            _add_property(rng, rows, taken, property_type_id=type_id)
+
+    return children.get(None, [])
+
+
+def build_catalog_rows(seed: int = 1, resource_count: int = RESOURCE_COUNT) -> Dict[type, List[dict]]:
+    """All rows of a synthetic catalog, keyed by model."""
+    rng = random.Random(seed)
+    rows = _Rows()
+
+    region_ids = []
+    for code, name, share in REGIONS:
+        region_ids.append((rows.add(Region, region_code=code, region_name=name, created_at=CREATED_AT), share))
+
+    tag_id = rows.add(PropertyType, type_name="Tag")
+    for name in ("Key", "Value"):
+        rows.add(Property, property_type_id=tag_id, property_name=name, primitive_type="String",
+                 update_type="Mutable", is_required=True, is_list=False, is_map=False)
+
+    for resource_type in _resource_types(rng, resource_count):
+        service = resource_type.split("::")[1].lower()
+        resource_id = rows.add(
+            Resource,
+            resource_type=resource_type,
+            documentation_url=f"https://docs.aws.amazon.com/AWSCloudFormation/latest/UserGuide/aws-resource-{service}.html",
+            created_at=CREATED_AT,
+        )
+        # Newer resource types are missing from more of the newer regions
+        novelty = rng.random() ** 3
+        for region_id, share in region_ids:
+            if rng.random() < share * (1 - novelty * 0.6):
+                rows.add(ResourceRegion, resource_id=resource_id, region_id=region_id)
+
+        for name in rng.sample(ATTRIBUTE_NAMES, rng.randint(0, 4)):
+            rows.add(ResourceAttribute, resource_id=resource_id, attribute_name=name,
+                     primitive_type="String", is_list=False)
+
+        top_types = _add_type_graph(rng, rows, resource_id, resource_type, tag_id)
+        taken: set = set()
+        for type_id in top_types:
+            _add_property(rng, rows, taken, complex_type_id=type_id, resource_id=resource_id)
+        if rng.random() < TAGGED_FRACTION:
+            _add_property(rng, rows, taken, complex_type_id=tag_id, name="Tags", resource_id=resource_id)
+        for _ in range(int(rng.expovariate(1 / 10)) + 1):
+            _add_property(rng, rows, taken, resource_id=resource_id)
+
+    return rows.tables
+
+
+def _reset_sequences(db: Session) -> None:
+    """Move PostgreSQL id sequences past the explicitly inserted ids."""
+    if db.get_bind().dialect.name != "postgresql":
+        return
+    for table in SQLModel.metadata.sorted_tables:
+        db.exec(text(
+            f"SELECT setval(pg_get_serial_sequence('{table.name}', 'id'), "
+            f"COALESCE((SELECT MAX(id) FROM {table.name}), 0) + 1, false)"
+        ))
+
+
+def generate_catalog(engine: Engine, seed: int = 1, resource_count: int = RESOURCE_COUNT, reset: bool = False) -> Dict[str, int]:
+    """Create the tables and fill them with a synthetic catalog; returns row counts per table."""
+    if reset:
+        SQLModel.metadata.drop_all(engine)
+    SQLModel.metadata.create_all(engine)
+
+    tables = build_catalog_rows(seed, resource_count)
+    with Session(engine) as db:
+        if db.exec(select(func.count()).select_from(Resource)).one():
+            raise RuntimeError("The database already has a catalog; pass --reset to replace it")
+        # Types reference properties' owners and vice versa, so insert in dependency order
+        for model in (Region, Resource, ResourceRegion, ResourceAttribute, PropertyType, Property):
+            rows = tables[model]
+            for start in range(0, len(rows), INSERT_BATCH_SIZE):
+                db.exec(insert(model), params=rows[start:start + INSERT_BATCH_SIZE])
+        _reset_sequences(db)
+        db.commit()
+    return {model.__tablename__: len(rows) for model, rows in tables.items()}
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Fill a database with a synthetic CloudFormation catalog.")
+    parser.add_argument("--database-url", default=settings.DATABASE_URL)
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--resources", type=int, default=RESOURCE_COUNT)
+    parser.add_argument("--reset", action="store_true", help="drop and recreate the tables first")
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
+
+    started = time.perf_counter()
+    try:
+        counts = generate_catalog(create_engine(args.database_url), args.seed, args.resources, args.reset)
+    except RuntimeError as exc:
+        logger.error("%s", exc)
+        return 1
+    for table, count in counts.items():
+        logger.info("%-20s %8d rows", table, count)
+    logger.info("Generated in %.1fs", time.perf_counter() - started)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
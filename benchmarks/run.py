@@ -0,0 +1,459 @@
+"""Latency, throughput, query count and memory benchmarks of the GraphQL API.
+
+Usage::
+
+    python -m benchmarks.run                                  # in-process against DATABASE_URL
+    python -m benchmarks.run --url http://localhost:8000/graphql --concurrency 8
+    python -m benchmarks.run --save-baseline main             # benchmarks/baselines/main.json
+    python -m benchmarks.run --compare main --fail-on-regression 20
+
+In-process runs execute the schema directly with the settings of the
+current environment (``CATALOG_SNAPSHOT_ENABLED``, ``DB_ASYNC_ENABLED`` ...),
+count SQL statements on the application's engines and measure peak Python
+allocations in a separate traced pass. HTTP runs go through a running
+server; they report SQL statements only when the server has
+``GRAPHQL_DEBUG_TRACE_ENABLED`` set, and no memory figures.
+"""
+import argparse
+import asyncio
+import json
+import logging
+import os
+import random
+import resource
+import sys
+import threading
+import time
+import tracemalloc
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import asdict, dataclass, field
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+from app.config import settings
+from benchmarks.catalog import NOUNS
+
+logger = logging.getLogger(__name__)
+
+BASELINE_DIR = os.path.join(os.path.dirname(__file__), "baselines")
+
+# Iterations of the tracemalloc pass; tracing slows execution down, so it is kept short
+MEMORY_ITERATIONS = 10
+
+REGIONS_QUERY = """
+query Regions {
+  regions { id regionCode regionName }
+}
+"""
+
+RESOURCES_BY_REGION_QUERY = """
+query ResourcesByRegion($regionId: Int!, $offset: Int!) {
+  resourcesByRegion(regionId: $regionId, limit: 50, offset: $offset) {
+    resources { id resourceType documentationUrl }
+    total
+    hasMore
+  }
+}
+"""
+
+SEARCH_RESOURCES_QUERY = """
+query SearchResources($query: String!, $regionId: Int) {
+  searchResources(query: $query, regionId: $regionId, limit: 50) {
+    resources { id resourceType }
+    total
+  }
+}
+"""
+
+RESOURCE_DETAIL_QUERY = """
+query ResourceDetail($resourceId: Int!) {
+  resourceDetail(resourceId: $resourceId) {
+    id
+    resourceType
+    properties {
+      ...PropertyFields
+      nestedProperties {
+        ...PropertyFields
+        nestedProperties {
+          ...PropertyFields
+          nestedProperties { ...PropertyFields }
+        }
+      }
+    }
+    attributes { attributeName primitiveType isList }
+    availableRegions { regionCode }
+  }
+}
+
+fragment PropertyFields on PropertyDetail {
+  propertyName
+  primitiveType
+  complexTypeName
+  isRequired
+  isList
+}
+"""
+
+
+@dataclass
+class Catalog:
+    """Ids the scenarios draw their variables from."""
+    region_ids: List[int]
+    resource_ids: List[int]
+
+
+@dataclass
+class Scenario:
+    name: str
+    query: str
+    variables: Callable[[random.Random, Catalog], dict]
+
+
+SCENARIOS = [
+    Scenario("regions", REGIONS_QUERY, lambda rng, catalog: {}),
+    Scenario(
+        "resourcesByRegion",
+        RESOURCES_BY_REGION_QUERY,
+        lambda rng, catalog: {"regionId": rng.choice(catalog.region_ids), "offset": rng.choice((0, 0, 50, 500))},
+    ),
+    Scenario(
+        "searchResources",
+        SEARCH_RESOURCES_QUERY,
+        lambda rng, catalog: {
+            "query": rng.choice(NOUNS),
+            "regionId": rng.choice(catalog.region_ids) if rng.random() < 0.5 else None,
+        },
+    ),
+    Scenario(
+        "resourceDetail",
+        RESOURCE_DETAIL_QUERY,
+        lambda rng, catalog: {"resourceId": rng.choice(catalog.resource_ids)},
+    ),
+]
+
+
+@dataclass
+class ScenarioResult:
+    iterations: int
+    errors: int
+    p50_ms: float
+    p99_ms: float
+    mean_ms: float
+    throughput_rps: float
+    queries_per_op: Optional[float] = None
+    peak_alloc_mb: Optional[float] = None
+
+
+@dataclass
+class Report:
+    meta: dict
+    scenarios: Dict[str, ScenarioResult] = field(default_factory=dict)
+
+
+def percentile(samples: Sequence[float], fraction: float) -> float:
+    """Nearest-rank percentile of unsorted samples."""
+    ordered = sorted(samples)
+    if not ordered:
+        return 0.0
+    rank = max(0, min(len(ordered) - 1, int(round(fraction * len(ordered) + 0.5)) - 1))
+    return ordered[rank]
+
+
+def _summarize(latencies: List[float], errors: int, elapsed: float) -> ScenarioResult:
+    return ScenarioResult(
+        iterations=len(latencies),
+        errors=errors,
+        p50_ms=round(percentile(latencies, 0.5) * 1000, 3),
+        p99_ms=round(percentile(latencies, 0.99) * 1000, 3),
+        mean_ms=round(sum(latencies) / len(latencies) * 1000, 3) if latencies else 0.0,
+        throughput_rps=round(len(latencies) / elapsed, 1) if elapsed else 0.0,
+    )
+
+
+class StatementCounter:
+    """Counts statements run on SQLAlchemy engines."""
+
+    def __init__(self, engines):
+        from sqlalchemy import event
+        self.count = 0
+        self._lock = threading.Lock()
+        for engine in engines:
+            event.listen(engine, "after_cursor_execute", self._after_execute)
+
+    def _after_execute(self, *args) -> None:
+        with self._lock:
+            self.count += 1
+
+
+class InProcessRunner:
+    """Executes operations on the schema in this process."""
+
+    def __init__(self):
+        from app.catalog import init_snapshot
+        from app.database import async_engine, engine
+        from app.graphql import schema
+        from app.graphql.context import Context
+        init_snapshot()
+        self.schema = schema
+        self.context = Context
+        self.statements = StatementCounter(
+            [engine] + ([async_engine.sync_engine] if async_engine is not None else [])
+        )
+        self.loop = asyncio.new_event_loop()
+
+    async def _execute(self, query: str, variables: dict) -> bool:
+        result = await self.schema.execute(query, variable_values=variables, context_value=self.context())
+        return not result.errors
+
+    async def _run_all(self, query: str, variables: List[dict], concurrency: int) -> Tuple[List[float], int]:
+        semaphore = asyncio.Semaphore(concurrency)
+        latencies: List[float] = []
+        errors = 0
+
+        async def run_one(values: dict) -> None:
+            nonlocal errors
+            async with semaphore:
+                start = time.perf_counter()
+                ok = await self._execute(query, values)
+                latencies.append(time.perf_counter() - start)
+                errors += not ok
+
+        await asyncio.gather(*(run_one(values) for values in variables))
+        return latencies, errors
+
+    def execute(self, query: str, variables: dict) -> dict:
+        result = self.loop.run_until_complete(
+            self.schema.execute(query, variable_values=variables, context_value=self.context())
+        )
+        if result.errors:
+            raise RuntimeError(f"Benchmark query failed: {result.errors[0].message}")
+        return result.data
+
+    def run(self, scenario: Scenario, variables: List[dict], concurrency: int) -> ScenarioResult:
+        statements = self.statements.count
+        start = time.perf_counter()
+        latencies, errors = self.loop.run_until_complete(self._run_all(scenario.query, variables, concurrency))
+        result = _summarize(latencies, errors, time.perf_counter() - start)
+        result.queries_per_op = round((self.statements.count - statements) / len(variables), 2)
+
+        tracemalloc.start()
+        self.loop.run_until_complete(self._run_all(scenario.query, variables[:MEMORY_ITERATIONS], 1))
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        result.peak_alloc_mb = round(peak / (1024 * 1024), 2)
+        return result
+
+
+class HttpRunner:
+    """Posts operations to a running server."""
+
+    def __init__(self, url: str):
+        self.url = url
+
+    def _post(self, query: str, variables: dict) -> dict:
+        body = json.dumps({"query": query, "variables": variables}).encode()
+        request = urllib.request.Request(self.url, data=body, headers={
+            "Content-Type": "application/json",
+            "Accept": "application/json",
+            "X-Debug-Trace": "1",
+        })
+        with urllib.request.urlopen(request) as response:
+            return json.loads(response.read())
+
+    def execute(self, query: str, variables: dict) -> dict:
+        payload = self._post(query, variables)
+        if payload.get("errors"):
+            raise RuntimeError(f"Benchmark query failed: {payload['errors'][0]['message']}")
+        return payload["data"]
+
+    def run(self, scenario: Scenario, variables: List[dict], concurrency: int) -> ScenarioResult:
+        statements: List[int] = []
+
+        def run_one(values: dict) -> Tuple[float, bool]:
+            start = time.perf_counter()
+            try:
+                payload = self._post(scenario.query, values)
+            except OSError:
+                return time.perf_counter() - start, False
+            latency = time.perf_counter() - start
+            trace = (payload.get("extensions") or {}).get("trace")
+            if trace is not None:
+                statements.append(trace["statements"])
+            return latency, not payload.get("errors")
+
+        start = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=concurrency) as pool:
+            outcomes = list(pool.map(run_one, variables))
+        result = _summarize([latency for latency, _ in outcomes], sum(not ok for _, ok in outcomes),
+                            time.perf_counter() - start)
+        if len(statements) == len(variables):
+            result.queries_per_op = round(sum(statements) / len(statements), 2)
+        return result
+
+
+# Every resource type contains "::", so this pages through the whole catalog
+ALL_RESOURCES_QUERY = """
+query AllResources($offset: Int!) {
+  searchResources(query: "::", limit: 100, offset: $offset) {
+    resources { id }
+    hasMore
+  }
+}
+"""
+
+
+def load_catalog(runner) -> Catalog:
+    """Region and resource ids of the catalog under test, read through the API itself."""
+    data = runner.execute("query { regions { id } }", {})
+    region_ids = [region["id"] for region in data["regions"]]
+    resource_ids = []
+    offset = 0
+    while True:
+        page = runner.execute(ALL_RESOURCES_QUERY, {"offset": offset})["searchResources"]
+        resource_ids.extend(resource["id"] for resource in page["resources"])
+        if not page["hasMore"]:
+            break
+        offset += 100
+    if not region_ids or not resource_ids:
+        raise RuntimeError("The catalog is empty; fill it with python -m benchmarks.catalog")
+    return Catalog(region_ids, sorted(resource_ids))
+
+
+def run_benchmarks(runner, scenarios: Sequence[Scenario], iterations: int, warmup: int,
+                   concurrency: int, seed: int, meta: dict) -> Report:
+    catalog = load_catalog(runner)
+    report = Report(meta={**meta, "resources": len(catalog.resource_ids), "regions": len(catalog.region_ids)})
+    for scenario in scenarios:
+        # Same seed, same variables: runs on different code are comparable
+        rng = random.Random(f"{seed}:{scenario.name}")
+        warmup_variables = [scenario.variables(rng, catalog) for _ in range(warmup)]
+        variables = [scenario.variables(rng, catalog) for _ in range(iterations)]
+        if warmup_variables:
+            runner.run(scenario, warmup_variables, concurrency)
+        report.scenarios[scenario.name] = runner.run(scenario, variables, concurrency)
+    report.meta["max_rss_mb"] = round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1)
+    return report
+
+
+def _settings_meta(mode: str, url: Optional[str], concurrency: int, iterations: int) -> dict:
+    meta = {
+        "mode": mode,
+        "concurrency": concurrency,
+        "iterations": iterations,
+        "python": sys.version.split()[0],
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+    }
+    if url:
+        meta["url"] = url
+    else:
+        from sqlalchemy.engine import make_url
+        meta["database"] = make_url(settings.DATABASE_URL).get_backend_name()
+        for name in (
+            "CATALOG_SNAPSHOT_ENABLED",
+            "DB_ASYNC_ENABLED",
+            "REGION_INDEX_ENABLED",
+            "RESOURCE_DETAIL_CACHE_ENABLED",
+            "PROPERTY_TREE_STORE_PATH",
+        ):
+            meta[name] = getattr(settings, name)
+    return meta
+
+
+def _baseline_path(name: str) -> str:
+    if os.sep in name or name.endswith(".json"):
+        return name
+    return os.path.join(BASELINE_DIR, f"{name}.json")
+
+
+def save_baseline(report: Report, name: str) -> str:
+    path = _baseline_path(name)
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    with open(path, "w") as f:
+        json.dump(asdict(report), f, indent=2, sort_keys=True)
+    return path
+
+
+def load_baseline(name: str) -> Report:
+    with open(_baseline_path(name)) as f:
+        data = json.load(f)
+    return Report(
+        meta=data["meta"],
+        scenarios={name: ScenarioResult(**values) for name, values in data["scenarios"].items()},
+    )
+
+
+def _change(current: Optional[float], baseline: Optional[float]) -> str:
+    if current is None or baseline is None:
+        return ""
+    if not baseline:
+        return "     n/a"
+    return f"{(current - baseline) / baseline * 100:+7.1f}%"
+
+
+def format_report(report: Report, baseline: Optional[Report] = None) -> List[str]:
+    columns = ("p50_ms", "p99_ms", "mean_ms", "throughput_rps", "queries_per_op", "peak_alloc_mb")
+    lines = ["  ".join([f"{'scenario':<18}"] + [f"{column:>16}" for column in columns] + ["  errors"])]
+    for name, result in report.scenarios.items():
+        cells = []
+        previous = baseline.scenarios.get(name) if baseline is not None else None
+        for column in columns:
+            value = getattr(result, column)
+            cell = "-" if value is None else f"{value:g}"
+            if previous is not None:
+                cell += _change(value, getattr(previous, column))
+            cells.append(f"{cell:>16}")
+        lines.append("  ".join([f"{name:<18}"] + cells + [f"{result.errors:>8}"]))
+    return lines
+
+
+def regressions(report: Report, baseline: Report, threshold_pct: float) -> List[str]:
+    """Scenarios whose p99 latency grew by more than ``threshold_pct`` percent."""
+    found = []
+    for name, result in report.scenarios.items():
+        previous = baseline.scenarios.get(name)
+        if previous is not None and previous.p99_ms and (
+            (result.p99_ms - previous.p99_ms) / previous.p99_ms * 100 > threshold_pct
+        ):
+            found.append(f"{name}: p99 {previous.p99_ms}ms -> {result.p99_ms}ms")
+    return found
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Benchmark the GraphQL API.")
+    parser.add_argument("--url", help="GraphQL endpoint of a running server (default: in-process)")
+    parser.add_argument("--scenario", action="append", choices=[scenario.name for scenario in SCENARIOS],
+                        help="run only these scenarios (repeatable)")
+    parser.add_argument("--iterations", type=int, default=200)
+    parser.add_argument("--warmup", type=int, default=20)
+    parser.add_argument("--concurrency", type=int, default=1)
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--save-baseline", metavar="NAME", help="write results to benchmarks/baselines/NAME.json")
+    parser.add_argument("--compare", metavar="NAME", help="show changes against a saved baseline")
+    parser.add_argument("--fail-on-regression", type=float, metavar="PCT",
+                        help="exit 1 when a p99 is more than PCT percent above the baseline")
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
+    logging.getLogger("strawberry.execution").setLevel(logging.CRITICAL)
+
+    scenarios = [scenario for scenario in SCENARIOS if not args.scenario or scenario.name in args.scenario]
+    runner = HttpRunner(args.url) if args.url else InProcessRunner()
+    meta = _settings_meta("http" if args.url else "in-process", args.url, args.concurrency, args.iterations)
+    report = run_benchmarks(runner, scenarios, args.iterations, args.warmup, args.concurrency, args.seed, meta)
+
+    baseline = load_baseline(args.compare) if args.compare else None
+    for line in format_report(report, baseline):
+        logger.info("%s", line)
+    logger.info("max RSS of this process %.1f MB", report.meta["max_rss_mb"])
+
+    if args.save_baseline:
+        logger.info("Saved baseline to %s", save_baseline(report, args.save_baseline))
+    if baseline is not None and args.fail_on_regression is not None:
+        found = regressions(report, baseline, args.fail_on_regression)
+        for line in found:
+            logger.error("Regression: %s", line)
+        if found:
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,132 @@
+"""Initial schema: regions, resources, property types, properties and attributes.
+
+Databases created before migrations existed already have these tables;
+mark them with ``alembic stamp 0001`` instead of running this revision.
+
+Revision ID: 0001
+Revises:
+Create Date: 2026-10-17 04:37:31.093639
+"""
+from typing import Sequence, Union
+from alembic import op
+import sqlalchemy as sa
+import sqlmodel
+
+
+revision: str = "0001"
+down_revision: Union[str, None] = None
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table("regions",
+    sa.Column("id", sa.Integer(), nullable=False),
+    sa.Column("region_code", sqlmodel.sql.sqltypes.AutoString(length=30), nullable=False),
+    sa.Column("region_name", sqlmodel.sql.sqltypes.AutoString(length=100), nullable=False),
+    sa.Column("created_at", sa.DateTime(), nullable=True),
+    sa.PrimaryKeyConstraint("id")
+    )
+    with op.batch_alter_table("regions", schema=None) as batch_op:
+        batch_op.create_index(batch_op.f("ix_regions_region_code"), ["region_code"], unique=True)
+
+    op.create_table("resources",
+    sa.Column("id", sa.Integer(), nullable=False),
+    sa.Column("resource_type", sqlmodel.sql.sqltypes.AutoString(length=100), nullable=False),
+    sa.Column("documentation_url", sqlmodel.sql.sqltypes.AutoString(), nullable=True),
+    sa.Column("created_at", sa.DateTime(), nullable=True),
+    sa.PrimaryKeyConstraint("id")
+    )
+    with op.batch_alter_table("resources", schema=None) as batch_op:
+        batch_op.create_index(batch_op.f("ix_resources_resource_type"), ["resource_type"], unique=True)
+
+    op.create_table("property_types",
+    sa.Column("id", sa.Integer(), nullable=False),
+    sa.Column("resource_id", sa.Integer(), nullable=True),
+    sa.Column("type_name", sqlmodel.sql.sqltypes.AutoString(length=150), nullable=False),
+    sa.Column("documentation_url", sqlmodel.sql.sqltypes.AutoString(), nullable=True),
+    sa.ForeignKeyConstraint(["resource_id"], ["resources.id"], ),
+    sa.PrimaryKeyConstraint("id")
+    )
+    with op.batch_alter_table("property_types", schema=None) as batch_op:
+        batch_op.create_index(batch_op.f("ix_property_types_resource_id"), ["resource_id"], unique=False)
+        batch_op.create_index(batch_op.f("ix_property_types_type_name"), ["type_name"], unique=True)
+
+    op.create_table("resource_attributes",
+    sa.Column("id", sa.Integer(), nullable=False),
+    sa.Column("resource_id", sa.Integer(), nullable=False),
+    sa.Column("attribute_name", sqlmodel.sql.sqltypes.AutoString(length=100), nullable=False),
+    sa.Column("primitive_type", sqlmodel.sql.sqltypes.AutoString(length=30), nullable=True),
+    sa.Column("is_list", sa.Boolean(), nullable=False),
+    sa.Column("list_item_type", sqlmodel.sql.sqltypes.AutoString(length=30), nullable=True),
+    sa.ForeignKeyConstraint(["resource_id"], ["resources.id"], ),
+    sa.PrimaryKeyConstraint("id")
+    )
+    with op.batch_alter_table("resource_attributes", schema=None) as batch_op:
+        batch_op.create_index(batch_op.f("ix_resource_attributes_resource_id"), ["resource_id"], unique=False)
+
+    op.create_table("resource_regions",
+    sa.Column("id", sa.Integer(), nullable=False),
+    sa.Column("resource_id", sa.Integer(), nullable=False),
+    sa.Column("region_id", sa.Integer(), nullable=False),
+    sa.ForeignKeyConstraint(["region_id"], ["regions.id"], ),
+    sa.ForeignKeyConstraint(["resource_id"], ["resources.id"], ),
+    sa.PrimaryKeyConstraint("id")
+    )
+    with op.batch_alter_table("resource_regions", schema=None) as batch_op:
+        batch_op.create_index(batch_op.f("ix_resource_regions_region_id"), ["region_id"], unique=False)
+        batch_op.create_index(batch_op.f("ix_resource_regions_resource_id"), ["resource_id"], unique=False)
+
+    op.create_table("properties",
+    sa.Column("id", sa.Integer(), nullable=False),
+    sa.Column("resource_id", sa.Integer(), nullable=True),
+    sa.Column("property_type_id", sa.Integer(), nullable=True),
+    sa.Column("property_name", sqlmodel.sql.sqltypes.AutoString(length=100), nullable=False),
+    sa.Column("documentation_url", sqlmodel.sql.sqltypes.AutoString(), nullable=True),
+    sa.Column("update_type", sqlmodel.sql.sqltypes.AutoString(length=20), nullable=True),
+    sa.Column("is_required", sa.Boolean(), nullable=False),
+    sa.Column("is_list", sa.Boolean(), nullable=False),
+    sa.Column("is_map", sa.Boolean(), nullable=False),
+    sa.Column("primitive_type", sqlmodel.sql.sqltypes.AutoString(length=30), nullable=True),
+    sa.Column("complex_type_id", sa.Integer(), nullable=True),
+    sa.Column("list_allows_duplicates", sa.Boolean(), nullable=True),
+    sa.ForeignKeyConstraint(["complex_type_id"], ["property_types.id"], ),
+    sa.ForeignKeyConstraint(["property_type_id"], ["property_types.id"], ),
+    sa.ForeignKeyConstraint(["resource_id"], ["resources.id"], ),
+    sa.PrimaryKeyConstraint("id")
+    )
+    with op.batch_alter_table("properties", schema=None) as batch_op:
+        batch_op.create_index(batch_op.f("ix_properties_complex_type_id"), ["complex_type_id"], unique=False)
+        batch_op.create_index(batch_op.f("ix_properties_property_type_id"), ["property_type_id"], unique=False)
+        batch_op.create_index(batch_op.f("ix_properties_resource_id"), ["resource_id"], unique=False)
+
+
+def downgrade() -> None:
+    with op.batch_alter_table("properties", schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f("ix_properties_resource_id"))
+        batch_op.drop_index(batch_op.f("ix_properties_property_type_id"))
+        batch_op.drop_index(batch_op.f("ix_properties_complex_type_id"))
+
+    op.drop_table("properties")
+    with op.batch_alter_table("resource_regions", schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f("ix_resource_regions_resource_id"))
+        batch_op.drop_index(batch_op.f("ix_resource_regions_region_id"))
+
+    op.drop_table("resource_regions")
+    with op.batch_alter_table("resource_attributes", schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f("ix_resource_attributes_resource_id"))
+
+    op.drop_table("resource_attributes")
+    with op.batch_alter_table("property_types", schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f("ix_property_types_type_name"))
+        batch_op.drop_index(batch_op.f("ix_property_types_resource_id"))
+
+    op.drop_table("property_types")
+    with op.batch_alter_table("resources", schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f("ix_resources_resource_type"))
+
+    op.drop_table("resources")
+    with op.batch_alter_table("regions", schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f("ix_regions_region_code"))
+
+    op.drop_table("regions")
\ No newline at end of file
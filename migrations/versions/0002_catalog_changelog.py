@@ -0,0 +1,55 @@
+"""Catalog versions and the per-resource changelog.
+
+Creates ``catalog_versions`` (one row per ingest that changed the catalog)
+and ``catalog_changes`` (the resources, properties, attributes and region
+availabilities each version added, updated or removed), indexed by version
+and resource.
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2026-10-17 04:45:12.510318
+"""
+from typing import Sequence, Union
+from alembic import op
+import sqlalchemy as sa
+import sqlmodel
+
+
+revision: str = "0002"
+down_revision: Union[str, None] = "0001"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table("catalog_versions",
+    sa.Column("id", sa.Integer(), nullable=False),
+    sa.Column("created_at", sa.DateTime(), nullable=True),
+    sa.Column("source", sqlmodel.sql.sqltypes.AutoString(length=30), nullable=False),
+    sa.Column("is_full", sa.Boolean(), nullable=False),
+    sa.Column("changed_rows", sa.Integer(), nullable=False),
+    sa.PrimaryKeyConstraint("id")
+    )
+    op.create_table("catalog_changes",
+    sa.Column("id", sa.Integer(), nullable=False),
+    sa.Column("version_id", sa.Integer(), nullable=False),
+    sa.Column("resource_id", sa.Integer(), nullable=True),
+    sa.Column("resource_type", sqlmodel.sql.sqltypes.AutoString(length=100), nullable=True),
+    sa.Column("entity", sqlmodel.sql.sqltypes.AutoString(length=30), nullable=False),
+    sa.Column("name", sqlmodel.sql.sqltypes.AutoString(length=300), nullable=True),
+    sa.Column("change", sqlmodel.sql.sqltypes.AutoString(length=10), nullable=False),
+    sa.ForeignKeyConstraint(["version_id"], ["catalog_versions.id"], ),
+    sa.PrimaryKeyConstraint("id")
+    )
+    with op.batch_alter_table("catalog_changes", schema=None) as batch_op:
+        batch_op.create_index(batch_op.f("ix_catalog_changes_resource_id"), ["resource_id"], unique=False)
+        batch_op.create_index(batch_op.f("ix_catalog_changes_version_id"), ["version_id"], unique=False)
+
+
+def downgrade() -> None:
+    with op.batch_alter_table("catalog_changes", schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f("ix_catalog_changes_version_id"))
+        batch_op.drop_index(batch_op.f("ix_catalog_changes_resource_id"))
+
+    op.drop_table("catalog_changes")
+    op.drop_table("catalog_versions")
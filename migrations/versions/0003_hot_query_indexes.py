@@ -0,0 +1,67 @@
+"""Composite indexes for the hot query shapes and one row per resource/region pair.
+
+- ``resource_regions (resource_id, region_id)`` is unique. Duplicate pairs
+  (possible before, nothing enforced them) are removed first, keeping the
+  oldest row. The index also serves lookups by ``resource_id`` alone.
+- ``resource_regions (region_id, resource_id)`` answers "resources of a
+  region" from the index alone, before the join to ``resources``.
+- ``properties (resource_id, property_name)`` and
+  ``properties (property_type_id, id)`` return the properties of a resource
+  or a property type already in the order the loaders sort them.
+
+The single-column indexes they replace are the leading columns of the new
+ones and are dropped.
+
+Revision ID: 0003
+Revises: 0002
+Create Date: 2026-10-17 04:52:40.227105
+"""
+from typing import Sequence, Union
+from alembic import op
+
+
+revision: str = "0003"
+down_revision: Union[str, None] = "0002"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.execute(
+        "DELETE FROM resource_regions WHERE id NOT IN ("
+        "SELECT MIN(id) FROM resource_regions GROUP BY resource_id, region_id)"
+    )
+
+    with op.batch_alter_table("resource_regions", schema=None) as batch_op:
+        batch_op.create_index(
+            "uq_resource_regions_resource_id_region_id", ["resource_id", "region_id"], unique=True
+        )
+        batch_op.create_index(
+            "ix_resource_regions_region_id_resource_id", ["region_id", "resource_id"], unique=False
+        )
+        batch_op.drop_index("ix_resource_regions_resource_id")
+        batch_op.drop_index("ix_resource_regions_region_id")
+
+    with op.batch_alter_table("properties", schema=None) as batch_op:
+        batch_op.create_index(
+            "ix_properties_resource_id_property_name", ["resource_id", "property_name"], unique=False
+        )
+        batch_op.create_index(
+            "ix_properties_property_type_id_id", ["property_type_id", "id"], unique=False
+        )
+        batch_op.drop_index("ix_properties_resource_id")
+        batch_op.drop_index("ix_properties_property_type_id")
+
+
+def downgrade() -> None:
+    with op.batch_alter_table("properties", schema=None) as batch_op:
+        batch_op.create_index("ix_properties_property_type_id", ["property_type_id"], unique=False)
+        batch_op.create_index("ix_properties_resource_id", ["resource_id"], unique=False)
+        batch_op.drop_index("ix_properties_property_type_id_id")
+        batch_op.drop_index("ix_properties_resource_id_property_name")
+
+    with op.batch_alter_table("resource_regions", schema=None) as batch_op:
+        batch_op.create_index("ix_resource_regions_region_id", ["region_id"], unique=False)
+        batch_op.create_index("ix_resource_regions_resource_id", ["resource_id"], unique=False)
+        batch_op.drop_index("ix_resource_regions_region_id_resource_id")
+        batch_op.drop_index("uq_resource_regions_resource_id_region_id")
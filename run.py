@@ -1,5 +1,10 @@
 """Run the FastAPI application."""
 if __name__ == "__main__":
     import uvicorn
-    uvicorn.run("app.main:app", host="0.0.0.0", port=8000, reload=True)
-
+    from app.config import settings
+    
+    if settings.WEB_CONCURRENCY > 1:
+        # Worker processes; set CATALOG_SHARED_PATH so they share one catalog snapshot
+        uvicorn.run("app.main:app", host="0.0.0.0", port=8000, workers=settings.WEB_CONCURRENCY)
+    else:
+        uvicorn.run("app.main:app", host="0.0.0.0", port=8000, reload=True)
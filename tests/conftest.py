@@ -0,0 +1,119 @@
+"""Shared fixtures: an in-memory SQLite catalog and specification files to ingest."""
+import json
+import os
+
+os.environ.setdefault("DATABASE_URL", "sqlite://")
+
+import pytest
+from sqlalchemy.pool import StaticPool
+from sqlmodel import SQLModel, create_engine
+
+import app.models  # noqa: F401  (registers the tables)
+from app.catalog import ingest as ingest_module
+
+
+def tag_type() -> dict:
+    return {
+        "Documentation": "tag-docs",
+        "Properties": {
+            "Key": {"PrimitiveType": "String", "Required": True, "UpdateType": "Mutable"},
+            "Value": {"PrimitiveType": "String", "Required": True, "UpdateType": "Mutable"},
+        },
+    }
+
+
+def bucket_spec() -> dict:
+    """A bucket reaching ``Tag`` twice and a cyclic ``Filter`` type.
+
+``Filter`` refers to itself and, through ``Rule``, back to ``Rule``; the
+bucket uses both ``Rule`` and ``Filter`` directly, so each is reached below
+different ancestors.
+"""
+    return {
+        "Documentation": "bucket-docs",
+        "Properties": {
+            "BucketName": {"PrimitiveType": "String", "UpdateType": "Immutable"},
+            "Filter": {"Type": "Filter", "UpdateType": "Mutable"},
+            "Rules": {"Type": "List", "ItemType": "Rule", "UpdateType": "Mutable"},
+            "Tags": {"Type": "List", "ItemType": "Tag", "UpdateType": "Mutable"},
+        },
+        "Attributes": {"Arn": {"PrimitiveType": "String"}},
+    }
+
+
+def queue_spec() -> dict:
+    return {
+        "Documentation": "queue-docs",
+        "Properties": {
+            "QueueName": {"PrimitiveType": "String", "UpdateType": "Immutable"},
+            "Tags": {"Type": "List", "ItemType": "Tag", "UpdateType": "Mutable"},
+        },
+        "Attributes": {"Arn": {"PrimitiveType": "String"}, "QueueUrl": {"PrimitiveType": "String"}},
+    }
+
+
+def region_spec(resources: dict, version: str = "1.0.0") -> dict:
+    return {
+        "ResourceSpecificationVersion": version,
+        "PropertyTypes": {
+            "Tag": tag_type(),
+            "AWS::S3::Bucket.Rule": {
+                "Documentation": "rule-docs",
+                "Properties": {
+                    "Id": {"PrimitiveType": "String", "UpdateType": "Mutable"},
+                    "Filter": {"Type": "Filter", "UpdateType": "Mutable"},
+                    "Tags": {"Type": "List", "ItemType": "Tag", "UpdateType": "Mutable"},
+                },
+            },
+            "AWS::S3::Bucket.Filter": {
+                "Documentation": "filter-docs",
+                "Properties": {
+                    "Prefix": {"PrimitiveType": "String", "UpdateType": "Mutable"},
+                    "And": {"Type": "List", "ItemType": "Filter", "UpdateType": "Mutable"},
+                    "Rule": {"Type": "Rule", "UpdateType": "Mutable"},
+                },
+            },
+        },
+        "ResourceTypes": resources,
+    }
+
+
+def write_specs(directory, regions: dict) -> None:
+    """Write one ``<region>.json`` per region, replacing the previous feed."""
+    directory.mkdir(exist_ok=True)
+    for path in directory.iterdir():
+        path.unlink()
+    for region_code, spec in regions.items():
+        (directory / f"{region_code}.json").write_text(json.dumps(spec))
+
+
+def baseline_feed() -> dict:
+    return {
+        "us-east-1": region_spec({"AWS::S3::Bucket": bucket_spec(), "AWS::SQS::Queue": queue_spec()}),
+        "eu-west-1": region_spec({"AWS::S3::Bucket": bucket_spec()}),
+    }
+
+
+@pytest.fixture
+def engine(monkeypatch):
+    """A fresh in-memory catalog, also used by ``ingest()``."""
+    engine = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    SQLModel.metadata.create_all(engine)
+    monkeypatch.setattr(ingest_module, "engine", engine)
+    yield engine
+    engine.dispose()
+
+
+@pytest.fixture
+def spec_dir(tmp_path):
+    directory = tmp_path / "specs"
+    write_specs(directory, baseline_feed())
+    return directory
+
+
+@pytest.fixture
+def catalog(engine, spec_dir):
+    """The baseline feed ingested into the in-memory catalog."""
+    report = ingest_module.ingest(spec_dir, workers=1)
+    assert report.version == 1
+    return engine
@@ -0,0 +1,127 @@
+"""Ingesting a feed into an in-memory catalog and re-ingesting it."""
+from sqlmodel import Session, func, select
+
+from app.catalog import changelog
+from app.catalog.ingest import ingest
+from app.models import CatalogChange, CatalogVersion, Property, Resource, ResourceRegion
+from tests.conftest import bucket_spec, region_spec, write_specs
+
+
+def topic_spec() -> dict:
+    return {
+        "Documentation": "topic-docs",
+        "Properties": {"Tags": {"Type": "List", "ItemType": "Tag", "UpdateType": "Mutable"}},
+        "Attributes": {},
+    }
+
+
+def changed_feed() -> dict:
+    """The baseline feed with one change of every kind.
+
+    * ``AWS::SQS::Queue`` is gone and ``AWS::SNS::Topic`` is new;
+    * the bucket's ``BucketName`` became mutable, it gained a ``DomainName``
+      attribute and is no longer available in ``eu-west-1``;
+    * ``Tag.Value`` is no longer required, which reaches the bucket;
+    * region ``ap-south-1`` is new.
+    """
+    bucket = bucket_spec()
+    bucket["Properties"]["BucketName"]["UpdateType"] = "Mutable"
+    bucket["Attributes"]["DomainName"] = {"PrimitiveType": "String"}
+    topic = topic_spec()
+
+    def regional(resources: dict) -> dict:
+        spec = region_spec(resources, version="2.0.0")
+        spec["PropertyTypes"]["Tag"]["Properties"]["Value"]["Required"] = False
+        return spec
+
+    return {
+        "us-east-1": regional({"AWS::S3::Bucket": bucket}),
+        "eu-west-1": regional({"AWS::SNS::Topic": topic}),
+        "ap-south-1": regional({"AWS::SNS::Topic": topic}),
+    }
+
+
+def count(db: Session, model) -> int:
+    return db.exec(select(func.count()).select_from(model)).one()
+
+
+def test_first_ingest_records_a_full_version(engine, spec_dir):
+    report = ingest(spec_dir, workers=1)
+
+    assert report.version == 1
+    assert report.conflicts == 0
+    with Session(engine) as db:
+        assert count(db, Resource) == 2
+        assert count(db, ResourceRegion) == 3
+        # BucketName, Filter, Rules, Tags, QueueName, Tags + Key, Value + Id, Filter, Tags + Prefix, And, Rule
+        assert count(db, Property) == 14
+        assert db.get(CatalogVersion, 1).is_full
+        assert count(db, CatalogChange) == 0
+
+
+def test_reingesting_an_unchanged_feed_changes_nothing(catalog, spec_dir):
+    with Session(catalog) as db:
+        before = db.exec(select(Property.id, Property.property_name).order_by(Property.id)).all()
+
+    report = ingest(spec_dir, workers=1)
+
+    assert report.diff.changed == 0
+    assert report.version is None
+    with Session(catalog) as db:
+        assert count(db, CatalogVersion) == 1
+        assert count(db, CatalogChange) == 0
+        # Rows are kept, not deleted and inserted again
+        assert db.exec(select(Property.id, Property.property_name).order_by(Property.id)).all() == before
+
+
+def test_changed_feed_records_the_expected_changelog(catalog, spec_dir):
+    with Session(catalog) as db:
+        bucket_id = db.exec(select(Resource.id).where(Resource.resource_type == "AWS::S3::Bucket")).one()
+        queue_id = db.exec(select(Resource.id).where(Resource.resource_type == "AWS::SQS::Queue")).one()
+    write_specs(spec_dir, changed_feed())
+
+    report = ingest(spec_dir, workers=1)
+
+    assert report.version == 2
+    with Session(catalog) as db:
+        assert not db.get(CatalogVersion, 2).is_full
+        changes = changelog.changes_since(db, 1)
+        topic_id = db.exec(select(Resource.id).where(Resource.resource_type == "AWS::SNS::Topic")).one()
+
+    assert changes.version == 2
+    assert not changes.full_refresh
+    assert changes.regions_changed
+    by_type = {entry.resource_type: entry for entry in changes.resources}
+    assert set(by_type) == {"AWS::S3::Bucket", "AWS::SQS::Queue", "AWS::SNS::Topic"}
+
+    bucket = by_type["AWS::S3::Bucket"]
+    assert (bucket.resource_id, bucket.change) == (bucket_id, changelog.UPDATED)
+    assert sorted(bucket.properties) == ["BucketName", "Tag.Value"]
+    assert bucket.attributes == ("DomainName",)
+    assert bucket.regions_added == ()
+    assert bucket.regions_removed == ("eu-west-1",)
+
+    queue = by_type["AWS::SQS::Queue"]
+    assert (queue.resource_id, queue.change) == (queue_id, changelog.REMOVED)
+    topic = by_type["AWS::SNS::Topic"]
+    assert (topic.resource_id, topic.change) == (topic_id, changelog.ADDED)
+    # Everything about added and removed resources is covered by their own entry
+    for entry in (queue, topic):
+        assert entry.properties == entry.attributes == entry.regions_added == entry.regions_removed == ()
+
+    # Applying the changed feed again is a no-op
+    assert ingest(spec_dir, workers=1).version is None
+
+
+def test_dry_run_writes_nothing(catalog, spec_dir):
+    write_specs(spec_dir, changed_feed())
+
+    report = ingest(spec_dir, workers=1, dry_run=True)
+
+    assert report.diff.changed
+    assert report.version is None
+    with Session(catalog) as db:
+        assert count(db, CatalogVersion) == 1
+        assert db.exec(select(Resource.resource_type).order_by(Resource.resource_type)).all() == [
+            "AWS::S3::Bucket", "AWS::SQS::Queue",
+        ]
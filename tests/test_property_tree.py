@@ -0,0 +1,105 @@
+"""The bulk-loaded and shared-subtree builders against per-node recursion."""
+from typing import List, Optional
+
+import pytest
+from sqlmodel import Session, select
+
+from app.catalog.property_graph import load_property_graph
+from app.graphql.utils.property_codec import property_to_json
+from app.graphql.utils.property_node import PropertyTreeNode
+from app.graphql.utils.property_tree import (
+    SharedSubtreeBuilder,
+    build_property_tree,
+    build_property_tree_from_graph,
+    build_resource_properties,
+)
+from app.models import Property, PropertyType, Resource
+
+
+def per_node_tree(prop: Property, db: Session, visited_types: Optional[set] = None) -> PropertyTreeNode:
+    """The original builder: one query for every complex property and its type."""
+    if visited_types is None:
+        visited_types = set()
+
+    complex_type_name = None
+    nested_properties = None
+
+    if prop.complex_type_id:
+        complex_type = db.get(PropertyType, prop.complex_type_id)
+
+        if complex_type:
+            complex_type_name = complex_type.type_name
+
+            if complex_type.id not in visited_types:
+                visited_types.add(complex_type.id)
+                nested = db.exec(
+                    select(Property).where(Property.property_type_id == complex_type.id).order_by(Property.id)
+                ).all()
+                nested_properties = [per_node_tree(child, db, visited_types.copy()) for child in nested]
+
+    return PropertyTreeNode(prop, complex_type_name, nested_properties)
+
+
+def root_properties(db: Session, resource_id: int) -> List[Property]:
+    return db.exec(
+        select(Property).where(Property.resource_id == resource_id).order_by(Property.property_name)
+    ).all()
+
+
+def as_json(trees) -> list:
+    return [property_to_json(tree) for tree in trees]
+
+
+@pytest.fixture
+def resources(catalog):
+    with Session(catalog) as db:
+        yield db, db.exec(select(Resource.id).order_by(Resource.id)).all()
+
+
+def test_builders_match_per_node_recursion(resources):
+    db, resource_ids = resources
+    graph = load_property_graph(db, resource_ids)
+    builder = SharedSubtreeBuilder(graph)
+
+    for resource_id in resource_ids:
+        roots = root_properties(db, resource_id)
+        expected = as_json(per_node_tree(prop, db) for prop in roots)
+
+        assert as_json(build_property_tree(prop, db) for prop in roots) == expected
+        assert as_json(
+            build_property_tree_from_graph(prop, graph) for prop in graph.root_properties[resource_id]
+        ) == expected
+        assert as_json(builder.build(prop) for prop in graph.root_properties[resource_id]) == expected
+        assert as_json(build_resource_properties(resource_id, graph, share_subtrees=False)) == expected
+        assert as_json(build_resource_properties(resource_id, graph, share_subtrees=True)) == expected
+
+
+def test_catalog_covers_shared_and_cyclic_types(resources):
+    db, resource_ids = resources
+    bucket_id = db.exec(select(Resource.id).where(Resource.resource_type == "AWS::S3::Bucket")).one()
+    graph = load_property_graph(db, resource_ids)
+    rules, tags = (
+        prop for prop in build_resource_properties(bucket_id, graph, share_subtrees=True)
+        if prop.property_name in ("Rules", "Tags")
+    )
+    rule_tags = next(prop for prop in rules.nested_properties if prop.property_name == "Tags")
+    # Tag is built once and shared wherever it is used
+    assert rule_tags.nested_properties is tags.nested_properties
+
+    # Filter.And refers back to Filter, which is cut off below its own path
+    rule_filter = next(prop for prop in rules.nested_properties if prop.property_name == "Filter")
+    nested_and = next(prop for prop in rule_filter.nested_properties if prop.property_name == "And")
+    assert nested_and.complex_type_name == "AWS::S3::Bucket.Filter"
+    assert nested_and.nested_properties is None
+
+
+@pytest.mark.parametrize("max_depth", [0, 1, 2, 3])
+def test_max_depth_matches_between_builders(resources, max_depth):
+    db, resource_ids = resources
+    graph = load_property_graph(db, resource_ids)
+    builder = SharedSubtreeBuilder(graph)
+
+    for resource_id in resource_ids:
+        roots = graph.root_properties[resource_id]
+        expected = as_json(build_property_tree_from_graph(prop, graph, max_depth=max_depth) for prop in roots)
+        assert as_json(builder.build(prop, max_depth=max_depth) for prop in roots) == expected